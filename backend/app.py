@@ -4,17 +4,22 @@ import os
 ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.append(ROOT_DIR)
 import pytz
-from flask import Flask, jsonify, render_template, redirect, url_for
+from flask import Flask, jsonify, render_template, redirect, request, url_for
 from flask_cors import CORS
 from flask_sqlalchemy import SQLAlchemy
 from backend import database
 from backend.database import init_db
 from backend.models import data_model_init, report_model_init, prompt_model_init
 from sqlalchemy.orm import Session
-from backend.services.data_service import fetch_latest_news
+from backend.services import news_refresh_service
 from apscheduler.schedulers.background import BackgroundScheduler
 from atexit import register
-from backend.tasks import daily_news_update, update_all_financial_data
+from backend.utils.json_provider import FastJSONProvider
+from backend.utils.compression import compression_stats, init_compression
+from backend.utils.instrumentation import init_instrumentation, perf_stats
+from backend.utils import metrics
+from backend.utils.auth_utils import permission_required
+from backend.tasks import daily_news_update, update_all_financial_data, maintain_financial_data_partitions, compact_news_archive, refresh_company_snapshots, pregenerate_sentiment_reports, instrument_scheduler, run_after
 import logging
 from dotenv import load_dotenv
 load_dotenv()  # for LLM API to be used later
@@ -36,6 +41,7 @@ def create_app(testing = None, start_scheduler=True):
                 static_folder=os.path.join('..', 'frontend', 'static'),
                 static_url_path='/static')
     CORS(app)
+    app.json = FastJSONProvider(app)  # orjson with Decimal/date/NumPy support (stdlib fallback)
     app.secret_key = os.environ.get('SECRET_KEY') or 'your_default_secret_key'
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
     if testing is None:
@@ -43,7 +49,11 @@ def create_app(testing = None, start_scheduler=True):
     else:
         app.config['TESTING'] = testing
 
-    if app.config['TESTING']:
+    if database.DATABASE_PROFILE == 'sqlite_wal':
+        app.config['DATABASE_PROFILE'] = 'sqlite_wal'
+        app.config['SQLALCHEMY_DATABASE_URI'] = database.get_database_url(app)
+        logger.info(f"Application created with file-backed SQLite (WAL) database: {app.config['SQLALCHEMY_DATABASE_URI']}")
+    elif app.config['TESTING']:
         app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
         logger.info("Application created in testing mode.")
     else:
@@ -51,6 +61,8 @@ def create_app(testing = None, start_scheduler=True):
         logger.info(f"Application created with database URI: {app.config['SQLALCHEMY_DATABASE_URI']}")
         logger.info("Application running in real time")
 
+    init_instrumentation(app)  # before compression, so its timings include it
+    init_compression(app, precompress=not app.config['TESTING'])
     db.init_app(app)
     
     with app.app_context():
@@ -63,8 +75,13 @@ def create_app(testing = None, start_scheduler=True):
             logger.info("Starting background tasks (scheduler and initial data update).")
             global scheduler_started
             if not scheduler_started:
-                scheduler.add_job(func=daily_news_update, trigger='cron', hour=6, minute=0, day_of_week='mon-fri', args=(app,))
+                scheduler.add_job(func=daily_news_update, trigger='cron', hour=6, minute=0, day_of_week='mon-fri', args=(app,), id='daily_news_update')
+                run_after(scheduler, 'daily_news_update', pregenerate_sentiment_reports, args=(app,))
                 scheduler.add_job(func=update_all_financial_data, trigger='cron', hour=14, minute=43, day_of_week='mon-fri', args=(app,))
+                scheduler.add_job(func=maintain_financial_data_partitions, trigger='cron', day=1, hour=2, minute=0, args=(app,))
+                scheduler.add_job(func=compact_news_archive, trigger='cron', hour=3, minute=0, args=(app,))
+                scheduler.add_job(func=refresh_company_snapshots, trigger='cron', hour=5, minute=30, day_of_week='mon-fri', args=(app,))
+                instrument_scheduler(scheduler)
                 scheduler.start()
                 print("Scheduler started for daily news and financial data updates on weekdays.")
                 register(scheduler.shutdown)
@@ -83,6 +100,7 @@ def create_app(testing = None, start_scheduler=True):
     from backend.routes.graph_routes import graph_routes_bp
     from backend.routes.download_routes import download_routes_bp
     from backend.routes.alert_routes import alert_routes_bp
+    from backend.routes.event_routes import event_routes_bp
 
     app.register_blueprint(user_routes_bp)
     app.register_blueprint(data_routes_bp)
@@ -93,6 +111,7 @@ def create_app(testing = None, start_scheduler=True):
     app.register_blueprint(graph_routes_bp)
     app.register_blueprint(download_routes_bp)
     app.register_blueprint(alert_routes_bp)
+    app.register_blueprint(event_routes_bp)
 
     from backend.api import api_bp
     app.register_blueprint(api_bp, url_prefix='/api')
@@ -109,20 +128,35 @@ def create_app(testing = None, start_scheduler=True):
     def company_detail_page(ticker):
         return render_template('company_details.html', ticker=ticker)
 
+    @app.route('/api/admin/compression', methods=['GET'])
+    @permission_required('admin')
+    def get_compression_stats():
+        """Bytes before/after compression for this worker, per encoding."""
+        return jsonify(compression_stats())
+
+    @app.route('/api/admin/perf', methods=['GET'])
+    @permission_required('admin')
+    def get_perf_stats():
+        """Slowest endpoints of this worker over their recent requests (?limit=20&sort=p95_ms|avg_db_ms|...)."""
+        limit = request.args.get('limit', 20, type=int)
+        return jsonify(perf_stats(limit=max(1, min(limit, 200)), sort=request.args.get('sort', 'p95_ms')))
+
+    @app.route('/metrics', methods=['GET'])
+    def get_metrics():
+        """Prometheus text exposition of this worker's metrics. Set METRICS_TOKEN to require a bearer token."""
+        token = os.environ.get('METRICS_TOKEN')
+        if token and request.headers.get('Authorization') != f"Bearer {token}":
+            return jsonify({'error': 'Authentication required'}), 401
+        return app.response_class(metrics.render(), content_type=metrics.CONTENT_TYPE)
+
     @app.route('/api/company/<ticker>/news', methods=['GET'])
     def get_company_news(ticker):
-        db: Session = database.SessionLocal()
-        try:
-            company = database.get_company_by_ticker(db, ticker)
-            if company:
-                news_articles = fetch_latest_news(ticker, company.industry, company.exchange)
-                top_company_news = news_articles[:5]
-                industry_news = fetch_latest_news(company.industry, company.industry, company.exchange)[:3]
-                return jsonify({'company_news': top_company_news, 'industry_news': industry_news})
-            else:
-                return jsonify({'error': 'Company not found'}), 404
-        finally:
-            db.close()
+        db: Session = database.get_read_db()
+        company = database.get_company_by_ticker(db, ticker)
+        if company:
+            return jsonify(news_refresh_service.get_company_news(db, company.company_id))
+        else:
+            return jsonify({'error': 'Company not found'}), 404
             
     @app.context_processor
     def inject_permissions():
@@ -0,0 +1,37 @@
+-- backend/db/partitions/financial_data_partitions.sql
+-- Converts financial_data to RANGE partitions by YEAR(date) (MySQL only).
+-- Generated/maintained by backend/services/partition_service.py; this file documents the target layout.
+--
+-- MySQL restrictions for partitioned InnoDB tables:
+--   * every PRIMARY/UNIQUE key must contain the partition column, so the PK becomes (data_id, date)
+--   * foreign keys are not supported, so the company_id FK is dropped (integrity is kept by the app)
+
+ALTER TABLE financial_data DROP FOREIGN KEY financial_data_ibfk_1;
+
+ALTER TABLE financial_data
+    DROP PRIMARY KEY,
+    ADD PRIMARY KEY (data_id, date);
+
+ALTER TABLE financial_data
+PARTITION BY RANGE (YEAR(date)) (
+    PARTITION p2020 VALUES LESS THAN (2021),
+    PARTITION p2021 VALUES LESS THAN (2022),
+    PARTITION p2022 VALUES LESS THAN (2023),
+    PARTITION p2023 VALUES LESS THAN (2024),
+    PARTITION p2024 VALUES LESS THAN (2025),
+    PARTITION p2025 VALUES LESS THAN (2026),
+    PARTITION p2026 VALUES LESS THAN (2027),
+    PARTITION pmax VALUES LESS THAN MAXVALUE
+);
+
+-- Adding next year's partition (run by the scheduled maintenance job):
+-- ALTER TABLE financial_data REORGANIZE PARTITION pmax INTO (
+--     PARTITION p2027 VALUES LESS THAN (2028),
+--     PARTITION pmax VALUES LESS THAN MAXVALUE
+-- );
+
+-- Archiving a cold year (after its rows are exported to backend/db/archive/financial_data_<year>.csv.gz):
+-- ALTER TABLE financial_data TRUNCATE PARTITION p2020;
+
+-- Checking pruning for a recent-window query (the `partitions` column should list one or two years):
+-- EXPLAIN SELECT date, close, volume FROM financial_data WHERE company_id = 1 AND date >= CURDATE() - INTERVAL 365 DAY;
@@ -0,0 +1,34 @@
+-- backend/db/tables/company_snapshots.sql
+-- Yahoo Finance company info (market cap, beta, dividends...), refreshed by backend/services/summary_service.py
+-- on a schedule so the company page never calls Yahoo Finance inline.
+CREATE TABLE IF NOT EXISTS company_snapshots (
+    company_id INT PRIMARY KEY,
+    average_volume BIGINT,
+    market_cap BIGINT,
+    beta DECIMAL(10, 4),
+    earnings_date DATE,
+    forward_dividend DECIMAL(12, 4),
+    dividend_yield DECIMAL(10, 4),
+    ex_dividend_date DATE,
+    target_mean_price DECIMAL(15, 4),
+    -- Rolling statistics maintained on ingest by backend/services/rolling_stats_service.py
+    fifty_two_week_high DECIMAL(10, 2),
+    fifty_two_week_low DECIMAL(10, 2),
+    return_1d DECIMAL(12, 6),
+    return_1w DECIMAL(12, 6),
+    return_1m DECIMAL(12, 6),
+    return_ytd DECIMAL(12, 6),
+    average_volume_1m BIGINT,
+    stats_as_of DATE,                  -- date of the last bar folded into the statistics
+    rolling_state TEXT,                -- JSON window state the next ingest continues from
+    updated_at DATETIME NOT NULL,      -- UTC
+    FOREIGN KEY (company_id) REFERENCES companies(company_id)
+);
+
+-- Existing databases: add the rolling statistics columns, then fill them with
+-- python -m backend.services.rolling_stats_service
+-- ALTER TABLE company_snapshots
+--     ADD COLUMN fifty_two_week_high DECIMAL(10, 2), ADD COLUMN fifty_two_week_low DECIMAL(10, 2),
+--     ADD COLUMN return_1d DECIMAL(12, 6), ADD COLUMN return_1w DECIMAL(12, 6), ADD COLUMN return_1m DECIMAL(12, 6),
+--     ADD COLUMN return_ytd DECIMAL(12, 6), ADD COLUMN average_volume_1m BIGINT, ADD COLUMN stats_as_of DATE,
+--     ADD COLUMN rolling_state TEXT;
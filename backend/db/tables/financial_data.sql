@@ -16,5 +16,19 @@ CREATE TABLE IF NOT EXISTS financial_data (
     cash_flow DECIMAL(15, 2),
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
-    FOREIGN KEY (company_id) REFERENCES companies(company_id)
-);
\ No newline at end of file
+    FOREIGN KEY (company_id) REFERENCES companies(company_id),
+    UNIQUE KEY uq_financial_data_company_date (company_id, date),
+    INDEX ix_financial_data_date_company (date, company_id)
+);
+-- Year partitioning is applied afterwards by backend/db/partitions/financial_data_partitions.sql
+-- (or `python -m backend.services.partition_service enable`).
+
+-- Existing databases: remove duplicate bars (keeping the newest row of each company and date) and add the unique
+-- key the bulk importer relies on; `python -m backend.services.bulk_import_service --add-unique-key` runs the same.
+-- DELETE older FROM financial_data older JOIN financial_data newer
+--     ON newer.company_id = older.company_id AND newer.date = older.date AND newer.data_id > older.data_id;
+-- ALTER TABLE financial_data ADD UNIQUE KEY uq_financial_data_company_date (company_id, date);
+
+-- Existing databases: add the index the keyset-paginated dashboard feed (/api/data/dashboard/latest) seeks on;
+-- without it every page is a filesort over the whole table.
+-- ALTER TABLE financial_data ADD INDEX ix_financial_data_date_company (date, company_id);
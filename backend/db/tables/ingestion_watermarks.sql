@@ -0,0 +1,9 @@
+-- backend/db/tables/ingestion_watermarks.sql
+-- One row per company, bumped by backend/services/watermark_service.py whenever its price data is written.
+CREATE TABLE IF NOT EXISTS ingestion_watermarks (
+    company_id INT PRIMARY KEY,
+    last_date DATE,                    -- newest bar date after the write
+    version INT NOT NULL DEFAULT 0,
+    updated_at DATETIME NOT NULL,      -- UTC
+    FOREIGN KEY (company_id) REFERENCES companies(company_id)
+);
@@ -0,0 +1,16 @@
+-- backend/db/tables/llm_results.sql
+-- Stored LLM analyses (news sentiment reports), written by backend/services/sentiment_service.py. cache_key is the
+-- sha256 of (news ids, prompt template version, model): the same articles analyzed by the same prompt and model
+-- are answered from here instead of calling Gemini again.
+CREATE TABLE IF NOT EXISTS llm_results (
+    result_id INT PRIMARY KEY AUTO_INCREMENT,
+    cache_key CHAR(64) NOT NULL UNIQUE,
+    company_id INT NOT NULL,
+    news_ids VARCHAR(255) NOT NULL,    -- comma-separated, newest first
+    prompt_version VARCHAR(20) NOT NULL,
+    model VARCHAR(100) NOT NULL,
+    result MEDIUMTEXT NOT NULL,        -- JSON report
+    created_at DATETIME NOT NULL,      -- UTC
+    INDEX ix_llm_results_company_created (company_id, created_at),
+    FOREIGN KEY (company_id) REFERENCES companies(company_id)
+);
@@ -2,12 +2,16 @@
 CREATE TABLE IF NOT EXISTS news (
     news_id INT AUTO_INCREMENT PRIMARY KEY,
     company_id INT NOT NULL,
-    title VARCHAR(255) NOT NULL,
-    description TEXT,
-    url VARCHAR(255),
-    published_at TIMESTAMP,
+    title VARCHAR(255),
+    link VARCHAR(500),
+    published_date DATETIME,
+    summary TEXT,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
     FOREIGN KEY (company_id) REFERENCES companies(company_id),
-    INDEX (company_id, published_at) -- For efficient querying
-);
\ No newline at end of file
+    -- Latest N news for a company (LLM routes, stored news) and retention compaction
+    INDEX ix_news_company_published (company_id, published_date)
+);
+
+-- Existing databases: add the index the news reads and the retention job rely on.
+-- ALTER TABLE news ADD INDEX ix_news_company_published (company_id, published_date);
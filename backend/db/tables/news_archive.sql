@@ -0,0 +1,14 @@
+-- backend/db/tables/news_archive.sql
+-- Cold storage for news rows compacted out of `news` by backend/services/news_retention_service.py.
+CREATE TABLE IF NOT EXISTS news_archive (
+    archive_id INT AUTO_INCREMENT PRIMARY KEY,
+    news_id INT NOT NULL,              -- id the article had in `news`
+    company_id INT NOT NULL,
+    title VARCHAR(255),
+    link VARCHAR(500),
+    published_date DATETIME,
+    summary_compressed BLOB,           -- zlib-compressed summary text
+    archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (company_id) REFERENCES companies(company_id),
+    INDEX ix_news_archive_company_published (company_id, published_date)
+);
@@ -0,0 +1,78 @@
+# backend/gunicorn_conf.py
+# Gunicorn settings: gunicorn -c backend/gunicorn_conf.py backend.wsgi:app
+# The LLM, live-news, yfinance and event-stream routes spend nearly all their time waiting on upstream I/O (or, for
+# SSE, on the next event), so a sync worker per request caps concurrency at the worker count. GUNICORN_PROFILE picks
+# how a worker handles many requests at once:
+#   gevent  - green threads; the stdlib (sockets, time.sleep, threading) is monkey-patched, so requests, PyMySQL,
+#             yfinance and the SSE waits yield to other requests. Thousands of connections per worker. (default)
+#   gthread - a pool of OS threads per worker; no patching, concurrency = workers x GUNICORN_THREADS.
+#   sync    - one request per worker at a time (the old behaviour).
+# Use the pure-Python PyMySQL driver (mysql+pymysql://) with gevent: a C driver blocks the whole worker.
+import logging
+import multiprocessing
+import os
+from typing import Any, Dict
+
+logger = logging.getLogger(__name__)
+
+GUNICORN_PROFILES = ('gevent', 'gthread', 'sync')
+GUNICORN_PROFILE = os.environ.get('GUNICORN_PROFILE') or 'gevent'
+GUNICORN_THREADS = int(os.environ.get('GUNICORN_THREADS') or 16)  # gthread: threads per worker
+GUNICORN_WORKER_CONNECTIONS = int(os.environ.get('GUNICORN_WORKER_CONNECTIONS') or 1000)  # gevent: per worker
+
+
+def _gevent_available() -> bool:
+    try:
+        import gevent  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def worker_settings(profile: str, cpu_count: int) -> Dict[str, Any]:
+    """worker_class / workers / threads / worker_connections for a profile (gevent falls back to gthread if missing)."""
+    if profile not in GUNICORN_PROFILES:
+        raise ValueError(f"GUNICORN_PROFILE must be one of {', '.join(GUNICORN_PROFILES)}")
+    if profile == 'gevent' and not _gevent_available():
+        logger.warning("gevent is not installed; using the gthread worker profile instead.")
+        profile = 'gthread'
+    if profile == 'gevent':
+        # One worker per core: concurrency comes from greenlets, not processes.
+        return {'worker_class': 'gevent', 'workers': cpu_count, 'threads': 1,
+                'worker_connections': GUNICORN_WORKER_CONNECTIONS}
+    if profile == 'gthread':
+        return {'worker_class': 'gthread', 'workers': cpu_count, 'threads': GUNICORN_THREADS,
+                'worker_connections': GUNICORN_WORKER_CONNECTIONS}
+    return {'worker_class': 'sync', 'workers': cpu_count * 2 + 1, 'threads': 1,
+            'worker_connections': GUNICORN_WORKER_CONNECTIONS}
+
+
+_settings = worker_settings(GUNICORN_PROFILE, multiprocessing.cpu_count())
+
+bind = os.environ.get('GUNICORN_BIND') or f"0.0.0.0:{os.environ.get('PORT') or 8000}"
+worker_class = _settings['worker_class']
+workers = int(os.environ.get('WEB_CONCURRENCY') or _settings['workers'])
+threads = _settings['threads']
+worker_connections = _settings['worker_connections']
+# For sync workers this is the longest a request may run (LLM calls take tens of seconds); for gevent/gthread it
+# only bounds how long a worker may go without a heartbeat, so long-lived event streams are unaffected.
+timeout = int(os.environ.get('GUNICORN_TIMEOUT') or 120)
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT') or 30)
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE') or 5)
+# Recycle workers now and then so a slow leak in a third-party client can't grow without bound.
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS') or 5000)
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER') or 500)
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG') or '-'
+loglevel = os.environ.get('GUNICORN_LOG_LEVEL') or 'info'
+
+
+def post_worker_init(worker):
+    """The Gemini client talks gRPC, whose C core would block a gevent worker; route its I/O through gevent."""
+    if worker_class != 'gevent':
+        return
+    try:
+        from grpc.experimental import gevent as grpc_gevent
+    except ImportError:
+        return
+    grpc_gevent.init_gevent()
+    worker.log.info("gRPC running on gevent")
@@ -1,5 +1,5 @@
 # backend/models/data_model.py
-from sqlalchemy import Column, Integer, String, Date, Numeric, BigInteger, ForeignKey, DateTime, Text
+from sqlalchemy import Column, Integer, String, Date, Numeric, BigInteger, ForeignKey, DateTime, Text, UniqueConstraint, Index, LargeBinary
 from sqlalchemy.orm import relationship
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.sql import func
@@ -38,6 +38,13 @@ class FinancialData(Base):
     created_at = Column(DateTime, default=func.now())
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
     company = relationship("Company", back_populates="financial_data")
+    # One bar per company per day. Also serves the (company_id, date) range scans used by the
+    # graph and 52-week queries, and includes the partition column for MySQL year partitioning.
+    __table_args__ = (
+        UniqueConstraint('company_id', 'date', name='uq_financial_data_company_date'),
+        # Keyset pagination of the dashboard feed, newest first across all companies.
+        Index('ix_financial_data_date_company', 'date', 'company_id'),
+    )
 
 class News(Base):
     __tablename__ = 'news'
@@ -50,6 +57,57 @@ class News(Base):
     created_at = Column(DateTime, default=func.now())
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
     company = relationship("Company", back_populates="news_items")
+    # Serves the "latest N news for a company" queries (LLM routes, get_stored_news) and retention compaction.
+    __table_args__ = (
+        Index('ix_news_company_published', 'company_id', 'published_date'),
+    )
+
+class NewsArchive(Base):
+    """Cold storage for news compacted out of `news` by the retention job. Summaries are zlib-compressed."""
+    __tablename__ = 'news_archive'
+    archive_id = Column(Integer, primary_key=True, autoincrement=True)
+    news_id = Column(Integer, nullable=False)  # id the article had in `news`
+    company_id = Column(Integer, ForeignKey('companies.company_id'), nullable=False)
+    title = Column(String(255))
+    link = Column(String(500))
+    published_date = Column(DateTime)
+    summary_compressed = Column(LargeBinary)
+    archived_at = Column(DateTime, default=func.now())
+    __table_args__ = (
+        Index('ix_news_archive_company_published', 'company_id', 'published_date'),
+    )
+
+class IngestionWatermark(Base):
+    """Per-company marker bumped whenever price data for the company is written. Used to build HTTP validators."""
+    __tablename__ = 'ingestion_watermarks'
+    company_id = Column(Integer, ForeignKey('companies.company_id'), primary_key=True)
+    last_date = Column(Date)  # newest bar date after the write
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, nullable=False)  # UTC
+
+class CompanySnapshot(Base):
+    """Slow-changing company info from Yahoo Finance, refreshed by a scheduled job instead of per request."""
+    __tablename__ = 'company_snapshots'
+    company_id = Column(Integer, ForeignKey('companies.company_id'), primary_key=True)
+    average_volume = Column(BigInteger)
+    market_cap = Column(BigInteger)
+    beta = Column(Numeric(10, 4))
+    earnings_date = Column(Date)
+    forward_dividend = Column(Numeric(12, 4))
+    dividend_yield = Column(Numeric(10, 4))
+    ex_dividend_date = Column(Date)
+    target_mean_price = Column(Numeric(15, 4))
+    # Rolling statistics kept up to date on ingest by rolling_stats_service (as of the bar dated stats_as_of)
+    fifty_two_week_high = Column(Numeric(10, 2))
+    fifty_two_week_low = Column(Numeric(10, 2))
+    return_1d = Column(Numeric(12, 6))
+    return_1w = Column(Numeric(12, 6))
+    return_1m = Column(Numeric(12, 6))
+    return_ytd = Column(Numeric(12, 6))
+    average_volume_1m = Column(BigInteger)
+    stats_as_of = Column(Date)
+    rolling_state = Column(Text)  # JSON window state the next ingest continues from
+    updated_at = Column(DateTime, nullable=False)  # UTC
 
 def data_model_init():
     pass
\ No newline at end of file
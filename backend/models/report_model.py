@@ -1,5 +1,5 @@
 # backend/models/report_model.py
-from sqlalchemy import Column, Integer, DateTime, ForeignKey, String
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, String, Text, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.sql import func
@@ -21,5 +21,25 @@ class Report(Base):
     feedbacks = relationship("Feedback", back_populates="report")
 
 
+class LLMResult(Base):
+    """
+    Stored LLM analysis, keyed by what determines its output: the articles sent, the prompt template version and
+    the model (cache_key = sha256 of the three). Written by sentiment_service; a repeat request is a single read.
+    """
+    __tablename__ = 'llm_results'
+    result_id = Column(Integer, primary_key=True, autoincrement=True)
+    cache_key = Column(String(64), unique=True, nullable=False)
+    company_id = Column(Integer, ForeignKey('companies.company_id'), nullable=False)
+    news_ids = Column(String(255), nullable=False)  # comma-separated, newest first
+    prompt_version = Column(String(20), nullable=False)
+    model = Column(String(100), nullable=False)
+    result = Column(Text, nullable=False)  # JSON report
+    created_at = Column(DateTime, nullable=False)  # UTC
+    __table_args__ = (
+        # Latest result of a company (batch change detection) and pruning of expired results.
+        Index('ix_llm_results_company_created', 'company_id', 'created_at'),
+    )
+
+
 def report_model_init():
     pass
\ No newline at end of file
@@ -1,14 +1,18 @@
 # backend/routes/data_routes.py
 import datetime
-from flask import Blueprint, current_app, jsonify, request, session
+from flask import Blueprint, current_app, jsonify, request, session, url_for
 import pytz
-from backend.database import get_all_companies, get_db
+from backend.database import get_all_companies, get_db, get_read_db, note_primary_write
 from backend.utils.auth_utils import login_required, permission_required
 from sqlalchemy.orm import Session
 from backend.models import data_model, Company, FinancialData
 from backend.services import data_service
 from backend.tasks import update_all_financial_data  # Import the task function
-from sqlalchemy import func, text
+from sqlalchemy import and_, func, or_, select
+from backend.utils.data_utils import decode_cursor, encode_cursor, parse_csv_param, parse_date_param, parse_fields, parse_int_param
+from backend.utils.streaming import iter_rows, stream_json
+from backend.utils.http_cache import conditional
+from backend.services.rolling_stats_service import get_rolling_stats
 import logging
 logging.basicConfig(level=logging.DEBUG)
 
@@ -45,6 +49,7 @@ def ingest_data(ticker):
         success = data_service.store_financial_data(db, ticker)
         print(f"[DEBUG - ingest_data] data_service.store_financial_data({'success' if success else 'failed'}) for ticker: {ticker}")
         if success:
+            note_primary_write()
             print(f"[DEBUG - ingest_data] Successfully ingested data for {ticker}")
             return jsonify({"message": f"Data ingested for {ticker}. Refresh the table.", "status": "success"}), 200
         else:
@@ -68,59 +73,127 @@ def ingest_all_data():
     update_all_financial_data(app)  # Call the task function
     return jsonify({"message": "Initiated check and update of financial data for all companies."}), 200
 
+# Columns the dashboard feed can project with `fields=`.
+DASHBOARD_FIELDS = {
+    'ticker_symbol': Company.ticker_symbol,
+    'company_name': Company.company_name,
+    'industry': Company.industry,
+    'date': FinancialData.date,
+    'open': FinancialData.open,
+    'high': FinancialData.high,
+    'low': FinancialData.low,
+    'close': FinancialData.close,
+    'volume': FinancialData.volume,
+}
+DASHBOARD_PAGE_SIZE = 500
+DASHBOARD_MAX_PAGE_SIZE = 5000
+
 @data_routes_bp.route('/dashboard/latest', methods=['GET'])
+@conditional('dashboard-latest', company_arg=None)  # the ETag covers the query string: cursor and filters
 def get_all_financial_data():
-    """Retrieves ALL financial data for all companies."""
-    db: Session = get_db()
+    """
+    Retrieves financial data for all companies, newest first, one keyset page at a time.
+    Query params: limit, cursor (from the X-Next-Cursor header of the previous page), fields, ticker, date_from, date_to,
+    q (substring of the ticker or company name) and industry (repeatable).
+    """
     try:
-        query = text("""
-            SELECT
-                c.ticker_symbol,
-                c.company_name,
-                c.industry,
-                fd.date,
-                fd.open,
-                fd.high,
-                fd.low,
-                fd.close,
-                fd.volume
-            FROM companies c
-            JOIN financial_data fd ON c.company_id = fd.company_id
-            ORDER BY fd.date DESC;
-        """)
-        all_data = db.execute(query).fetchall()
-        results = []
-        for row in all_data:
-            results.append({
-                "ticker_symbol": row.ticker_symbol,
-                "company_name": row.company_name,
-                "industry": row.industry,
-                "date": row.date.isoformat(),
-                "open": row.open,
-                "high": row.high,
-                "low": row.low,
-                "close": row.close,
-                "volume": row.volume
-            })
-        logging.debug(f"Successfully queried {len(results)} financial data entries")
-        return jsonify(results), 200
+        limit = parse_int_param(request.args.get('limit'), DASHBOARD_PAGE_SIZE, 1, DASHBOARD_MAX_PAGE_SIZE, 'limit')
+        fields = parse_fields(request.args.get('fields'), DASHBOARD_FIELDS)
+        tickers = [ticker.upper() for ticker in parse_csv_param(request.args.get('ticker'))]
+        date_from = parse_date_param(request.args.get('date_from'), 'date_from')
+        date_to = parse_date_param(request.args.get('date_to'), 'date_to')
+        search = request.args.get('q', '').strip()
+        industries = [industry for industry in request.args.getlist('industry') if industry.strip()]
+        cursor = decode_cursor(request.args['cursor']) if request.args.get('cursor') else None
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    db: Session = get_read_db()
+    streaming = False  # once the body is streamed, the stream closes the session
+    try:
+        query = select(*[DASHBOARD_FIELDS[field].label(field) for field in fields])\
+            .select_from(FinancialData).join(Company, Company.company_id == FinancialData.company_id)
+        if tickers:
+            query = query.where(Company.ticker_symbol.in_(tickers))
+        if search:
+            query = query.where(or_(Company.ticker_symbol.icontains(search, autoescape=True),
+                                    Company.company_name.icontains(search, autoescape=True)))
+        if industries:
+            query = query.where(Company.industry.in_(industries))
+        if date_from:
+            query = query.where(FinancialData.date >= date_from)
+        if date_to:
+            query = query.where(FinancialData.date <= date_to)
+        if cursor:
+            cursor_date, cursor_company_id = cursor
+            query = query.where(or_(FinancialData.date < cursor_date,
+                                    and_(FinancialData.date == cursor_date, FinancialData.company_id < cursor_company_id)))
+        query = query.order_by(FinancialData.date.desc(), FinancialData.company_id.desc())
+
+        # Find where this page ends with an index-only probe, so the headers can go out before the rows are streamed:
+        # the page's last key (next cursor) and whether one more row follows it.
+        bounds = db.execute(query.with_only_columns(FinancialData.date, FinancialData.company_id)
+                            .offset(limit - 1).limit(2)).fetchall()
+        has_more = len(bounds) > 1
+        page = query
+        if bounds:
+            # Stream up to and including that key rather than `limit` rows: a bar ingested between the two reads
+            # then lands on this page instead of pushing its last row past the cursor (skipped) or before it (repeated).
+            last_date, last_company_id = bounds[0]
+            page = query.where(or_(FinancialData.date > last_date,
+                                   and_(FinancialData.date == last_date, FinancialData.company_id >= last_company_id)))
+
+        def items():
+            for row in iter_rows(db, page):
+                item = {field: getattr(row, field) for field in fields}
+                if 'date' in item:
+                    item['date'] = item['date'].isoformat()
+                yield item
+
+        response = stream_json(items(), on_close=db.close)
+        streaming = True
+        if has_more:
+            next_cursor = encode_cursor(*bounds[0])
+            next_args = request.args.to_dict(flat=False)  # keeps every repeated industry=
+            next_args['cursor'] = next_cursor
+            response.headers['X-Next-Cursor'] = next_cursor
+            response.headers['Link'] = f'<{url_for(request.endpoint, **next_args)}>; rel="next"'
+        return response, 200
     except Exception as e:
         print(f"Error fetching all financial data: {e}")
         return jsonify({"error": "Failed to fetch all financial data"}), 500
+    finally:
+        if not streaming:
+            db.close()
+
+@data_routes_bp.route('/industries', methods=['GET'])
+def get_industries():
+    """Every industry with a listed company, for the dashboard's industry filter."""
+    db: Session = get_read_db()
+    try:
+        industries = db.execute(select(Company.industry).where(Company.industry.is_not(None))
+                                .distinct().order_by(Company.industry)).scalars().all()
+        return jsonify(industries)
+    except Exception as e:
+        print(f"Error fetching industries: {e}")
+        return jsonify({"error": "Failed to fetch industries"}), 500
     finally:
         db.close()
 
 @data_routes_bp.route('/companies/<int:company_id>/financials', methods=['GET'])
 def get_company_financial_data(company_id):
     period = request.args.get('period', 'daily')
-    db: Session = get_db()
+    db: Session = get_read_db()
+    streaming = False
     try:
         if period == 'daily':
-            financial_data_query = db.query(data_model.FinancialData).filter(data_model.FinancialData.company_id == company_id).all()
-            print(f"Daily financial data query in route: {[item.date for item in financial_data_query]}") # Log dates
-            financial_data = [{"date": item.date.strftime('%Y-%m-%d'), "open": item.open, "close": item.close, "volume": item.volume}
-                              for item in financial_data_query]
-            return jsonify(financial_data)
+            # Every bar the company has: streamed off the cursor rather than materialized.
+            query = select(FinancialData.date, FinancialData.open, FinancialData.close, FinancialData.volume)\
+                .where(FinancialData.company_id == company_id).order_by(FinancialData.date)
+            items = ({"date": row.date.strftime('%Y-%m-%d'), "open": row.open, "close": row.close, "volume": row.volume}
+                     for row in iter_rows(db, query))
+            streaming = True
+            return stream_json(items, on_close=db.close)
         elif period == 'weekly':
             weekly_data = data_service.get_weekly_financial_data(db, company_id)
             print(f"Weekly financial data query in route: {[item.week for item in weekly_data]}") # Log weeks
@@ -141,6 +214,24 @@ def get_company_financial_data(company_id):
             return jsonify(financial_data)
         else:
             return jsonify({"error": "Invalid period"}), 400
+    finally:
+        if not streaming:
+            db.close()
+
+@data_routes_bp.route('/stats', methods=['GET'])
+@conditional('rolling-stats', company_arg=None)
+def get_company_stats():
+    """
+    52-week high/low, 1d/1w/1m/YTD returns and 1-month average volume per company, maintained on ingest
+    (rolling_stats_service), so this never scans price history: /api/data/stats?company_ids=1,2,3
+    """
+    try:
+        company_ids = [int(value) for value in parse_csv_param(request.args.get('company_ids'))]
+    except ValueError:
+        return jsonify({'error': "company_ids must be a comma-separated list of integers"}), 400
+    db: Session = get_read_db()
+    try:
+        return jsonify(get_rolling_stats(db, company_ids)), 200
     finally:
         db.close()
 
@@ -0,0 +1,65 @@
+# backend/routes/event_routes.py
+# Server-Sent Events endpoint for the dashboard (see backend/services/event_service.py).
+from flask import Blueprint, Response, jsonify, request, session, stream_with_context
+
+from backend.services.event_service import EVENT_HEARTBEAT_SECONDS, EVENT_TYPES, broker, format_sse
+from backend.utils.auth_utils import permission_required
+from backend.utils.data_utils import parse_csv_param
+
+event_routes_bp = Blueprint('events', __name__, url_prefix='/api/events')
+
+RETRY_MILLISECONDS = 5000  # EventSource reconnect delay
+ANONYMOUS_EVENT_TYPES = ('bar',)  # public like the dashboard feed; the rest needs a login (like /api/llm/sentiment)
+
+
+@event_routes_bp.route('/stream')
+def stream_events():
+    """
+    text/event-stream of per-company deltas: `bar` (newest bar after an ingest), `snapshot` (refreshed company
+    info) and `sentiment` (fresh news sentiment report). `types` narrows the stream; reconnecting clients send
+    Last-Event-ID and get the events they missed. A `resync` event means the client fell behind and lost events.
+    Anonymous clients only get ANONYMOUS_EVENT_TYPES.
+    """
+    requested = parse_csv_param(request.args.get('types'))
+    event_types = requested or list(EVENT_TYPES)
+    unknown = [event_type for event_type in event_types if event_type not in EVENT_TYPES]
+    if unknown:
+        return jsonify({'error': f"Unknown event types: {', '.join(unknown)}"}), 400
+    if session.get('user_id') is None:
+        if requested and any(event_type not in ANONYMOUS_EVENT_TYPES for event_type in requested):
+            return jsonify({'error': 'Authentication required'}), 401
+        event_types = [event_type for event_type in event_types if event_type in ANONYMOUS_EVENT_TYPES]
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    try:
+        last_event_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        last_event_id = None
+    subscription = broker.subscribe(event_types, last_event_id)
+    if subscription is None:
+        response = jsonify({'error': "Too many event stream subscribers, retry later."})
+        response.headers['Retry-After'] = str(RETRY_MILLISECONDS // 1000)
+        return response, 503
+
+    def generate():
+        try:
+            yield f"retry: {RETRY_MILLISECONDS}\n\n"
+            while not subscription.closed:
+                event = subscription.get(timeout=EVENT_HEARTBEAT_SECONDS)
+                dropped = subscription.take_dropped()
+                if dropped:
+                    yield f"event: resync\ndata: {{\"dropped\": {dropped}}}\n\n"
+                yield format_sse(event) if event is not None else ": keep-alive\n\n"
+        finally:
+            broker.unsubscribe(subscription)
+
+    response = Response(stream_with_context(generate()), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'  # don't let a reverse proxy buffer the stream
+    return response
+
+
+@event_routes_bp.route('/stats')
+@permission_required('admin')
+def get_event_stats():
+    """Subscribers and event counts for this worker."""
+    return jsonify(broker.stats()), 200
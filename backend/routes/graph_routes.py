@@ -1,28 +1,45 @@
 # backend/routes/graph_routes.py
-from flask import Blueprint, jsonify, request
-from backend.database import get_db
+from flask import Blueprint, current_app, jsonify, request
+from backend import database
+from backend.database import get_read_db
+from backend.services.graph_service import (
+    MAX_COMPARE_COMPANIES, NORMALIZE_MODES, get_comparison_series, graph_cache, graph_cache_key, graph_cache_stats
+)
+from backend.services.watermark_service import get_cached_watermark
+from backend.utils.auth_utils import permission_required
+from backend.utils.data_utils import parse_csv_param, parse_int_param
+from backend.utils.downsampling import DOWNSAMPLE_METHODS, MAX_POINTS, MIN_POINTS, downsample_records
+from backend.utils.http_cache import conditional
+from backend.utils import wire_format
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 from datetime import datetime, timedelta
+import numpy as np
 
 graph_routes_bp = Blueprint('graph', __name__, url_prefix='/api/graph')
 
+GRAPH_FIELDS = ['date', 'close', 'volume']
+
 def fetch_graph_data(db: Session, company_id: int, timeframe: str):
     print(f"[DEBUG] fetch_graph_data: company_id={company_id}, timeframe={timeframe}")
     where_clause = ""
+    params = {'company_id': company_id}
     date_column = "date"  # Assuming your daily data table has a 'date' column
 
     today = datetime.now()
 
     if timeframe == 'weekly':
         seven_days_ago = today - timedelta(days=7)
-        where_clause = f"AND date >= '{seven_days_ago.strftime('%Y-%m-%d')}'"
+        where_clause = "AND date >= :start_date"
+        params['start_date'] = seven_days_ago.strftime('%Y-%m-%d')
     elif timeframe == 'monthly':
         thirty_days_ago = today - timedelta(days=30)  # Approximate month
-        where_clause = f"AND date >= '{thirty_days_ago.strftime('%Y-%m-%d')}'"
+        where_clause = "AND date >= :start_date"
+        params['start_date'] = thirty_days_ago.strftime('%Y-%m-%d')
     elif timeframe == 'yearly':
         one_year_ago = today - timedelta(days=365)
-        where_clause = f"AND date >= '{one_year_ago.strftime('%Y-%m-%d')}'"
+        where_clause = "AND date >= :start_date"
+        params['start_date'] = one_year_ago.strftime('%Y-%m-%d')
     elif timeframe == 'max':
         pass  # No date filtering for max
     else:
@@ -38,7 +55,7 @@ def fetch_graph_data(db: Session, company_id: int, timeframe: str):
     """)
     print(f"[DEBUG] fetch_graph_data: Executing query: {query} with company_id={company_id}")
     try:
-        result = db.execute(query, params={'company_id': company_id}).fetchall()
+        result = db.execute(query, params=params).fetchall()
         data = []
         for row in result:
             data_point = {
@@ -55,15 +72,83 @@ def fetch_graph_data(db: Session, company_id: int, timeframe: str):
         return None, error_message
 
 @graph_routes_bp.route('/company/<int:company_id>/<string:timeframe>')
+@conditional('graph')
 def get_company_graph_data(company_id, timeframe):
     print(f"[DEBUG] get_company_graph_data: company_id={company_id}, timeframe={timeframe}")
-    db = get_db()
     try:
-        data, error = fetch_graph_data(db, company_id, timeframe)
+        points = parse_int_param(request.args.get('points'), None, MIN_POINTS, MAX_POINTS, 'points')
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    method = request.args.get('downsample', 'lttb')
+    if method not in DOWNSAMPLE_METHODS:
+        return jsonify({'error': f"downsample must be one of {', '.join(DOWNSAMPLE_METHODS)}"}), 400
+    mimetype = wire_format.negotiate(request.accept_mimetypes)
+    watermark = get_cached_watermark(database.get_read_session_local(), company_id)
+    cache_key = graph_cache_key(company_id, timeframe, watermark['version'] if watermark else 0, points, method, mimetype)
+    body = graph_cache.get(cache_key, tag=company_id)
+    if body is None:
+        db = get_read_db()
+        try:
+            data, error = fetch_graph_data(db, company_id, timeframe)
+        finally:
+            db.close()
         if error:
             print(f"[DEBUG] get_company_graph_data: Returning error: {error}")
             return jsonify({'error': error}), 400
+        if points:
+            data = downsample_records(data, points, method)
         print(f"[DEBUG] get_company_graph_data: Returning {len(data)} data points")
-        return jsonify(data), 200
+        body = wire_format.encode(data, mimetype, GRAPH_FIELDS, current_app.json.dumps)
+        graph_cache.set(cache_key, body, tag=company_id)
+    response = current_app.response_class(body, mimetype=mimetype)
+    response.vary.add('Accept')
+    return response, 200
+
+@graph_routes_bp.route('/compare')
+@conditional('graph-compare', company_arg=None)
+def get_comparison_graph_data():
+    """
+    Closing prices of several companies aligned on date, for comparison charts:
+    /api/graph/compare?company_ids=1,2,3&timeframe=yearly&normalize=rebase
+    One query for all companies. JSON responses are {"date": [...], "series": {"<company_id>": [...]}};
+    the binary wire formats carry a 'date' column plus one column per company id.
+    """
+    try:
+        company_ids = list(dict.fromkeys(int(value) for value in parse_csv_param(request.args.get('company_ids'))))
+    except ValueError:
+        return jsonify({'error': "company_ids must be a comma-separated list of integers"}), 400
+    if not company_ids or len(company_ids) > MAX_COMPARE_COMPANIES:
+        return jsonify({'error': f"company_ids must list 1 to {MAX_COMPARE_COMPANIES} companies"}), 400
+    timeframe = request.args.get('timeframe', 'yearly')
+    normalize = request.args.get('normalize', 'none')
+    if normalize not in NORMALIZE_MODES:
+        return jsonify({'error': f"normalize must be one of {', '.join(NORMALIZE_MODES)}"}), 400
+    mimetype = wire_format.negotiate(request.accept_mimetypes)
+    db = get_read_db()
+    try:
+        columns = get_comparison_series(db, company_ids, timeframe, normalize)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+    if mimetype in (wire_format.ROWS_JSON, wire_format.COLUMNAR_JSON):
+        dates = columns.pop('date')
+        response = jsonify({
+            'timeframe': timeframe,
+            'normalize': normalize,
+            'company_ids': company_ids,
+            'date': wire_format.json_list(dates),
+            'series': {company_id: wire_format.json_list(values) for company_id, values in columns.items()},
+            'missing': [int(company_id) for company_id, values in columns.items() if np.isnan(values).all()],
+        })
+        response.mimetype = mimetype
+    else:
+        response = current_app.response_class(wire_format.encode_columns(columns, mimetype), mimetype=mimetype)
+    response.vary.add('Accept')
+    return response, 200
+
+@graph_routes_bp.route('/cache/stats')
+@permission_required('admin')
+def get_graph_cache_stats():
+    """Hit ratio and memory use of the graph response cache (this worker, plus the shared tier if enabled)."""
+    return jsonify(graph_cache_stats()), 200
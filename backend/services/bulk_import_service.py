@@ -0,0 +1,292 @@
+# backend/services/bulk_import_service.py
+# Bulk import of vendor price dumps (CSV or Parquet) into financial_data.
+# Streams the file in chunks, maps tickers to company_id once, and loads through the fastest native path:
+#   MySQL  -> LOAD DATA LOCAL INFILE (falls back to multi-row INSERT IGNORE via executemany)
+#   SQLite -> executemany of INSERT OR IGNORE inside one transaction, under bulk_load_mode pragmas
+# Duplicate (company_id, date) bars are skipped by the uq_financial_data_company_date key; the import refuses to
+# run without it (add it to an existing table with `python -m backend.services.bulk_import_service --add-unique-key`).
+import csv
+import logging
+import os
+import tempfile
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import pandas as pd
+from sqlalchemy import bindparam, create_engine, inspect, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from backend import database
+from backend.models.data_model import Company, FinancialData
+from backend.services import rolling_stats_service, watermark_service
+from backend.utils import metrics
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 100_000
+INGESTED_ROWS = metrics.counter('ingested_rows_total', "Rows written by ingestion.", ['kind'])  # shared with data_service
+PRICE_COLUMNS = ['company_id', 'date', 'open', 'high', 'low', 'close', 'volume']
+UNIQUE_BAR_KEY = 'uq_financial_data_company_date'
+# Accepted header names (case-insensitive) for each canonical column of a vendor file.
+COLUMN_ALIASES = {
+    'ticker': ['ticker', 'ticker_symbol', 'symbol'],
+    'date': ['date', 'trade_date', 'timestamp'],
+    'open': ['open'],
+    'high': ['high'],
+    'low': ['low'],
+    'close': ['close', 'adj_close'],
+    'volume': ['volume', 'vol'],
+}
+
+
+class TickerCache:
+    """Ticker -> company_id lookup loaded with one query and reused for every chunk."""
+
+    def __init__(self, engine: Engine, create_missing: bool = False):
+        self.engine = engine
+        self.create_missing = create_missing
+        with engine.connect() as connection:
+            rows = connection.execute(text("SELECT ticker_symbol, company_id FROM companies")).fetchall()
+        self.ids: Dict[str, int] = {ticker.upper(): company_id for ticker, company_id in rows}
+        self.unknown: set = set()
+
+    def resolve(self, tickers, connection: Connection) -> Dict[str, int]:
+        """
+        Returns the mapping for the given tickers, creating companies first when create_missing is set.
+        New companies are inserted on the loader's own connection so SQLite's single writer is never contended.
+        """
+        missing = {ticker for ticker in tickers if ticker not in self.ids and ticker not in self.unknown}
+        if missing and self.create_missing:
+            companies = Company.__table__
+            connection.execute(companies.insert(), [{'company_name': ticker, 'ticker_symbol': ticker} for ticker in sorted(missing)])
+            rows = connection.execute(
+                text("SELECT ticker_symbol, company_id FROM companies WHERE ticker_symbol IN :tickers")
+                .bindparams(bindparam('tickers', expanding=True)), {'tickers': sorted(missing)}).fetchall()
+            self.ids.update({ticker.upper(): company_id for ticker, company_id in rows})
+            logger.info(f"Created {len(rows)} companies for unknown tickers.")
+        elif missing:
+            self.unknown.update(missing)
+        return self.ids
+
+
+def _resolve_columns(columns) -> Dict[str, str]:
+    lookup = {str(column).strip().lower(): column for column in columns}
+    mapping = {}
+    for canonical, aliases in COLUMN_ALIASES.items():
+        for alias in aliases:
+            if alias in lookup:
+                mapping[lookup[alias]] = canonical
+                break
+        else:
+            if canonical != 'volume':
+                raise ValueError(f"Price file has no '{canonical}' column (accepted: {aliases})")
+    return mapping
+
+
+def iter_price_chunks(path: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[pd.DataFrame]:
+    """Streams a CSV (optionally compressed) or Parquet price file as DataFrames of at most chunk_size rows."""
+    if path.lower().endswith(('.parquet', '.pq')):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("Parquet imports need pyarrow (`pip install pyarrow`).") from e
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunk_size)
+
+
+def normalize_chunk(df: pd.DataFrame, tickers: TickerCache, connection: Connection) -> Tuple[List[tuple], int]:
+    """Maps a raw vendor chunk to (company_id, date, open, high, low, close, volume) tuples. Vectorized per column."""
+    df = df.rename(columns=_resolve_columns(df.columns))
+    symbols = df['ticker'].astype(str).str.strip().str.upper()
+    ids = tickers.resolve(symbols.unique(), connection)
+    out = pd.DataFrame({'company_id': symbols.map(ids)})
+    out['date'] = pd.to_datetime(df['date'], errors='coerce').dt.strftime('%Y-%m-%d')
+    for column in ('open', 'high', 'low', 'close'):
+        out[column] = pd.to_numeric(df[column], errors='coerce').round(2)
+    if 'volume' in df:
+        out['volume'] = pd.to_numeric(df['volume'], errors='coerce').round().astype('Int64')
+    else:
+        out['volume'] = pd.array([None] * len(df), dtype='Int64')
+
+    valid = out['company_id'].notna() & out['date'].notna()
+    skipped = int((~valid).sum())
+    out = out[valid]
+    out['company_id'] = out['company_id'].astype('int64')
+    out = out.astype(object).where(out.notna(), None)
+    return list(out[PRICE_COLUMNS].itertuples(index=False, name=None)), skipped
+
+
+def has_unique_bar_key(engine: Engine) -> bool:
+    """True when financial_data has a unique key on exactly (company_id, date), whatever its name."""
+    inspector = inspect(engine)
+    table = FinancialData.__tablename__
+    keys = inspector.get_unique_constraints(table) + [index for index in inspector.get_indexes(table) if index.get('unique')]
+    return any(list(key['column_names']) == ['company_id', 'date'] for key in keys)
+
+
+def add_unique_bar_key(engine: Engine) -> int:
+    """
+    Migration for databases created before the key existed: deletes duplicate bars (keeping the most recently
+    inserted row of each company and date), then adds uq_financial_data_company_date. Returns rows deleted.
+    """
+    if has_unique_bar_key(engine):
+        logger.info(f"financial_data already has {UNIQUE_BAR_KEY}.")
+        return 0
+    with engine.begin() as connection:
+        if engine.dialect.name == 'mysql':
+            # MySQL cannot delete from a table it selects from in a subquery, so join the table to itself.
+            deleted = connection.execute(text(
+                "DELETE older FROM financial_data older JOIN financial_data newer "
+                "ON newer.company_id = older.company_id AND newer.date = older.date AND newer.data_id > older.data_id"
+            )).rowcount
+            connection.execute(text(f"ALTER TABLE financial_data ADD UNIQUE KEY {UNIQUE_BAR_KEY} (company_id, date)"))
+        else:
+            deleted = connection.execute(text(
+                "DELETE FROM financial_data WHERE data_id NOT IN "
+                "(SELECT MAX(data_id) FROM financial_data GROUP BY company_id, date)"
+            )).rowcount
+            connection.execute(text(f"CREATE UNIQUE INDEX {UNIQUE_BAR_KEY} ON financial_data (company_id, date)"))
+    logger.info(f"Deleted {deleted} duplicate bars and added {UNIQUE_BAR_KEY}.")
+    return deleted
+
+
+def _load_sqlite(engine: Engine, chunks: Callable[[Connection], Iterator[List[tuple]]]) -> int:
+    statement = ("INSERT OR IGNORE INTO financial_data (company_id, date, open, high, low, close, volume, created_at, updated_at) "
+                 "VALUES (?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)")
+    loaded = 0
+    with engine.connect() as connection, database.bulk_load_mode(connection):
+        for rows in chunks(connection):
+            loaded += connection.exec_driver_sql(statement, rows).rowcount
+        connection.commit()  # one transaction for the whole file
+    return loaded
+
+
+def _local_infile_engine(engine: Engine) -> Engine:
+    driver = engine.url.get_driver_name()
+    connect_args = {'allow_local_infile': True} if driver == 'mysqlconnector' else {'local_infile': True}
+    return create_engine(engine.url, connect_args=connect_args)
+
+
+def _server_allows_local_infile(engine: Engine) -> bool:
+    with engine.connect() as connection:
+        row = connection.execute(text("SHOW GLOBAL VARIABLES LIKE 'local_infile'")).fetchone()
+    return bool(row) and str(row[1]).upper() in ('ON', '1')
+
+
+def _load_mysql_infile(engine: Engine, chunks: Callable[[Connection], Iterator[List[tuple]]]) -> int:
+    infile_engine = _local_infile_engine(engine)
+    loaded = 0
+    try:
+        with infile_engine.connect() as connection:
+            for rows in chunks(connection):
+                with tempfile.NamedTemporaryFile('w', suffix='.csv', newline='', delete=False) as chunk_file:
+                    csv.writer(chunk_file, lineterminator='\n').writerows(
+                        ['\\N' if value is None else value for value in row] for row in rows)
+                try:
+                    result = connection.exec_driver_sql(
+                        f"LOAD DATA LOCAL INFILE '{chunk_file.name}' IGNORE INTO TABLE financial_data "
+                        "FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '\"' LINES TERMINATED BY '\\n' "
+                        "(company_id, date, open, high, low, close, volume) SET created_at = NOW(), updated_at = NOW()")
+                    connection.commit()
+                    loaded += result.rowcount
+                finally:
+                    os.remove(chunk_file.name)
+    finally:
+        infile_engine.dispose()
+    return loaded
+
+
+def _load_mysql_executemany(engine: Engine, chunks: Callable[[Connection], Iterator[List[tuple]]]) -> int:
+    # The MySQL drivers rewrite executemany of a single INSERT ... VALUES into multi-row statements.
+    statement = ("INSERT IGNORE INTO financial_data (company_id, date, open, high, low, close, volume, created_at, updated_at) "
+                 "VALUES (%s, %s, %s, %s, %s, %s, %s, NOW(), NOW())")
+    loaded = 0
+    with engine.connect() as connection:
+        for rows in chunks(connection):
+            result = connection.exec_driver_sql(statement, rows)
+            connection.commit()
+            loaded += max(result.rowcount, 0)
+    return loaded
+
+
+def import_prices(path: str, engine: Optional[Engine] = None, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                  method: str = 'auto', create_missing: bool = False) -> Dict[str, Any]:
+    """
+    Imports a vendor price file into financial_data.
+    method: 'auto' (best native path for the backend), 'infile' (MySQL LOAD DATA), or 'executemany'.
+    Returns import statistics: rows read/loaded/skipped, unknown tickers and throughput.
+    """
+    engine = engine or database.get_engine()
+    if not has_unique_bar_key(engine):
+        # Without the key the IGNORE inserts below would silently duplicate every bar already stored.
+        raise RuntimeError(f"financial_data has no unique (company_id, date) key; run "
+                           f"`python -m backend.services.bulk_import_service --add-unique-key` first.")
+    started = time.perf_counter()
+    tickers = TickerCache(engine, create_missing=create_missing)
+    stats: Dict[str, Any] = {'rows_read': 0, 'rows_skipped': 0}
+    touched_company_ids = set()
+
+    def normalized_chunks(connection: Connection):
+        for chunk in iter_price_chunks(path, chunk_size):
+            rows, skipped = normalize_chunk(chunk, tickers, connection)
+            stats['rows_read'] += len(chunk)
+            stats['rows_skipped'] += skipped
+            touched_company_ids.update(row[0] for row in rows)
+            if rows:
+                yield rows
+
+    dialect = engine.dialect.name
+    if dialect == 'sqlite':
+        loaded = _load_sqlite(engine, normalized_chunks)
+    elif dialect == 'mysql':
+        use_infile = method != 'executemany' and _server_allows_local_infile(engine)
+        if method == 'infile' and not use_infile:
+            raise ValueError("The MySQL server has local_infile disabled; use method='executemany'.")
+        if use_infile:
+            loaded = _load_mysql_infile(engine, normalized_chunks)
+        else:
+            logger.info("LOAD DATA LOCAL INFILE unavailable; loading with multi-row INSERT.")
+            loaded = _load_mysql_executemany(engine, normalized_chunks)
+    else:
+        raise ValueError(f"Bulk import is not supported for the {dialect} backend")
+
+    elapsed = time.perf_counter() - started
+    INGESTED_ROWS.labels('price').inc(loaded)
+    database.note_primary_write()
+    with Session(engine) as session:
+        # A vendor file may hold bars older than the stored rolling statistics, which only move forward, so
+        # rebuild them first; the incremental update run by the bump then has nothing left to fold.
+        rolling_stats_service.update_rolling_stats(session, touched_company_ids, rebuild=True)
+        watermark_service.bump_watermarks(session, touched_company_ids)
+    stats.update({
+        'rows_loaded': loaded,
+        'rows_duplicate': stats['rows_read'] - stats['rows_skipped'] - loaded,
+        'unknown_tickers': sorted(tickers.unknown),
+        'seconds': round(elapsed, 3),
+        'rows_per_minute': int(stats['rows_read'] / elapsed * 60) if elapsed else None,
+    })
+    logger.info(f"Bulk import of {path}: {stats}")
+    return stats
+
+
+if __name__ == '__main__':
+    import argparse
+
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Bulk import a CSV/Parquet price dump into financial_data.")
+    parser.add_argument('path', nargs='?')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument('--method', choices=['auto', 'infile', 'executemany'], default='auto')
+    parser.add_argument('--create-missing', action='store_true', help="Create companies for unknown tickers.")
+    parser.add_argument('--add-unique-key', action='store_true',
+                        help=f"Delete duplicate bars and add {UNIQUE_BAR_KEY} to an existing financial_data table.")
+    args = parser.parse_args()
+    if args.add_unique_key:
+        print(f"Deleted {add_unique_bar_key(database.get_engine())} duplicate bars.")
+    if args.path:
+        print(import_prices(args.path, chunk_size=args.chunk_size, method=args.method, create_missing=args.create_missing))
+    elif not args.add_unique_key:
+        parser.error("a price file path is required")
@@ -1,11 +1,14 @@
 # backend/services/data_service.py
-from sqlalchemy import func
+from sqlalchemy import and_, func, select
 import yfinance as yf
 from sqlalchemy.orm import Session
 from backend import database
-from backend.models import Company, FinancialData, News
+from backend.services import watermark_service
+from backend.utils import metrics
+from backend.utils.instrumentation import upstream_call
+from backend.models import Company, FinancialData, News, NewsArchive
 from datetime import date, datetime, time, timedelta
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Iterable, Optional, Tuple
 import logging
 import pandas as pd
 import os
@@ -14,6 +17,8 @@ import pytz
 
 logging.basicConfig(level=logging.INFO)
 
+INGESTED_ROWS = metrics.counter('ingested_rows_total', "Rows written by ingestion.", ['kind'])
+
 #Basic financial Data Retrieval logic
 def fetch_financial_data(ticker: str, period: str = None, start: Optional[date] = None, end: Optional[date] = None, retries: int = 3, delay: float = 5, db: Optional[Session] = None, company_id: Optional[int] = None) -> Optional[List[Dict[str, Any]]]:
     """Fetches historical OHLCV data from yfinance with retry and storage logic."""
@@ -24,9 +29,11 @@ def fetch_financial_data(ticker: str, period: str = None, start: Optional[date]
     for attempt in range(retries):
         try:
             if period and not start and not end:
-                data = yf.download(ticker, period=period)
+                with upstream_call('yfinance'):
+                    data = yf.download(ticker, period=period)
             elif start and end and not period:
-                data = yf.download(ticker, start=start.strftime('%Y-%m-%d'), end=end.strftime('%Y-%m-%d'))
+                with upstream_call('yfinance'):
+                    data = yf.download(ticker, start=start.strftime('%Y-%m-%d'), end=end.strftime('%Y-%m-%d'))
             else:
                 logging.error(f"Invalid parameters for fetch_financial_data. Must provide either 'period' or both 'start' and 'end'.")
                 return None
@@ -107,6 +114,9 @@ def store_fetched_financial_data(db: Session, company_id: int, data_list: List[D
         try:
             db.flush() # Flush to batch inserts if needed
             db.commit()
+            database.note_primary_write()
+            watermark_service.bump_watermarks(db, [company_id])
+            INGESTED_ROWS.labels('price').inc(added_count)
             logging.info(f"Added {added_count} new financial records for company {company_id}.")
         except Exception as e:
             logging.error(f"Error committing financial data to the database: {e}")
@@ -121,13 +131,15 @@ def fetch_historical_fundamentals(ticker: str, years: int = 5) -> Optional[Dict[
     print(f"[DEBUG]-fetch_historical_fundamentals: Fetching historical fundamentals for {ticker} for the last {years} years.")
     try:
         tk = yf.Ticker(ticker)
-        historical_prices = tk.history(period=f"{years}y")
+        with upstream_call('yfinance'):
+            historical_prices = tk.history(period=f"{years}y")
         #print(f"[DEBUG]-fetch_historical_fundamentals: Fetched Historical Prices:\n{historical_prices.head().to_string()}")
         #print(f"[DEBUG]-fetch_historical_fundamentals: Attributes of yf.Ticker('{ticker}'): {dir(tk)}")
 
-        income_statement = tk.income_stmt
-        balance_sheet = tk.balance_sheet
-        cashflow = tk.cashflow
+        with upstream_call('yfinance'):
+            income_statement = tk.income_stmt
+            balance_sheet = tk.balance_sheet
+            cashflow = tk.cashflow
 
         #print(f"[DEBUG]-fetch_historical_fundamentals: Fetched Income Statement:\n{income_statement.head().to_string()}")
         #print(f"[DEBUG]-fetch_historical_fundamentals: Income Statement Index:\n{income_statement.index.to_list()}")
@@ -232,8 +244,8 @@ def fetch_historical_fundamentals(ticker: str, years: int = 5) -> Optional[Dict[
     except Exception as e:
         print(f"[DEBUG]-fetch_historical_fundamentals: ERROR fetching historical fundamental data for {ticker}: {e}")
         return {}     
-def _store_historical_fundamentals(db: Session, company: Company, fundamental_data_map: Dict[date, Dict[str, Any]]):
-    """Internal function to store historical fundamental data with detailed debugging."""
+def _store_historical_fundamentals(db: Session, company: Company, fundamental_data_map: Dict[date, Dict[str, Any]]) -> int:
+    """Internal function to store historical fundamental data with detailed debugging. Commits and bumps the company's watermark when anything changed; returns the records updated."""
     print(f"[DEBUG]-store_historical_fundamentals: Internal function: Storing historical fundamentals for {company.ticker_symbol}")
     updated_fundamentals_count = 0
     for fund_date, fund_values in fundamental_data_map.items():
@@ -364,8 +376,19 @@ def _store_historical_fundamentals(db: Session, company: Company, fundamental_da
 
     if updated_fundamentals_count > 0:
         print(f"[DEBUG]-store_historical_fundamentals: INFO: Updated {updated_fundamentals_count} fundamental data points for {company.ticker_symbol}.")
+        try:
+            # Commit and bump here, not at the caller's batch commit, so conditional GETs of the
+            # company's financial summary stop answering 304 with the old fundamentals.
+            db.commit()
+            database.note_primary_write()
+            watermark_service.bump_watermarks(db, [company.company_id])
+        except Exception as e:
+            logging.error(f"Error committing updated fundamental data for {company.ticker_symbol}: {e}")
+            db.rollback()
+            return 0
     else:
         print(f"[DEBUG]-store_historical_fundamentals: INFO: No new fundamental data to store for {company.ticker_symbol}.")
+    return updated_fundamentals_count
 
 #Store BOTH BASIC & HISTORICAL FINANCIAL DATA logic
 def store_financial_data(db: Session, ticker: str, period: str = "5y") -> bool:
@@ -373,7 +396,8 @@ def store_financial_data(db: Session, ticker: str, period: str = "5y") -> bool:
     logging.debug(f"Storing financial data for ticker: {ticker}")
     company = database.get_company_by_ticker(db, ticker)
     if not company:
-        company_info = yf.Ticker(ticker).info
+        with upstream_call('yfinance'):
+            company_info = yf.Ticker(ticker).info
         if company_info:
             company_data = {
                 "ticker_symbol": company_info.get("symbol"),
@@ -496,7 +520,9 @@ def store_financial_data(db: Session, ticker: str, period: str = "5y") -> bool:
 
             try:
                 db.commit()
+                database.note_primary_write()
                 if updated_fundamentals_count > 0:
+                    watermark_service.bump_watermarks(db, [company.company_id])
                     logging.info(f"Updated {updated_fundamentals_count} fundamental data points for {ticker}.")
                 else:
                     logging.info(f"No fundamental data updates needed for {ticker}.")
@@ -524,12 +550,34 @@ def needs_financial_data_update(db: Session, company_id: int, threshold_hours: i
     return data_date_sgt < now_sgt
 
 #Company NEWS retrieval
+def get_latest_bars(db: Session, company_ids: Optional[Iterable[int]] = None) -> List[Dict[str, Any]]:
+    """
+    Latest bar of every company (or of `company_ids`) in one round trip: a grouped MAX(date) per company joined
+    back to financial_data on the (company_id, date) unique key, so cost does not grow with a query per company.
+    """
+    latest = select(FinancialData.company_id, func.max(FinancialData.date).label('max_date'))
+    if company_ids is not None:
+        latest = latest.where(FinancialData.company_id.in_(list(company_ids)))
+    latest = latest.group_by(FinancialData.company_id).subquery()
+    query = select(FinancialData.company_id, Company.ticker_symbol, Company.company_name, Company.industry, FinancialData.date,
+                   FinancialData.open, FinancialData.high, FinancialData.low, FinancialData.close, FinancialData.volume)\
+        .join(latest, and_(FinancialData.company_id == latest.c.company_id, FinancialData.date == latest.c.max_date))\
+        .join(Company, Company.company_id == FinancialData.company_id)\
+        .order_by(Company.ticker_symbol)
+    results = []
+    for row in db.execute(query):
+        item = dict(row._mapping)
+        item['date'] = item['date'].isoformat()
+        results.append(item)
+    return results
+
 def fetch_company_news(ticker: str, company_name: str = "", count: int = 5) -> List[Dict[str, Any]]:
     """Fetches the latest news for a specific company using yfinance."""
     logging.info(f"Fetching company news for {ticker}...")
     try:
         ticker_data = yf.Ticker(ticker)
-        news = ticker_data.news
+        with upstream_call('yfinance'):
+            news = ticker_data.news
         logging.info(f"Raw company news data for {ticker}: {news}")
         if news:
             # Limit the number of news items
@@ -576,7 +624,8 @@ def fetch_industry_news(industry: str, count: int = 3) -> List[Dict[str, Any]]:
             'page-size': count
         }
         print(f"DEBUG: Fetching industry news for '{industry}' using The Guardian API with params: {params}")
-        response = requests.get(guardian_endpoint, params=params)
+        with upstream_call('guardian'):
+            response = requests.get(guardian_endpoint, params=params)
         print(f"DEBUG: The Guardian API response status code: {response.status_code}")
         response.raise_for_status()
         data = response.json()
@@ -632,9 +681,15 @@ def store_news_articles(db: Session, company_id: int, news_articles: List[Dict[s
     logging.info(f"Storing {len(news_articles)} {news_type} news articles for company ID: {company_id}") 
     news_items_to_add = []
 
-    # Check for duplicates before adding
-    existing_urls = {news.link for news in db.query(
-        News.link).filter(News.company_id == company_id).all()}
+    # Check for duplicates before adding. Only the incoming URLs are looked up (hot table and archive),
+    # so the check doesn't grow with the company's news history.
+    incoming_urls = [article.get('url') for article in news_articles if article.get('url')]
+    existing_urls = set()
+    if incoming_urls:
+        existing_urls = {news.link for news in db.query(News.link).filter(
+            News.company_id == company_id, News.link.in_(incoming_urls)).all()}
+        existing_urls |= {news.link for news in db.query(NewsArchive.link).filter(
+            NewsArchive.company_id == company_id, NewsArchive.link.in_(incoming_urls)).all()}
 
     for article in news_articles:
         # Skip if URL already exists in the database
@@ -672,6 +727,8 @@ def store_news_articles(db: Session, company_id: int, news_articles: List[Dict[s
         try:
             db.add_all(news_items_to_add)
             db.commit()
+            database.note_primary_write()
+            INGESTED_ROWS.labels('news').inc(len(news_items_to_add))
             logging.info(f"Successfully added {len(news_items_to_add)} new news articles.")
         except Exception as db_error:
             logging.error(f"Database error when adding articles: {db_error}")
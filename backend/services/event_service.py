@@ -0,0 +1,256 @@
+# backend/services/event_service.py
+# Push channel for the dashboard: an in-process broker that fans events (new bar, refreshed company snapshot,
+# fresh sentiment report) out to Server-Sent Events subscribers. Each subscriber has a bounded buffer; a slow
+# client loses its oldest events and is told to resync instead of holding memory.
+# With EVENT_LOG_PATH set, events go through a SQLite file shared by the workers on the host (a local pub/sub
+# stand-in): every worker tails it, so an ingest committed by one worker reaches clients connected to another.
+import itertools
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Iterable, List, Optional
+
+from backend import database
+from backend.services import watermark_service
+from backend.services.data_service import get_latest_bars
+from backend.utils import metrics
+from backend.utils.json_provider import dumps
+
+logger = logging.getLogger(__name__)
+
+EVENT_QUEUE_SIZE = int(os.environ.get('EVENT_QUEUE_SIZE') or 256)  # per subscriber
+EVENT_REPLAY_SIZE = int(os.environ.get('EVENT_REPLAY_SIZE') or 1024)  # recent events kept for Last-Event-ID
+EVENT_MAX_SUBSCRIBERS = int(os.environ.get('EVENT_MAX_SUBSCRIBERS') or 1000)  # per worker
+EVENT_HEARTBEAT_SECONDS = float(os.environ.get('EVENT_HEARTBEAT_SECONDS') or 15)
+# SQLite file shared by all workers on the host; unset keeps events inside the publishing process.
+EVENT_LOG_PATH = os.environ.get('EVENT_LOG_PATH')
+EVENT_LOG_MAX_ROWS = int(os.environ.get('EVENT_LOG_MAX_ROWS') or 10000)
+EVENT_POLL_SECONDS = float(os.environ.get('EVENT_POLL_SECONDS') or 0.5)
+EVENT_TYPES = ('bar', 'snapshot', 'sentiment')
+
+
+class Subscription:
+    """One client's bounded event buffer. Overflow drops the oldest event and counts it."""
+
+    def __init__(self, maxsize: int, event_types: Optional[Iterable[str]] = None):
+        self.maxsize = maxsize
+        self.event_types = set(event_types) if event_types else None
+        self.dropped = 0
+        self.closed = False
+        self._events: deque = deque()
+        self._condition = threading.Condition()
+
+    def wants(self, event: Dict[str, Any]) -> bool:
+        return self.event_types is None or event['type'] in self.event_types
+
+    def put(self, event: Dict[str, Any]) -> None:
+        with self._condition:
+            if len(self._events) >= self.maxsize:
+                self._events.popleft()
+                self.dropped += 1
+            self._events.append(event)
+            self._condition.notify()
+
+    def get(self, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Next event, or None after `timeout` seconds without one (or once closed)."""
+        with self._condition:
+            self._condition.wait_for(lambda: self._events or self.closed, timeout)
+            return self._events.popleft() if self._events else None
+
+    def take_dropped(self) -> int:
+        with self._condition:
+            dropped, self.dropped = self.dropped, 0
+            return dropped
+
+    def close(self) -> None:
+        with self._condition:
+            self.closed = True
+            self._condition.notify_all()
+
+
+class SQLiteEventLog:
+    """Append-only event table in a SQLite file; row ids are the event ids seen by every worker."""
+
+    def __init__(self, path: str, max_rows: int = EVENT_LOG_MAX_ROWS):
+        self.path = path
+        self.max_rows = max_rows
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._connection().execute("CREATE TABLE IF NOT EXISTS events ("
+                                   "id INTEGER PRIMARY KEY AUTOINCREMENT, type TEXT NOT NULL, data TEXT NOT NULL, "
+                                   "created_at REAL NOT NULL)")
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def append(self, event_type: str, data: str) -> int:
+        connection = self._connection()
+        event_id = connection.execute("INSERT INTO events (type, data, created_at) VALUES (?, ?, ?)",
+                                      (event_type, data, time.time())).lastrowid
+        if event_id % 500 == 0:
+            connection.execute("DELETE FROM events WHERE id <= ?", (event_id - self.max_rows,))
+        return event_id
+
+    def since(self, last_id: int, limit: int = 1000) -> List[Dict[str, Any]]:
+        rows = self._connection().execute("SELECT id, type, data, created_at FROM events WHERE id > ? ORDER BY id LIMIT ?",
+                                          (last_id, limit)).fetchall()
+        return [{'id': row[0], 'type': row[1], 'data': row[2], 'time': row[3]} for row in rows]
+
+    def last_id(self) -> int:
+        return self._connection().execute("SELECT COALESCE(MAX(id), 0) FROM events").fetchone()[0]
+
+
+class EventBroker:
+    """
+    Fans published events out to subscribers. Without a log, publish() dispatches directly; with one, it only
+    appends, and a poller thread per worker dispatches whatever any worker appended.
+    """
+
+    def __init__(self, queue_size: int = EVENT_QUEUE_SIZE, replay_size: int = EVENT_REPLAY_SIZE,
+                 max_subscribers: int = EVENT_MAX_SUBSCRIBERS, log: Optional[SQLiteEventLog] = None,
+                 poll_seconds: float = EVENT_POLL_SECONDS):
+        self.queue_size = queue_size
+        self.max_subscribers = max_subscribers
+        self.log = log
+        self.poll_seconds = poll_seconds
+        self.published = self.delivered = 0
+        self._subscribers: List[Subscription] = []
+        self._recent: deque = deque(maxlen=replay_size)
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._last_seen = 0
+        self._poller: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def has_audience(self) -> bool:
+        """Whether anyone could receive an event published now (any worker, when the log is shared)."""
+        return self.log is not None or bool(self._subscribers)
+
+    def publish(self, event_type: str, data: Any) -> Optional[int]:
+        """Publishes an event and returns its id (None if it could not be written to the shared log)."""
+        payload = dumps(data)
+        self.published += 1
+        if self.log is None:
+            event = {'id': next(self._ids), 'type': event_type, 'data': payload, 'time': time.time()}
+            self._dispatch(event)
+            return event['id']
+        try:
+            return self.log.append(event_type, payload)
+        except sqlite3.Error as e:
+            logger.error(f"Could not append {event_type} event to {self.log.path}: {e}")
+            return None
+
+    def _dispatch(self, event: Dict[str, Any], from_log: bool = False) -> None:
+        with self._lock:
+            self._recent.append(event)
+            if from_log:
+                self._last_seen = event['id']
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            if subscription.wants(event):
+                subscription.put(event)
+                self.delivered += 1
+
+    def subscribe(self, event_types: Optional[Iterable[str]] = None,
+                  last_event_id: Optional[int] = None) -> Optional[Subscription]:
+        """New subscription (None when the worker is at max_subscribers), replaying events after last_event_id."""
+        subscription = Subscription(self.queue_size, event_types)
+        if self.log is not None:
+            self._ensure_poller()
+        with self._lock:
+            if len(self._subscribers) >= self.max_subscribers:
+                return None
+            # Events dispatched from here on reach the subscription live; earlier ones come from the replay.
+            self._subscribers.append(subscription)
+            replayed_up_to = self._last_seen
+            replay = [event for event in self._recent if last_event_id is not None and event['id'] > last_event_id]
+        if self.log is not None and last_event_id is not None:
+            replay = [event for event in self.log.since(last_event_id) if event['id'] <= replayed_up_to]
+        for event in replay:
+            if subscription.wants(event):
+                subscription.put(event)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscription.close()
+        with self._lock:
+            if subscription in self._subscribers:
+                self._subscribers.remove(subscription)
+
+    def poll_once(self) -> int:
+        """Dispatches events appended to the shared log since the last poll. Returns how many."""
+        events = self.log.since(self._last_seen)
+        for event in events:
+            self._dispatch(event, from_log=True)
+        return len(events)
+
+    def _poll(self) -> None:
+        while not self._stop.wait(self.poll_seconds):
+            try:
+                self.poll_once()
+            except sqlite3.Error as e:
+                logger.warning(f"Event log poll failed: {e}")
+
+    def _ensure_poller(self) -> None:
+        with self._lock:
+            if self._poller is not None:
+                return
+            self._last_seen = self.log.last_id()  # new subscribers only see events from now on
+            self._poller = threading.Thread(target=self._poll, name='event-log-poller', daemon=True)
+            self._poller.start()
+
+    def close(self) -> None:
+        self._stop.set()
+        with self._lock:
+            subscribers, self._subscribers = self._subscribers, []
+        for subscription in subscribers:
+            subscription.close()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            subscribers = list(self._subscribers)
+        return {
+            'subscribers': len(subscribers),
+            'max_subscribers': self.max_subscribers,
+            'queue_size': self.queue_size,
+            'published': self.published,  # by this worker
+            'delivered': self.delivered,  # to this worker's subscribers
+            'dropped_pending': sum(subscription.dropped for subscription in subscribers),
+            'shared_log': self.log.path if self.log is not None else None,
+        }
+
+
+def format_sse(event: Dict[str, Any]) -> str:
+    """One event in text/event-stream framing. `data` is already JSON (a single line)."""
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {event['data']}\n\n"
+
+
+broker = EventBroker(log=SQLiteEventLog(EVENT_LOG_PATH) if EVENT_LOG_PATH else None)
+metrics.callback('event_stream_subscribers', "Open event streams in this worker.",
+                 lambda: [({}, len(broker._subscribers))])
+metrics.callback('events_published_total', "Events published by this worker.", lambda: [({}, broker.published)], 'counter')
+
+
+def publish_latest_bars(company_ids: List[int]) -> None:
+    """Bump listener: publishes the newest bar of each company whose price data was just written."""
+    if not broker.has_audience():
+        return
+    db = database.get_session_local()()
+    try:
+        for start in range(0, len(company_ids), watermark_service.BUMP_BATCH_SIZE):
+            for bar in get_latest_bars(db, company_ids[start:start + watermark_service.BUMP_BATCH_SIZE]):
+                broker.publish('bar', bar)
+    finally:
+        db.close()
+
+
+watermark_service.add_bump_listener(publish_latest_bars)
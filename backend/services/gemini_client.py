@@ -0,0 +1,159 @@
+# backend/services/gemini_client.py
+# Shared Gemini client for the LLM services:
+#   - genai.configure() runs once per API key and GenerativeModel handles are kept per model name, instead of
+#     being rebuilt on every analysis;
+#   - every call takes one of GEMINI_MAX_CONCURRENCY slots (routes and batches together), so a batch cannot
+#     exhaust the project's quota while users are waiting on single reports;
+#   - generate_iter/analyze_many run a list of prompts concurrently with a per-request timeout, so a batch takes
+#     about as long as its slowest call rather than the sum of all of them.
+# Calls are timed through upstream_call('gemini') and their tokens counted in llm_tokens_total.
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import google.generativeai as genai
+
+from backend.utils import metrics
+from backend.utils.instrumentation import upstream_call
+
+logger = logging.getLogger(__name__)
+
+GEMINI_MAX_CONCURRENCY = int(os.environ.get('GEMINI_MAX_CONCURRENCY') or 16)  # calls in flight per process
+GEMINI_TIMEOUT_SECONDS = float(os.environ.get('GEMINI_TIMEOUT_SECONDS') or 60)  # per call, including the wait for a slot
+
+LLM_TOKENS = metrics.counter('llm_tokens_total', "Tokens used by LLM calls, by model and kind (prompt, output).",
+                             ['model', 'kind'])
+GEMINI_IN_FLIGHT = metrics.gauge('gemini_calls_in_flight', "Gemini calls holding a concurrency slot in this worker.")
+
+
+class LLMResponse:
+    """Outcome of one call: the response text, or the error that replaced it, plus token counts and latency."""
+    __slots__ = ('text', 'error', 'prompt_tokens', 'output_tokens', 'seconds')
+
+    def __init__(self, text: Optional[str] = None, error: Optional[BaseException] = None, prompt_tokens: int = 0,
+                 output_tokens: int = 0, seconds: float = 0.0):
+        self.text = text
+        self.error = error
+        self.prompt_tokens = prompt_tokens
+        self.output_tokens = output_tokens
+        self.seconds = seconds
+
+
+class RateLimiter:
+    """Spaces calls at least 60 / per_minute seconds apart across threads (per_minute <= 0: no limit)."""
+
+    def __init__(self, per_minute: float):
+        self.interval = 60.0 / per_minute if per_minute > 0 else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def _response_text(response: Any) -> Optional[str]:
+    if response and response.parts and response.parts[0].text:
+        return response.parts[0].text.strip()
+    return None
+
+
+class GeminiClient:
+    def __init__(self, api_key: Optional[str] = None, max_concurrency: int = GEMINI_MAX_CONCURRENCY,
+                 timeout: float = GEMINI_TIMEOUT_SECONDS):
+        self._api_key = api_key
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._lock = threading.Lock()
+        self._configured_key: Optional[str] = None
+        self._models: Dict[str, Any] = {}
+
+    @property
+    def api_key(self) -> Optional[str]:
+        return self._api_key or os.environ.get('GOOGLE_API_KEY')
+
+    def model(self, name: str):
+        """The GenerativeModel for `name`, built once (and again only if the API key changes)."""
+        api_key = self.api_key
+        if not api_key:
+            raise RuntimeError("GOOGLE_API_KEY environment variable not set.")
+        with self._lock:
+            if api_key != self._configured_key:
+                genai.configure(api_key=api_key)
+                self._configured_key = api_key
+                self._models.clear()
+            handle = self._models.get(name)
+            if handle is None:
+                handle = self._models[name] = genai.GenerativeModel(name)
+            return handle
+
+    def generate(self, prompt: str, model: str, timeout: Optional[float] = None) -> LLMResponse:
+        """
+        One call, waiting for a free slot first. Errors (including timeouts) are returned in LLMResponse.error
+        rather than raised, so one failed prompt of a batch does not hide the others.
+        """
+        timeout = timeout or self.timeout
+        started = time.perf_counter()
+        if not self._slots.acquire(timeout=timeout):
+            return LLMResponse(error=TimeoutError(f"No Gemini slot free within {timeout}s"),
+                               seconds=time.perf_counter() - started)
+        GEMINI_IN_FLIGHT.inc()
+        try:
+            handle = self.model(model)
+            remaining = max(1.0, timeout - (time.perf_counter() - started))
+            with upstream_call('gemini'):
+                response = handle.generate_content([prompt], request_options={'timeout': remaining})
+                response.resolve()
+            metadata = getattr(response, 'usage_metadata', None)
+            prompt_tokens = getattr(metadata, 'prompt_token_count', 0) or 0
+            output_tokens = getattr(metadata, 'candidates_token_count', 0) or 0
+            LLM_TOKENS.labels(model, 'prompt').inc(prompt_tokens)
+            LLM_TOKENS.labels(model, 'output').inc(output_tokens)
+            return LLMResponse(text=_response_text(response), prompt_tokens=prompt_tokens,
+                               output_tokens=output_tokens, seconds=time.perf_counter() - started)
+        except Exception as e:
+            logger.warning(f"Gemini call to {model} failed: {e}")
+            return LLMResponse(error=e, seconds=time.perf_counter() - started)
+        finally:
+            GEMINI_IN_FLIGHT.dec()
+            self._slots.release()
+
+    def generate_iter(self, prompts: Sequence[str], model: str, timeout: Optional[float] = None,
+                      max_concurrency: Optional[int] = None, rate_per_minute: float = 0
+                      ) -> Iterator[Tuple[int, LLMResponse]]:
+        """
+        Runs the prompts concurrently (at most max_concurrency at once, default: all the client allows) and yields
+        (index, response) as each finishes, in the caller's thread. rate_per_minute > 0 spaces the call starts.
+        """
+        if not prompts:
+            return
+        limiter = RateLimiter(rate_per_minute)
+
+        def call(prompt: str) -> LLMResponse:
+            limiter.wait()
+            return self.generate(prompt, model, timeout)
+
+        workers = min(len(prompts), max_concurrency or self.max_concurrency)
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='gemini') as pool:
+            futures = {pool.submit(call, prompt): index for index, prompt in enumerate(prompts)}
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+
+    def analyze_many(self, prompts: Sequence[str], model: str, timeout: Optional[float] = None,
+                     max_concurrency: Optional[int] = None, rate_per_minute: float = 0) -> List[LLMResponse]:
+        """generate_iter, collected in the order of `prompts`."""
+        responses: List[Optional[LLMResponse]] = [None] * len(prompts)
+        for index, response in self.generate_iter(prompts, model, timeout, max_concurrency, rate_per_minute):
+            responses[index] = response
+        return responses
+
+
+client = GeminiClient()
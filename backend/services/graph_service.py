@@ -0,0 +1,98 @@
+# backend/services/graph_service.py
+# Response cache for the company graph endpoint. Every user opening a company page asks for the same
+# (company_id, timeframe) series, so the serialized JSON is cached per data version and dropped as soon as
+# ingestion bumps that company's watermark.
+# Also builds the multi-company comparison series (one IN query, aligned on date with pandas).
+import os
+from datetime import date, timedelta
+from typing import Any, Dict, Hashable, List, Optional
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from backend.models.data_model import FinancialData
+from backend.services import watermark_service
+from backend.utils import metrics
+from backend.utils.response_cache import LRUResponseCache, SQLiteSharedCache, TieredResponseCache
+
+GRAPH_CACHE_MAX_ENTRIES = int(os.environ.get('GRAPH_CACHE_MAX_ENTRIES') or 1024)
+GRAPH_CACHE_MAX_BYTES = int(os.environ.get('GRAPH_CACHE_MAX_BYTES') or 64 * 1024 * 1024)
+# Path of a SQLite file shared by all workers on the host; unset keeps the cache per process.
+GRAPH_CACHE_SHARED_PATH = os.environ.get('GRAPH_CACHE_SHARED_PATH')
+GRAPH_CACHE_SHARED_MAX_BYTES = int(os.environ.get('GRAPH_CACHE_SHARED_MAX_BYTES') or 256 * 1024 * 1024)
+
+graph_cache = TieredResponseCache(
+    LRUResponseCache(max_entries=GRAPH_CACHE_MAX_ENTRIES, max_bytes=GRAPH_CACHE_MAX_BYTES),
+    SQLiteSharedCache(GRAPH_CACHE_SHARED_PATH, max_bytes=GRAPH_CACHE_SHARED_MAX_BYTES) if GRAPH_CACHE_SHARED_PATH else None,
+)
+watermark_service.add_bump_listener(graph_cache.invalidate_tags)
+
+
+def _local_cache_stat(key: str):
+    return lambda: [({'cache': 'graph'}, graph_cache.local.stats()[key])]
+
+
+metrics.callback('response_cache_entries', "Entries in this worker's response cache.", _local_cache_stat('entries'))
+metrics.callback('response_cache_bytes', "Bytes held by this worker's response cache.", _local_cache_stat('bytes'))
+metrics.callback('response_cache_hits_total', "Response cache hits in this worker.", _local_cache_stat('hits'), 'counter')
+metrics.callback('response_cache_misses_total', "Response cache misses in this worker.", _local_cache_stat('misses'),
+                 'counter')
+
+
+def graph_cache_key(company_id: int, timeframe: str, version: int, *variant: Any) -> Hashable:
+    """
+    Cache key of one graph response. The date is part of the key because the weekly/monthly/yearly
+    windows are relative to today; `variant` carries any other request options that change the body.
+    """
+    return (company_id, timeframe, version, date.today().isoformat()) + tuple(variant)
+
+
+def graph_cache_stats() -> Dict[str, Any]:
+    return graph_cache.stats()
+
+
+COMPARE_TIMEFRAME_DAYS = {'weekly': 7, 'monthly': 30, 'yearly': 365, 'max': None}  # same windows as the graph route
+MAX_COMPARE_COMPANIES = int(os.environ.get('MAX_COMPARE_COMPANIES') or 25)
+NORMALIZE_MODES = ('none', 'rebase')
+
+
+def fetch_aligned_closes(db: Session, company_ids: List[int], timeframe: str) -> pd.DataFrame:
+    """
+    Closing prices of several companies in one query, as a frame indexed by date (union of all trading days)
+    with one float column per company id, in the order asked for. Days a company has no bar are NaN.
+    """
+    if timeframe not in COMPARE_TIMEFRAME_DAYS:
+        raise ValueError(f"timeframe must be one of {', '.join(COMPARE_TIMEFRAME_DAYS)}")
+    query = select(FinancialData.company_id, FinancialData.date, FinancialData.close) \
+        .where(FinancialData.company_id.in_(company_ids))
+    days = COMPARE_TIMEFRAME_DAYS[timeframe]
+    if days is not None:
+        query = query.where(FinancialData.date >= date.today() - timedelta(days=days))
+    frame = pd.DataFrame(db.execute(query).all(), columns=['company_id', 'date', 'close'])
+    closes = frame.pivot(index='date', columns='company_id', values='close') if not frame.empty \
+        else pd.DataFrame(index=pd.Index([], name='date'))
+    return closes.reindex(columns=company_ids).sort_index().astype(np.float64)
+
+
+def rebase(closes: pd.DataFrame, base: float = 100.0) -> pd.DataFrame:
+    """Scales each column so its first available close equals `base`."""
+    first = closes.bfill().iloc[0] if len(closes) else pd.Series(np.nan, index=closes.columns)
+    return (closes / first.replace(0, np.nan) * base).round(4)
+
+
+def comparison_columns(closes: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """Aligned frame -> wire_format columns: 'date' plus one column per company id."""
+    columns = {'date': np.array(list(closes.index), dtype='datetime64[D]')}
+    for company_id in closes.columns:
+        columns[str(company_id)] = closes[company_id].to_numpy(dtype=np.float64)
+    return columns
+
+
+def get_comparison_series(db: Session, company_ids: List[int], timeframe: str,
+                          normalize: Optional[str] = None) -> Dict[str, np.ndarray]:
+    closes = fetch_aligned_closes(db, company_ids, timeframe)
+    if normalize == 'rebase':
+        closes = rebase(closes)
+    return comparison_columns(closes)
@@ -0,0 +1,136 @@
+# backend/services/news_refresh_service.py
+# Stale-while-revalidate news for the company pages: requests are answered from the `news` table and, when
+# the stored news is older than NEWS_STALE_AFTER_SECONDS, a background refresh (Yahoo Finance + Guardian)
+# is queued on a small thread pool. At most one refresh per company runs at a time.
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from backend import database
+from backend.models.data_model import Company, News
+from backend.services.data_service import fetch_latest_news, store_news_articles
+from backend.utils import metrics
+
+logger = logging.getLogger(__name__)
+
+NEWS_STALE_AFTER_SECONDS = int(os.environ.get('NEWS_STALE_AFTER_SECONDS') or 3600)
+NEWS_REFRESH_WORKERS = int(os.environ.get('NEWS_REFRESH_WORKERS') or 2)
+COMPANY_NEWS_COUNT = 5
+INDUSTRY_NEWS_COUNT = 3
+INDUSTRY_PREFIX = '[INDUSTRY] '  # store_news_articles marks industry articles with this title prefix
+_SOURCES = {'theguardian.com': 'The Guardian', 'yahoo.com': 'Yahoo Finance'}
+
+_executor = ThreadPoolExecutor(max_workers=NEWS_REFRESH_WORKERS, thread_name_prefix='news-refresh')
+_lock = threading.Lock()
+_in_flight: Dict[int, Future] = {}
+_last_refresh: Dict[int, float] = {}  # company_id -> time.monotonic() of the last refresh this worker ran
+metrics.callback('news_refresh_in_flight', "Background news refreshes queued or running in this worker.",
+                 lambda: [({}, len(_in_flight))])
+
+
+def _source_name(link: Optional[str]) -> Optional[str]:
+    for domain, name in _SOURCES.items():
+        if link and domain in link:
+            return name
+    return None
+
+
+def _to_article(news: News) -> Dict[str, Any]:
+    """Stored row in the shape fetch_latest_news returns, so the page renders both the same way."""
+    title = news.title or ''
+    return {
+        'title': title[len(INDUSTRY_PREFIX):] if title.startswith(INDUSTRY_PREFIX) else title,
+        'description': news.summary,
+        'url': news.link,
+        'publishedAt': news.published_date.isoformat() if news.published_date else None,
+        'source': {'name': _source_name(news.link)},
+    }
+
+
+def get_stored_company_news(db: Session, company_id: int, company_count: int = COMPANY_NEWS_COUNT,
+                            industry_count: int = INDUSTRY_NEWS_COUNT) -> Dict[str, Any]:
+    """
+    Newest stored company and industry articles from one indexed query, plus when the news was last stored.
+    Reads a bounded window of the newest rows, which is plenty to fill both lists.
+    """
+    rows = db.query(News).filter(News.company_id == company_id).order_by(
+        News.published_date.desc(), News.news_id.desc()).limit((company_count + industry_count) * 4).all()
+    company_news = [row for row in rows if not (row.title or '').startswith(INDUSTRY_PREFIX)][:company_count]
+    industry_news = [row for row in rows if (row.title or '').startswith(INDUSTRY_PREFIX)][:industry_count]
+    stored_at = max((row.created_at for row in rows if row.created_at), default=None)
+    return {
+        'company_news': [_to_article(row) for row in company_news],
+        'industry_news': [_to_article(row) for row in industry_news],
+        'stored_at': stored_at,
+    }
+
+
+def is_stale(company_id: int, stored_at: Optional[datetime], max_age_seconds: int = NEWS_STALE_AFTER_SECONDS) -> bool:
+    """Stale when neither this worker's last refresh nor the newest stored article is within max_age_seconds."""
+    with _lock:
+        last_refresh = _last_refresh.get(company_id)
+    if last_refresh is not None and time.monotonic() - last_refresh < max_age_seconds:
+        return False
+    return stored_at is None or (datetime.now() - stored_at).total_seconds() >= max_age_seconds
+
+
+def refresh_company_news(company_id: int) -> bool:
+    """Fetches live news for the company and stores what is new. Runs on its own session (worker thread)."""
+    db = database.get_session_local()()
+    try:
+        company = db.query(Company).filter(Company.company_id == company_id).first()
+        if company is None:
+            return False
+        company_news, industry_news = fetch_latest_news(
+            company.ticker_symbol, company.industry, company.exchange, company.company_name)
+        store_news_articles(db, company_id, company_news, news_type="company")
+        store_news_articles(db, company_id, industry_news, news_type="industry")
+        logger.info(f"Background news refresh for {company.ticker_symbol}: fetched {len(company_news)} company "
+                    f"and {len(industry_news)} industry articles.")
+        return True
+    except Exception as e:
+        logger.error(f"Background news refresh failed for company {company_id}: {e}")
+        db.rollback()
+        return False
+    finally:
+        db.close()
+        with _lock:
+            _last_refresh[company_id] = time.monotonic()
+            _in_flight.pop(company_id, None)
+
+
+def schedule_refresh(company_id: int) -> Optional[Future]:
+    """Queues a background refresh unless one is already running for the company. Returns its future."""
+    with _lock:
+        if company_id in _in_flight:
+            return _in_flight[company_id]
+        future = _executor.submit(refresh_company_news, company_id)
+        _in_flight[company_id] = future
+        return future
+
+
+def get_company_news(db: Session, company_id: int, max_age_seconds: int = NEWS_STALE_AFTER_SECONDS) -> Dict[str, Any]:
+    """
+    Stored news for the company page. Never waits on the upstream APIs: if the stored news is stale a refresh
+    is queued and the response says so (`refreshing`), the next page view picks up the new articles.
+    """
+    news = get_stored_company_news(db, company_id)
+    stored_at = news.pop('stored_at')
+    news['refreshing'] = False
+    if is_stale(company_id, stored_at, max_age_seconds):
+        news['refreshing'] = schedule_refresh(company_id) is not None
+    news['news_updated_at'] = stored_at.isoformat() if stored_at else None
+    return news
+
+
+def wait_for_refreshes(timeout: Optional[float] = None) -> List[Any]:
+    """Blocks until the currently queued refreshes finish (CLI/tests)."""
+    with _lock:
+        futures = list(_in_flight.values())
+    return [future.result(timeout=timeout) for future in futures]
@@ -0,0 +1,89 @@
+# backend/services/news_retention_service.py
+# Keeps the hot `news` table bounded: articles older than NEWS_RETENTION_DAYS, or beyond the newest
+# NEWS_MAX_PER_COMPANY for a company, are moved into `news_archive` with zlib-compressed summaries.
+import logging
+import os
+import zlib
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from backend.models.data_model import News, NewsArchive
+
+logger = logging.getLogger(__name__)
+
+NEWS_RETENTION_DAYS = int(os.environ.get('NEWS_RETENTION_DAYS') or 90)
+NEWS_MAX_PER_COMPANY = int(os.environ.get('NEWS_MAX_PER_COMPANY') or 200)
+COMPACTION_BATCH_SIZE = 500
+
+
+def compress_summary(summary: Optional[str]) -> Optional[bytes]:
+    return zlib.compress(summary.encode('utf-8'), 9) if summary is not None else None
+
+
+def decompress_summary(blob: Optional[bytes]) -> Optional[str]:
+    return zlib.decompress(blob).decode('utf-8') if blob is not None else None
+
+
+def _expired_news_ids(db: Session, company_id: int, max_age_days: int, max_per_company: int, now: datetime) -> List[int]:
+    """Ids of the company's articles that are past the age limit or beyond the per-company cap."""
+    published = func.coalesce(News.published_date, News.created_at)
+    too_old = db.query(News.news_id).filter(
+        News.company_id == company_id, published < now - timedelta(days=max_age_days))
+    over_cap = db.query(News.news_id).filter(News.company_id == company_id).order_by(
+        News.published_date.desc(), News.news_id.desc()).offset(max_per_company)
+    return sorted({row[0] for row in too_old} | {row[0] for row in over_cap})
+
+
+def compact_company_news(db: Session, company_id: int, max_age_days: int = NEWS_RETENTION_DAYS,
+                         max_per_company: int = NEWS_MAX_PER_COMPANY, now: Optional[datetime] = None) -> int:
+    """Moves a company's expired articles to news_archive. Returns the number of archived rows."""
+    expired_ids = _expired_news_ids(db, company_id, max_age_days, max_per_company, now or datetime.now())
+    for start in range(0, len(expired_ids), COMPACTION_BATCH_SIZE):
+        batch_ids = expired_ids[start:start + COMPACTION_BATCH_SIZE]
+        articles = db.query(News).filter(News.news_id.in_(batch_ids)).all()
+        db.add_all([NewsArchive(
+            news_id=article.news_id,
+            company_id=article.company_id,
+            title=article.title,
+            link=article.link,
+            published_date=article.published_date,
+            summary_compressed=compress_summary(article.summary),
+        ) for article in articles])
+        db.query(News).filter(News.news_id.in_(batch_ids)).delete(synchronize_session=False)
+    if expired_ids:
+        db.commit()
+        logger.info(f"Archived {len(expired_ids)} news articles for company {company_id}.")
+    return len(expired_ids)
+
+
+def compact_news(db: Session, max_age_days: int = NEWS_RETENTION_DAYS, max_per_company: int = NEWS_MAX_PER_COMPANY,
+                 now: Optional[datetime] = None) -> Dict[str, Any]:
+    """Runs retention for every company that has news. Each company is committed separately."""
+    now = now or datetime.now()
+    company_ids = [row[0] for row in db.query(News.company_id).distinct().all()]
+    archived = {}
+    for company_id in company_ids:
+        try:
+            count = compact_company_news(db, company_id, max_age_days, max_per_company, now)
+            if count:
+                archived[company_id] = count
+        except Exception as e:
+            logger.error(f"Error compacting news for company {company_id}: {e}")
+            db.rollback()
+    return {'companies': len(company_ids), 'archived': sum(archived.values()), 'by_company': archived}
+
+
+def get_archived_news(db: Session, company_id: int, limit: int = 20, offset: int = 0) -> List[Dict[str, Any]]:
+    """Reads archived articles for a company (newest first) with their summaries decompressed."""
+    rows = db.query(NewsArchive).filter(NewsArchive.company_id == company_id).order_by(
+        NewsArchive.published_date.desc()).offset(offset).limit(limit).all()
+    return [{
+        'news_id': row.news_id,
+        'title': row.title,
+        'link': row.link,
+        'published_date': row.published_date.isoformat() if row.published_date else None,
+        'summary': decompress_summary(row.summary_compressed),
+    } for row in rows]
@@ -0,0 +1,275 @@
+# backend/services/partition_service.py
+# Year partitioning and cold archiving for financial_data.
+# Partition DDL only applies to MySQL; archive/restore works on any backend (SQLite in dev/test).
+import csv
+import gzip
+import logging
+import os
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from backend.models.data_model import FinancialData
+from backend.services import watermark_service
+
+logger = logging.getLogger(__name__)
+
+PARTITIONED_TABLE = FinancialData.__tablename__
+ARCHIVE_DIR = os.environ.get('FINANCIAL_DATA_ARCHIVE_DIR') or os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'db', 'archive')
+ARCHIVE_CHUNK_SIZE = 5000
+CATCH_ALL_PARTITION = 'pmax'
+
+# Column order of the archive files (the header row is written too, so files stay self-describing).
+ARCHIVE_COLUMNS = [column.name for column in FinancialData.__table__.columns]
+_DATE_COLUMNS = {'date'}
+_DATETIME_COLUMNS = {'created_at', 'updated_at'}
+_INT_COLUMNS = {'data_id', 'company_id', 'volume'}
+
+
+def partition_name(year: int) -> str:
+    """Name of the partition holding the rows of `year` (e.g. p2024)."""
+    return f"p{year}"
+
+
+def _is_mysql(db: Session) -> bool:
+    return db.get_bind().dialect.name == 'mysql'
+
+
+def _partition_clause(year: int) -> str:
+    return f"PARTITION {partition_name(year)} VALUES LESS THAN ({year + 1})"
+
+
+def build_partitioning_ddl(first_year: int, last_year: int) -> str:
+    """Builds the ALTER TABLE statement that range-partitions financial_data by YEAR(date)."""
+    if first_year > last_year:
+        raise ValueError("first_year must not be after last_year")
+    clauses = [_partition_clause(year) for year in range(first_year, last_year + 1)]
+    clauses.append(f"PARTITION {CATCH_ALL_PARTITION} VALUES LESS THAN MAXVALUE")
+    return f"ALTER TABLE {PARTITIONED_TABLE} PARTITION BY RANGE (YEAR(date)) (\n    " + ",\n    ".join(clauses) + "\n)"
+
+
+def build_add_partitions_ddl(years: List[int]) -> str:
+    """Builds the statement that splits new year partitions off the catch-all partition."""
+    clauses = [_partition_clause(year) for year in sorted(years)]
+    clauses.append(f"PARTITION {CATCH_ALL_PARTITION} VALUES LESS THAN MAXVALUE")
+    return (f"ALTER TABLE {PARTITIONED_TABLE} REORGANIZE PARTITION {CATCH_ALL_PARTITION} INTO (\n    "
+            + ",\n    ".join(clauses) + "\n)")
+
+
+def list_partitions(db: Session) -> List[Dict[str, Any]]:
+    """Lists the partitions of financial_data with their row estimates (empty when not partitioned)."""
+    if not _is_mysql(db):
+        return []
+    rows = db.execute(text("""
+        SELECT PARTITION_NAME, PARTITION_DESCRIPTION, TABLE_ROWS
+        FROM information_schema.PARTITIONS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table AND PARTITION_NAME IS NOT NULL
+        ORDER BY PARTITION_ORDINAL_POSITION
+    """), {'table': PARTITIONED_TABLE}).fetchall()
+    return [{'name': row[0], 'less_than': row[1], 'rows': row[2]} for row in rows]
+
+
+def is_partitioned(db: Session) -> bool:
+    return bool(list_partitions(db))
+
+
+def enable_partitioning(db: Session, first_year: Optional[int] = None, years_ahead: int = 1) -> bool:
+    """
+    Converts financial_data into yearly RANGE partitions on MySQL.
+    Drops the company_id foreign key and widens the primary key to (data_id, date), as MySQL requires.
+    Returns False (and does nothing) on other backends or when the table is already partitioned.
+    """
+    if not _is_mysql(db):
+        logger.info(f"Partitioning skipped: {db.get_bind().dialect.name} does not support table partitions.")
+        return False
+    if is_partitioned(db):
+        logger.info(f"{PARTITIONED_TABLE} is already partitioned.")
+        return False
+
+    current_year = date.today().year
+    if first_year is None:
+        min_date = db.execute(text(f"SELECT MIN(date) FROM {PARTITIONED_TABLE}")).scalar()
+        first_year = min_date.year if min_date else current_year
+    last_year = current_year + years_ahead
+
+    foreign_keys = db.execute(text("""
+        SELECT CONSTRAINT_NAME FROM information_schema.REFERENTIAL_CONSTRAINTS
+        WHERE CONSTRAINT_SCHEMA = DATABASE() AND TABLE_NAME = :table
+    """), {'table': PARTITIONED_TABLE}).fetchall()
+    for (constraint_name,) in foreign_keys:
+        logger.info(f"Dropping foreign key {constraint_name} (not supported on partitioned tables).")
+        db.execute(text(f"ALTER TABLE {PARTITIONED_TABLE} DROP FOREIGN KEY {constraint_name}"))
+    db.execute(text(f"ALTER TABLE {PARTITIONED_TABLE} DROP PRIMARY KEY, ADD PRIMARY KEY (data_id, date)"))
+    db.execute(text(build_partitioning_ddl(first_year, last_year)))
+    db.commit()
+    logger.info(f"Partitioned {PARTITIONED_TABLE} by year from {first_year} to {last_year}.")
+    return True
+
+
+def ensure_future_partitions(db: Session, years_ahead: int = 1) -> List[str]:
+    """Makes sure a partition exists for the current year and the next `years_ahead` years."""
+    partitions = list_partitions(db)
+    if not partitions:
+        return []
+    existing = {p['name'] for p in partitions}
+    last_year = date.today().year + years_ahead
+    existing_years = [int(name[1:]) for name in existing if name != CATCH_ALL_PARTITION]
+    start_year = max(existing_years) + 1 if existing_years else date.today().year
+    missing = [year for year in range(start_year, last_year + 1) if partition_name(year) not in existing]
+    if not missing:
+        return []
+    db.execute(text(build_add_partitions_ddl(missing)))
+    db.commit()
+    created = [partition_name(year) for year in missing]
+    logger.info(f"Created partitions {created} on {PARTITIONED_TABLE}.")
+    return created
+
+
+def archive_path(year: int, archive_dir: Optional[str] = None) -> str:
+    return os.path.join(archive_dir or ARCHIVE_DIR, f"{PARTITIONED_TABLE}_{year}.csv.gz")
+
+
+def _year_bounds(year: int):
+    return date(year, 1, 1), date(year, 12, 31)
+
+
+def archive_year(db: Session, year: int, archive_dir: Optional[str] = None, detach: bool = True) -> Dict[str, Any]:
+    """
+    Exports all financial_data rows of `year` to a gzip-compressed CSV file and (by default) removes them
+    from the table. On a partitioned MySQL table the rows are removed with TRUNCATE PARTITION.
+    """
+    path = archive_path(year, archive_dir)
+    if os.path.exists(path):
+        raise FileExistsError(f"Archive for {year} already exists: {path}")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    start, end = _year_bounds(year)
+
+    table = FinancialData.__table__
+    query = (table.select()
+             .where(table.c.date >= start, table.c.date <= end)
+             .order_by(table.c.company_id, table.c.date)
+             .execution_options(yield_per=ARCHIVE_CHUNK_SIZE))
+    row_count = 0
+    company_ids = set()
+    tmp_path = path + '.tmp'
+    with gzip.open(tmp_path, 'wt', newline='', compresslevel=9) as archive_file:
+        writer = csv.writer(archive_file)
+        writer.writerow(ARCHIVE_COLUMNS)
+        for row in db.execute(query):
+            writer.writerow(['' if value is None else _format_value(value) for value in row])
+            company_ids.add(row.company_id)
+            row_count += 1
+    os.replace(tmp_path, path)
+    logger.info(f"Archived {row_count} {PARTITIONED_TABLE} rows for {year} to {path}.")
+
+    if detach and row_count:
+        if partition_name(year) in {p['name'] for p in list_partitions(db)}:
+            db.execute(text(f"ALTER TABLE {PARTITIONED_TABLE} TRUNCATE PARTITION {partition_name(year)}"))
+        else:
+            db.execute(table.delete().where(table.c.date >= start, table.c.date <= end))
+        db.commit()
+        watermark_service.bump_watermarks(db, company_ids)
+        logger.info(f"Detached {year} from {PARTITIONED_TABLE}.")
+    return {'year': year, 'path': path, 'rows': row_count, 'bytes': os.path.getsize(path)}
+
+
+def restore_year(db: Session, year: int, archive_dir: Optional[str] = None) -> int:
+    """Re-attaches an archived year by loading its archive file back into financial_data."""
+    path = archive_path(year, archive_dir)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"No archive for {year}: {path}")
+    start, end = _year_bounds(year)
+    table = FinancialData.__table__
+    already_present = db.execute(
+        text(f"SELECT COUNT(*) FROM {PARTITIONED_TABLE} WHERE date >= :start AND date <= :end"),
+        {'start': start, 'end': end}).scalar()
+    if already_present:
+        raise ValueError(f"{PARTITIONED_TABLE} already holds {already_present} rows for {year}; archive not restored.")
+
+    restored = 0
+    company_ids = set()
+    with gzip.open(path, 'rt', newline='') as archive_file:
+        reader = csv.DictReader(archive_file)
+        batch = []
+        for record in reader:
+            batch.append({name: _parse_value(name, value) for name, value in record.items()})
+            company_ids.add(batch[-1]['company_id'])
+            if len(batch) >= ARCHIVE_CHUNK_SIZE:
+                db.execute(table.insert(), batch)
+                restored += len(batch)
+                batch = []
+        if batch:
+            db.execute(table.insert(), batch)
+            restored += len(batch)
+    db.commit()
+    watermark_service.bump_watermarks(db, company_ids)
+    logger.info(f"Restored {restored} {PARTITIONED_TABLE} rows for {year} from {path}.")
+    return restored
+
+
+def list_archives(archive_dir: Optional[str] = None) -> List[Dict[str, Any]]:
+    directory = archive_dir or ARCHIVE_DIR
+    if not os.path.isdir(directory):
+        return []
+    prefix, suffix = f"{PARTITIONED_TABLE}_", '.csv.gz'
+    archives = []
+    for filename in sorted(os.listdir(directory)):
+        if filename.startswith(prefix) and filename.endswith(suffix):
+            path = os.path.join(directory, filename)
+            archives.append({'year': int(filename[len(prefix):-len(suffix)]), 'path': path, 'bytes': os.path.getsize(path)})
+    return archives
+
+
+def _format_value(value: Any) -> str:
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return str(value)
+
+
+def _parse_value(name: str, value: str) -> Any:
+    if value == '':
+        return None
+    if name in _DATE_COLUMNS:
+        return date.fromisoformat(value)
+    if name in _DATETIME_COLUMNS:
+        return datetime.fromisoformat(value)
+    if name in _INT_COLUMNS:
+        return int(value)
+    return Decimal(value)
+
+
+if __name__ == '__main__':
+    import argparse
+    from backend.database import get_session_local
+
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Manage financial_data year partitions and archives.")
+    parser.add_argument('action', choices=['list', 'enable', 'extend', 'archive', 'restore'])
+    parser.add_argument('year', nargs='?', type=int, help="Year to archive or restore.")
+    parser.add_argument('--years-ahead', type=int, default=1)
+    parser.add_argument('--archive-dir', default=None)
+    args = parser.parse_args()
+
+    session = get_session_local()()
+    try:
+        if args.action == 'list':
+            for partition in list_partitions(session):
+                print(f"{partition['name']:>8}  < {partition['less_than']:>8}  ~{partition['rows']} rows")
+            for archive in list_archives(args.archive_dir):
+                print(f"archived {archive['year']}: {archive['path']} ({archive['bytes']} bytes)")
+        elif args.action == 'enable':
+            enable_partitioning(session, years_ahead=args.years_ahead)
+        elif args.action == 'extend':
+            print(ensure_future_partitions(session, years_ahead=args.years_ahead))
+        elif args.year is None:
+            parser.error(f"{args.action} needs a year")
+        elif args.action == 'archive':
+            print(archive_year(session, args.year, args.archive_dir))
+        else:
+            print(f"Restored {restore_year(session, args.year, args.archive_dir)} rows.")
+    finally:
+        session.close()
@@ -0,0 +1,221 @@
+# backend/services/rolling_stats_service.py
+# Rolling per-company statistics (52-week high/low, 1d/1w/1m/YTD returns, 1-month average volume) maintained on
+# ingest instead of scanning a year of bars on every read. Each company's window state (monotonic deques for the
+# 52-week max/min, recent closes, a running volume sum) is stored as JSON in company_snapshots next to the
+# statistics, so an ingest only folds in the bars that arrived since the last one.
+import json
+import logging
+from collections import deque
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from backend import database
+from backend.models.data_model import Company, CompanySnapshot, FinancialData
+from backend.services import watermark_service
+
+logger = logging.getLogger(__name__)
+
+FIFTY_TWO_WEEK_DAYS = 365  # same window as summary_service
+RETURN_LAG_DAYS = {'return_1w': 7, 'return_1m': 30}  # calendar days back to the reference close
+AVERAGE_VOLUME_DAYS = 30
+STATS_FIELDS = ('fifty_two_week_high', 'fifty_two_week_low', 'return_1d', 'return_1w', 'return_1m', 'return_ytd',
+                'average_volume_1m')
+
+
+def _return(close: float, base: Optional[float]) -> Optional[float]:
+    return round(close / base - 1, 6) if base else None
+
+
+class RollingWindow:
+    """
+    Window state of one company, advanced one bar at a time in date order (amortized O(1) per bar):
+      - highs/lows: monotonic deques of (day, value), so the front is the max high / min low of the last 52 weeks;
+      - closes: closes back to the oldest return lag (plus the one bar before it, the reference close);
+      - volumes + volume_sum: running sum of the volumes of the last AVERAGE_VOLUME_DAYS days;
+      - year_base: the last close of the previous calendar year, for the YTD return.
+    Days are date ordinals so the state serializes to plain JSON.
+    """
+
+    def __init__(self, state: Optional[Dict[str, Any]] = None):
+        state = state or {}
+        self.last_day: Optional[int] = state.get('last_day')
+        self.highs = deque(tuple(item) for item in state.get('highs', []))
+        self.lows = deque(tuple(item) for item in state.get('lows', []))
+        self.closes = deque(tuple(item) for item in state.get('closes', []))
+        self.volumes = deque(tuple(item) for item in state.get('volumes', []))
+        self.volume_sum = state.get('volume_sum', 0)
+        self.year_base: Optional[float] = state.get('year_base')
+        self.return_1d: Optional[float] = state.get('return_1d')
+
+    def push(self, day: date, high: Optional[float], low: Optional[float], close: Optional[float],
+             volume: Optional[int]) -> None:
+        ordinal = day.toordinal()
+        if self.last_day is not None and ordinal <= self.last_day:
+            raise ValueError(f"Bars must be pushed in date order ({day} is not after {date.fromordinal(self.last_day)})")
+        previous_close = self.closes[-1][1] if self.closes else None
+        if self.last_day is not None and date.fromordinal(self.last_day).year < day.year:
+            self.year_base = previous_close
+        if high is not None:
+            while self.highs and self.highs[-1][1] <= high:
+                self.highs.pop()
+            self.highs.append((ordinal, high))
+        if low is not None:
+            while self.lows and self.lows[-1][1] >= low:
+                self.lows.pop()
+            self.lows.append((ordinal, low))
+        window_start = ordinal - FIFTY_TWO_WEEK_DAYS
+        while self.highs and self.highs[0][0] < window_start:
+            self.highs.popleft()
+        while self.lows and self.lows[0][0] < window_start:
+            self.lows.popleft()
+        if close is not None:
+            self.return_1d = _return(close, previous_close)
+            self.closes.append((ordinal, close))
+            oldest = ordinal - max(RETURN_LAG_DAYS.values())
+            while len(self.closes) > 1 and self.closes[1][0] <= oldest:
+                self.closes.popleft()  # closes[0] stays: the reference close of the longest lag
+        if volume is not None:
+            self.volumes.append((ordinal, volume))
+            self.volume_sum += volume
+        while self.volumes and self.volumes[0][0] <= ordinal - AVERAGE_VOLUME_DAYS:
+            self.volume_sum -= self.volumes.popleft()[1]
+        self.last_day = ordinal
+
+    def _close_on_or_before(self, ordinal: int) -> Optional[float]:
+        reference = None
+        for day, close in self.closes:
+            if day > ordinal:
+                break
+            reference = close
+        return reference
+
+    def stats(self) -> Dict[str, Any]:
+        close = self.closes[-1][1] if self.closes else None
+        stats = {
+            'fifty_two_week_high': self.highs[0][1] if self.highs else None,
+            'fifty_two_week_low': self.lows[0][1] if self.lows else None,
+            'return_1d': self.return_1d,
+            'return_ytd': _return(close, self.year_base) if close is not None else None,
+            'average_volume_1m': round(self.volume_sum / len(self.volumes)) if self.volumes else None,
+        }
+        for field, lag in RETURN_LAG_DAYS.items():
+            stats[field] = _return(close, self._close_on_or_before(self.last_day - lag)) if close is not None else None
+        return stats
+
+    def to_state(self) -> Dict[str, Any]:
+        return {'last_day': self.last_day, 'highs': list(self.highs), 'lows': list(self.lows),
+                'closes': list(self.closes), 'volumes': list(self.volumes), 'volume_sum': self.volume_sum,
+                'year_base': self.year_base, 'return_1d': self.return_1d}
+
+
+def _float(value: Any) -> Optional[float]:
+    return float(value) if value is not None else None
+
+
+def _bars_query(company_ids: List[int], after: Optional[date] = None, since: Optional[date] = None):
+    query = select(FinancialData.company_id, FinancialData.date, FinancialData.high, FinancialData.low,
+                   FinancialData.close, FinancialData.volume) \
+        .where(FinancialData.company_id.in_(company_ids)) \
+        .order_by(FinancialData.company_id, FinancialData.date)
+    if after is not None:
+        query = query.where(FinancialData.date > after)
+    if since is not None:
+        query = query.where(FinancialData.date >= since)
+    return query
+
+
+def _fold(db: Session, windows: Dict[int, RollingWindow], query) -> Dict[int, date]:
+    """Pushes the bars of `query` into the windows; returns the last date folded per company."""
+    folded = {}
+    for row in db.execute(query):
+        window = windows[row.company_id]
+        if window.last_day is not None and row.date.toordinal() <= window.last_day:
+            continue  # the batch query starts from the oldest state of the batch
+        window.push(row.date, _float(row.high), _float(row.low), _float(row.close), row.volume)
+        folded[row.company_id] = row.date
+    return folded
+
+
+def update_rolling_stats(db: Session, company_ids: Iterable[int], rebuild: bool = False) -> int:
+    """
+    Folds the bars ingested since each company's last update into its rolling statistics (two queries per batch).
+    rebuild=True starts over from the last 52 weeks of bars: use it after loading bars older than stats_as_of
+    (e.g. a historical bulk import), which an incremental update would not see. Returns companies updated. Commits.
+    """
+    ids = sorted({int(company_id) for company_id in company_ids})
+    updated = 0
+    now = datetime.now(timezone.utc).replace(tzinfo=None, microsecond=0)
+    for start in range(0, len(ids), watermark_service.BUMP_BATCH_SIZE):
+        batch_ids = ids[start:start + watermark_service.BUMP_BATCH_SIZE]
+        snapshots = {row.company_id: row for row in
+                     db.query(CompanySnapshot).filter(CompanySnapshot.company_id.in_(batch_ids))}
+        windows = {}
+        for company_id in batch_ids:
+            snapshot = snapshots.get(company_id)
+            state = json.loads(snapshot.rolling_state) if snapshot is not None and snapshot.rolling_state and not rebuild else None
+            windows[company_id] = RollingWindow(state)
+        fresh = [company_id for company_id in batch_ids if windows[company_id].last_day is None]
+        folded = {}
+        if fresh:
+            latest = dict(db.execute(select(FinancialData.company_id, func.max(FinancialData.date))
+                                     .where(FinancialData.company_id.in_(fresh)).group_by(FinancialData.company_id)).all())
+            if latest:
+                since = min(latest.values()) - timedelta(days=FIFTY_TWO_WEEK_DAYS)
+                for company_id, bar_date in _fold(db, windows, _bars_query(fresh, since=since)).items():
+                    folded[company_id] = bar_date
+        continuing = [company_id for company_id in batch_ids if company_id not in fresh]
+        if continuing:
+            after = date.fromordinal(min(windows[company_id].last_day for company_id in continuing))
+            folded.update(_fold(db, windows, _bars_query(continuing, after=after)))
+        for company_id in folded:
+            snapshot = snapshots.get(company_id)
+            if snapshot is None:
+                snapshot = CompanySnapshot(company_id=company_id, updated_at=now)
+                db.add(snapshot)
+            window = windows[company_id]
+            for field, value in window.stats().items():
+                setattr(snapshot, field, value)
+            snapshot.stats_as_of = date.fromordinal(window.last_day)
+            snapshot.rolling_state = json.dumps(window.to_state(), separators=(',', ':'))
+        updated += len(folded)
+    try:
+        db.commit()
+    except Exception as e:
+        logger.error(f"Error storing rolling statistics for {ids}: {e}")
+        db.rollback()
+        return 0
+    return updated
+
+
+def get_rolling_stats(db: Session, company_ids: Optional[List[int]] = None) -> List[Dict[str, Any]]:
+    """Stored statistics of the given companies (default: all that have them), one indexed read, by ticker."""
+    query = select(Company.company_id, Company.ticker_symbol, CompanySnapshot.stats_as_of,
+                   *(getattr(CompanySnapshot, field) for field in STATS_FIELDS)) \
+        .join(CompanySnapshot, CompanySnapshot.company_id == Company.company_id) \
+        .where(CompanySnapshot.stats_as_of.isnot(None)).order_by(Company.ticker_symbol)
+    if company_ids:
+        query = query.where(Company.company_id.in_(company_ids))
+    return [dict(row, stats_as_of=row['stats_as_of'].isoformat()) for row in db.execute(query).mappings()]
+
+
+# Every ingest path bumps the watermarks of the companies it wrote, on the session it wrote with.
+watermark_service.add_bump_writer(update_rolling_stats)
+
+
+if __name__ == '__main__':
+    # Fills or rebuilds the rolling statistics of every company (e.g. after adding the columns).
+    import argparse
+
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Rebuild the rolling statistics in company_snapshots.")
+    parser.add_argument('company_ids', nargs='*', type=int, help="companies to rebuild (default: all)")
+    args = parser.parse_args()
+    session = database.get_session_local()()
+    try:
+        company_ids = args.company_ids or [company.company_id for company in session.query(Company)]
+        print(f"Rebuilt rolling statistics of {update_rolling_stats(session, company_ids, rebuild=True)} companies.")
+    finally:
+        session.close()
@@ -0,0 +1,296 @@
+# backend/services/sentiment_service.py
+# News sentiment reports with a persistent result cache. A report depends only on the articles sent, the prompt
+# template and the model, so it is stored in `llm_results` under a hash of (news ids, SENTIMENT_PROMPT_VERSION,
+# model): a repeat view with no new article is one indexed read and costs no tokens. Bump SENTIMENT_PROMPT_VERSION
+# whenever SENTIMENT_PROMPT_TEMPLATE changes, so reports written by the old prompt stop matching.
+import hashlib
+import json
+import logging
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from backend import database
+from backend.models.data_model import Company, News
+from backend.models.report_model import LLMResult
+from backend.services import watermark_service
+from backend.services.event_service import broker
+from backend.services.gemini_client import client as gemini_client
+from backend.services.llm_service import analyze_news_sentiment_gemini, sentiment_report_from_response
+from backend.utils import metrics
+
+logger = logging.getLogger(__name__)
+
+SENTIMENT_MODEL = os.environ.get('SENTIMENT_MODEL') or 'gemini-2.0-flash-lite'
+SENTIMENT_NEWS_LIMIT = 10  # newest articles sent to the model
+# How long a stored report is served for an unchanged news set (0 = until the news changes).
+LLM_RESULT_MAX_AGE_SECONDS = int(os.environ.get('LLM_RESULT_MAX_AGE_SECONDS') or 7 * 24 * 3600)
+# Nightly pre-generation (pregenerate_reports): concurrent Gemini calls, and calls started per minute (0 = no limit)
+SENTIMENT_BATCH_WORKERS = int(os.environ.get('SENTIMENT_BATCH_WORKERS') or 4)
+SENTIMENT_BATCH_RATE_PER_MINUTE = float(os.environ.get('SENTIMENT_BATCH_RATE_PER_MINUTE') or 30)
+
+SENTIMENT_PROMPT_VERSION = 'v1'
+SENTIMENT_PROMPT_TEMPLATE = """
+        Analyze the overall sentiment of the following recent news articles for {company_name} (ticker: {ticker}, industry: {industry}).
+        **IMPORTANT FORMATTING INSTRUCTIONS:**
+        Instead of Markdown formatting (like **bold**), please use standard HTML tags directly for emphasis (e.g., <strong>text</strong>, <em>text</em>, <u>text</u>). Do NOT use Markdown syntax (like asterisks).
+
+        Additionally, based on your knowledge and the provided news, identify:
+        - Key products/services/subsidiaries of {company_name}.
+        - Any significant financial predictions or important financial news that directly impacts the market outlook.
+        - Important upcoming or recent past financial key events/meetings (e.g., earnings calls, investor days, product launches, regulatory deadlines) with their dates and a brief explanation of their potential or actual impact.
+
+        Consider potential environmental factors, company structure (human factors), financial reports, political, and geopolitical factors that might influence the company or its market.
+
+        **Recent News Articles for Analysis:**
+        {news_articles}
+
+        Provide a comprehensive analysis in JSON format with the following specific keys and content:
+
+        1.  <strong>"overall_news_summary"</strong>: A concise summary of the key news trends and events, using HTML for emphasis.
+        2.  <strong>"brief_overall_sentiment"</strong>: A brief sentiment (e.g., Positive, Negative, Mixed, Neutral) accompanied by a confidence score out of 100 (e.g., "Mixed (Score: 60/100)"). Briefly explain the score.
+        3.  <strong>"reasons_for_sentiment"</strong>: A detailed explanation of <em>why</em> the overall sentiment is as it is, explicitly mentioning the positive, negative, and neutral factors (including financial reports, political/geopolitical factors, environmental, and company structure/human factors) from the news that contribute to this sentiment. Use HTML for emphasis.
+        4.  <strong>"market_outlook"</strong>: Describe the potential near-term market outlook for this company based on the news, identifying key drivers. Use HTML for emphasis.
+        5.  <strong>"detailed_explanation"</strong>: Elaborate on the "Market Outlook," providing specific financial predictions, important financial news, and other relevant details that explain <em>why</em> the market outlook is as stated. Use HTML for emphasis.
+        6.  <strong>"key_offerings"</strong>: A list of {company_name}'s best-selling or most significant products, services, and/or subsidiaries.
+        7.  <strong>"financial_dates"</strong>: An array of objects, each representing a key financial event. Each object should have:
+            * <strong>"date"</strong>: The date of the event (e.g., "2025-05-15" or "Q3 2024").
+            * <strong>"event"</strong>: A brief description of the event (e.g., "Q4 Earnings Call", "Investor Day", "Regulatory Decision on Merger").
+            * <strong>"impact"</strong>: A short explanation of its potential or actual impact on market outlook and sentiment.
+
+        Ensure all required fields are present in the JSON output.
+        """
+
+NO_NEWS_REPORT = {
+    "brief_overall_sentiment": "Neutral",
+    "market_outlook": "Insufficient information.",
+    "detailed_explanation": "No news available to analyze political or geopolitical factors.",
+}
+
+LLM_CACHE_LOOKUPS = metrics.counter('llm_result_cache_total', "Sentiment report lookups in the LLM result cache.",
+                                    ['outcome'])
+BATCH_REPORTS = metrics.counter('sentiment_batch_reports_total', "Reports attempted by the pre-generation batch.",
+                                ['outcome'])
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None, microsecond=0)
+
+
+def build_prompt(company: Company, articles: Sequence[News]) -> str:
+    news_articles = "\n".join(
+        f"Title: {article.title}\nLink: {article.link}\nSummary: {article.summary}" for article in articles)
+    return SENTIMENT_PROMPT_TEMPLATE.format(company_name=company.company_name, ticker=company.ticker_symbol,
+                                            industry=company.industry, news_articles=news_articles)
+
+
+def result_key(news_ids: Sequence[int], prompt_version: Optional[str] = None, model: Optional[str] = None) -> str:
+    payload = json.dumps([list(news_ids), prompt_version or SENTIMENT_PROMPT_VERSION, model or SENTIMENT_MODEL],
+                         separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def is_error_report(report: Any) -> bool:
+    """Failed analyses (missing key, API errors, empty responses, bad JSON) are returned to the caller but never stored."""
+    return not isinstance(report, dict) or str(report.get('brief_overall_sentiment', '')).startswith('Error') \
+        or report.get('overall_news_summary') == 'JSON Decoding Error'
+
+
+def latest_news_ids(db: Session, company_id: int, limit: int = SENTIMENT_NEWS_LIMIT) -> List[int]:
+    """Ids of the articles a report of the company would be built from, newest first (index-only read)."""
+    return list(db.scalars(select(News.news_id).where(News.company_id == company_id)
+                           .order_by(News.published_date.desc(), News.news_id.desc()).limit(limit)))
+
+
+def get_cached_result(db: Session, cache_key: str, max_age_seconds: Optional[int] = None
+                      ) -> Optional[Tuple[Dict[str, Any], datetime]]:
+    """(report, created_at) stored under cache_key, unless older than max_age_seconds (default: the setting)."""
+    if max_age_seconds is None:
+        max_age_seconds = LLM_RESULT_MAX_AGE_SECONDS
+    row = db.execute(select(LLMResult.result, LLMResult.created_at).where(LLMResult.cache_key == cache_key)).first()
+    if row is None:
+        return None
+    if max_age_seconds and row.created_at < _utcnow() - timedelta(seconds=max_age_seconds):
+        return None
+    return json.loads(row.result), row.created_at
+
+
+def get_latest_result(db: Session, company_id: int) -> Optional[Tuple[Dict[str, Any], datetime]]:
+    """(report, created_at) of the company's newest stored report, whatever news, prompt version or model it used."""
+    row = db.execute(select(LLMResult.result, LLMResult.created_at).where(LLMResult.company_id == company_id)
+                     .order_by(LLMResult.created_at.desc()).limit(1)).first()
+    if row is None:
+        return None
+    return json.loads(row.result), row.created_at
+
+
+def store_result(db: Session, company_id: int, news_ids: Sequence[int], report: Dict[str, Any],
+                 prompt_version: Optional[str] = None, model: Optional[str] = None) -> datetime:
+    """
+    Stores (or replaces) the report under its key and drops the company's expired results. Commits. Two workers
+    generating the same report at once both succeed; the second write just refreshes the row.
+    """
+    prompt_version, model = prompt_version or SENTIMENT_PROMPT_VERSION, model or SENTIMENT_MODEL
+    cache_key = result_key(news_ids, prompt_version, model)
+    now = _utcnow()
+    values = dict(company_id=company_id, news_ids=','.join(str(news_id) for news_id in news_ids),
+                  prompt_version=prompt_version, model=model, result=json.dumps(report), created_at=now)
+    try:
+        row = db.query(LLMResult).filter(LLMResult.cache_key == cache_key).first()
+        if row is None:
+            db.add(LLMResult(cache_key=cache_key, **values))
+        else:
+            for field, value in values.items():
+                setattr(row, field, value)
+        if LLM_RESULT_MAX_AGE_SECONDS:
+            db.query(LLMResult).filter(LLMResult.company_id == company_id,
+                                       LLMResult.created_at < now - timedelta(seconds=LLM_RESULT_MAX_AGE_SECONDS)) \
+                .delete(synchronize_session=False)
+        db.commit()
+    except IntegrityError:
+        db.rollback()  # stored by a concurrent request in the meantime
+    return now
+
+
+def _prepare(db: Session, company: Company, news_ids: Sequence[int]) -> Tuple[List[Dict[str, Any]], str]:
+    """The articles and prompt of a report, read on the caller's session (workers never touch it)."""
+    articles = {article.news_id: article for article in db.query(News).filter(News.news_id.in_(news_ids))}
+    ordered = [articles[news_id] for news_id in news_ids if news_id in articles]
+    return [{'title': n.title, 'description': n.summary, 'link': n.link} for n in ordered], build_prompt(company, ordered)
+
+
+def generate_report(db: Session, company: Company, news_ids: Sequence[int],
+                    model: Optional[str] = None) -> Dict[str, Any]:
+    """Calls the model on the given articles and stores the report when the analysis succeeded."""
+    model = model or SENTIMENT_MODEL
+    news_articles, prompt = _prepare(db, company, news_ids)
+    report = analyze_news_sentiment_gemini(news_articles=news_articles, prompt=prompt, llm_model=model)
+    if not is_error_report(report):
+        store_result(db, company.company_id, news_ids, report, model=model)
+    return report
+
+
+def get_sentiment_report(db: Session, company: Company, refresh: bool = False, model: Optional[str] = None,
+                         allow_stale: bool = False) -> Dict[str, Any]:
+    """
+    The company's sentiment report for its current news set: {report, cached, stale, generated_at, news_ids}.
+    Served from llm_results when the same articles were already analyzed by this prompt version and model (unless
+    refresh=True). Otherwise, with allow_stale=True, the company's newest stored report is served with
+    stale=True and left for pregenerate_reports to replace; only a company with no stored report is generated by Gemini
+    (and stored) in the call. `cached` is None when there is no news to analyze.
+    """
+    news_ids = latest_news_ids(db, company.company_id)
+    if not news_ids:
+        return {'report': NO_NEWS_REPORT, 'cached': None, 'stale': False, 'generated_at': None, 'news_ids': []}
+    if not refresh:
+        cached = get_cached_result(db, result_key(news_ids, model=model))
+        if cached is not None:
+            LLM_CACHE_LOOKUPS.labels('hit').inc()
+            report, created_at = cached
+            return {'report': report, 'cached': True, 'stale': False, 'generated_at': created_at.isoformat(),
+                    'news_ids': news_ids}
+        latest = get_latest_result(db, company.company_id) if allow_stale else None
+        if latest is not None:
+            LLM_CACHE_LOOKUPS.labels('stale').inc()
+            report, created_at = latest
+            return {'report': report, 'cached': True, 'stale': True, 'generated_at': created_at.isoformat(),
+                    'news_ids': news_ids}
+    LLM_CACHE_LOOKUPS.labels('refresh' if refresh else 'miss').inc()
+    report = generate_report(db, company, news_ids, model)
+    return {'report': report, 'cached': False, 'stale': False, 'generated_at': _utcnow().isoformat(),
+            'news_ids': news_ids}
+
+
+def find_changed_companies(db: Session, companies: Optional[Sequence[Company]] = None,
+                           model: Optional[str] = None) -> List[Tuple[Company, List[int]]]:
+    """
+    Companies (default: all) whose current news set has no fresh stored report for this prompt version and
+    model, with the news ids to analyze: new articles, a new prompt or model, or an expired report.
+    """
+    if companies is None:
+        companies = db.query(Company).order_by(Company.company_id).all()
+    candidates = []
+    for company in companies:
+        news_ids = latest_news_ids(db, company.company_id)
+        if news_ids:
+            candidates.append((company, news_ids, result_key(news_ids, model=model)))
+    fresh = set()
+    keys = [key for _, _, key in candidates]
+    for start in range(0, len(keys), watermark_service.BUMP_BATCH_SIZE):
+        query = select(LLMResult.cache_key).where(LLMResult.cache_key.in_(keys[start:start + watermark_service.BUMP_BATCH_SIZE]))
+        if LLM_RESULT_MAX_AGE_SECONDS:
+            query = query.where(LLMResult.created_at >= _utcnow() - timedelta(seconds=LLM_RESULT_MAX_AGE_SECONDS))
+        fresh.update(db.scalars(query))
+    return [(company, news_ids) for company, news_ids, key in candidates if key not in fresh]
+
+
+def pregenerate_reports(db: Session, companies: Optional[Sequence[Company]] = None, model: Optional[str] = None,
+                        workers: Optional[int] = None, rate_per_minute: Optional[float] = None,
+                        progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+    """
+    Generates and stores the reports of every company whose news set changed, so the sentiment route only reads.
+    Up to `workers` Gemini calls run at once (gemini_client.generate_iter), started at most `rate_per_minute`
+    per minute; results are stored from this thread, the only one using the session. `progress` receives the
+    running totals after each report (logged every ~10% if not given). Returns the final totals, including
+    throughput and token usage.
+    """
+    model = model or SENTIMENT_MODEL
+    workers = workers or SENTIMENT_BATCH_WORKERS
+    rate_per_minute = SENTIMENT_BATCH_RATE_PER_MINUTE if rate_per_minute is None else rate_per_minute
+    started = time.perf_counter()
+    pending = find_changed_companies(db, companies, model)
+    stats = {'changed': len(pending), 'done': 0, 'generated': 0, 'failed': 0, 'prompt_tokens': 0,
+             'output_tokens': 0, 'seconds': 0.0, 'reports_per_minute': 0.0}
+    log_every = max(1, len(pending) // 10)
+    prompts = [_prepare(db, company, news_ids)[1] for company, news_ids in pending]
+    for index, response in gemini_client.generate_iter(prompts, model, max_concurrency=workers,
+                                                       rate_per_minute=rate_per_minute):
+        company, news_ids = pending[index]
+        stats['prompt_tokens'] += response.prompt_tokens
+        stats['output_tokens'] += response.output_tokens
+        report = sentiment_report_from_response(response)
+        if is_error_report(report):
+            logger.error(f"Sentiment report for {company.ticker_symbol} failed: {report.get('reasons_for_sentiment')}")
+            stats['failed'] += 1
+            BATCH_REPORTS.labels('failed').inc()
+        else:
+            store_result(db, company.company_id, news_ids, report, model=model)
+            broker.publish('sentiment', {'company_id': company.company_id, 'ticker_symbol': company.ticker_symbol,
+                                         'brief_overall_sentiment': report.get('brief_overall_sentiment')})
+            stats['generated'] += 1
+            BATCH_REPORTS.labels('generated').inc()
+        stats['done'] += 1
+        stats['seconds'] = round(time.perf_counter() - started, 2)
+        stats['reports_per_minute'] = round(stats['done'] * 60 / stats['seconds'], 2) if stats['seconds'] else 0.0
+        if progress is not None:
+            progress(dict(stats))
+        elif stats['done'] % log_every == 0 or stats['done'] == len(pending):
+            logger.info(f"Sentiment batch: {stats['done']}/{len(pending)} reports, {stats['failed']} failed, "
+                        f"{stats['reports_per_minute']}/min, {stats['prompt_tokens'] + stats['output_tokens']} tokens")
+    stats['seconds'] = round(time.perf_counter() - started, 2)
+    return stats
+
+
+if __name__ == '__main__':
+    # Pre-generates the reports of every company whose news changed (what the nightly job does), with progress.
+    import argparse
+
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Generate and store the sentiment reports of companies whose news changed.")
+    parser.add_argument('--workers', type=int, default=SENTIMENT_BATCH_WORKERS)
+    parser.add_argument('--rate', type=float, default=SENTIMENT_BATCH_RATE_PER_MINUTE, help="calls started per minute")
+    args = parser.parse_args()
+    session = database.get_session_local()()
+    try:
+        result = pregenerate_reports(session, workers=args.workers, rate_per_minute=args.rate,
+                                     progress=lambda stats: print(f"{stats['done']}/{stats['changed']} "
+                                                                  f"({stats['failed']} failed, {stats['reports_per_minute']}/min, "
+                                                                  f"{stats['prompt_tokens']}+{stats['output_tokens']} tokens)"))
+        print(result)
+    finally:
+        session.close()
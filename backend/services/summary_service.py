@@ -0,0 +1,172 @@
+# backend/services/summary_service.py
+# Company financial summary for the company page (latest bar, 52-week range, latest fundamentals and the
+# Yahoo Finance company info) read with a single statement. The Yahoo Finance part comes from the
+# company_snapshots table, which refresh_company_snapshots() fills on a schedule; the 52-week range and the
+# returns come from the same row, kept current on ingest by rolling_stats_service.
+import logging
+import time
+from datetime import date, datetime, timezone
+from typing import Any, Dict, Iterable, Optional
+
+import yfinance as yf
+from sqlalchemy import and_, case, func, literal, select
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy.sql.expression import ColumnElement
+from sqlalchemy.types import Date
+
+from backend.models.data_model import Company, CompanySnapshot, FinancialData
+from backend.services import event_service, rolling_stats_service, watermark_service
+from backend.utils.instrumentation import upstream_call
+
+logger = logging.getLogger(__name__)
+
+FIFTY_TWO_WEEK_DAYS = rolling_stats_service.FIFTY_TWO_WEEK_DAYS
+FUNDAMENTAL_FIELDS = ('roi', 'eps', 'pe_ratio', 'revenue', 'debt_to_equity', 'cash_flow')
+SNAPSHOT_FIELDS = ('average_volume', 'market_cap', 'beta', 'earnings_date', 'forward_dividend', 'dividend_yield',
+                   'ex_dividend_date', 'target_mean_price')
+RETURN_FIELDS = ('return_1d', 'return_1w', 'return_1m', 'return_ytd', 'average_volume_1m')
+# yfinance `info` key for each snapshot column
+INFO_KEYS = {
+    'average_volume': 'averageVolume',
+    'market_cap': 'marketCap',
+    'beta': 'beta',
+    'earnings_date': 'earningsDate',
+    'forward_dividend': 'forwardDividend',
+    'dividend_yield': 'dividendYield',
+    'ex_dividend_date': 'exDividendDate',
+    'target_mean_price': 'targetMeanPrice',
+}
+
+
+class _DaysBefore(ColumnElement):
+    """`column - N days`; SQLAlchemy has no portable date arithmetic."""
+    type = Date()
+    inherit_cache = True
+
+    def __init__(self, column, days: int):
+        self.column = column
+        self.days = days
+
+
+@compiles(_DaysBefore)
+def _days_before_default(element, compiler, **kw):
+    return f"DATE_SUB({compiler.process(element.column, **kw)}, INTERVAL {int(element.days)} DAY)"
+
+
+@compiles(_DaysBefore, 'sqlite')
+def _days_before_sqlite(element, compiler, **kw):
+    return f"date({compiler.process(element.column, **kw)}, '-{int(element.days)} days')"
+
+
+def _summary_statement(company_id: int):
+    latest = select(FinancialData.date, FinancialData.open, FinancialData.high, FinancialData.low,
+                    FinancialData.close, FinancialData.volume) \
+        .where(FinancialData.company_id == company_id) \
+        .order_by(FinancialData.date.desc()).limit(1).subquery('latest')
+    year_ago = _DaysBefore(latest.c.date, FIFTY_TWO_WEEK_DAYS)
+    in_window = and_(FinancialData.company_id == company_id, FinancialData.date >= year_ago)
+    fundamentals_date = select(func.max(FinancialData.date)) \
+        .where(FinancialData.company_id == company_id, FinancialData.roi.isnot(None)).scalar_subquery()
+    fundamentals = aliased(FinancialData, name='fundamentals')
+    # Rolling statistics are used when they cover the latest bar; otherwise (not computed yet, or an ingest that
+    # is still being folded in) the 52-week range falls back to scanning the window and the returns are null.
+    fresh = CompanySnapshot.stats_as_of == latest.c.date
+    return select(
+        *latest.c,
+        case((fresh, CompanySnapshot.fifty_two_week_high),
+             else_=select(func.max(FinancialData.high)).where(in_window).scalar_subquery()).label('fifty_two_week_high'),
+        case((fresh, CompanySnapshot.fifty_two_week_low),
+             else_=select(func.min(FinancialData.low)).where(in_window).scalar_subquery()).label('fifty_two_week_low'),
+        *(case((fresh, getattr(CompanySnapshot, field)), else_=literal(None)).label(field) for field in RETURN_FIELDS),
+        *(getattr(fundamentals, field).label(field) for field in FUNDAMENTAL_FIELDS),
+        fundamentals.data_id.label('fundamentals_id'),
+        *(getattr(CompanySnapshot, field).label(field) for field in SNAPSHOT_FIELDS),
+    ).select_from(latest) \
+        .outerjoin(fundamentals, and_(fundamentals.company_id == company_id, fundamentals.date == fundamentals_date)) \
+        .outerjoin(CompanySnapshot, CompanySnapshot.company_id == company_id)
+
+
+def get_financial_summary(db: Session, company_id: int) -> Dict[str, Any]:
+    """
+    The company page's financial summary in one round trip. Empty dict when the company has no price data.
+    Fundamentals are only included when some bar carries them, like the per-field queries this replaces.
+    """
+    row = db.execute(_summary_statement(company_id)).mappings().first()
+    if row is None:
+        return {}
+    summary = {field: row[field] for field in ('open', 'high', 'low', 'close', 'volume',
+                                               'fifty_two_week_high', 'fifty_two_week_low') + RETURN_FIELDS}
+    summary['date'] = row['date'].isoformat() if isinstance(row['date'], date) else row['date']
+    if row['fundamentals_id'] is not None:
+        summary.update({field: row[field] for field in FUNDAMENTAL_FIELDS})
+    for field in SNAPSHOT_FIELDS:
+        value = row[field]
+        summary[field] = value.isoformat() if isinstance(value, date) else value
+    return summary
+
+
+def _info_date(value: Any) -> Optional[date]:
+    """yfinance dates come as epoch seconds, lists of them (earningsDate) or datetimes."""
+    if isinstance(value, (list, tuple)):
+        value = value[0] if value else None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    if isinstance(value, (int, float)):
+        return datetime.fromtimestamp(value, tz=timezone.utc).date()
+    return None
+
+
+def snapshot_values(info: Dict[str, Any]) -> Dict[str, Any]:
+    """Snapshot column values from a yfinance `info` dict."""
+    values = {field: info.get(key) for field, key in INFO_KEYS.items()}
+    values['earnings_date'] = _info_date(values['earnings_date'] or info.get('earningsTimestamp'))
+    values['ex_dividend_date'] = _info_date(values['ex_dividend_date'])
+    for field in ('average_volume', 'market_cap'):
+        if values[field] is not None:
+            values[field] = int(values[field])
+    return values
+
+
+def refresh_company_snapshots(db: Session, companies: Optional[Iterable[Company]] = None,
+                              delay_seconds: float = 0.0) -> int:
+    """
+    Fetches Yahoo Finance info for each company and upserts its snapshot. Companies whose info cannot be fetched
+    keep their previous snapshot. Bumps the watermarks of refreshed companies so cached responses revalidate,
+    and publishes a `snapshot` event for each.
+    """
+    companies = list(companies) if companies is not None else db.query(Company).all()
+    existing = {row.company_id: row for row in db.query(CompanySnapshot)}
+    refreshed = {}
+    now = datetime.now(timezone.utc).replace(tzinfo=None, microsecond=0)
+    for company in companies:
+        try:
+            with upstream_call('yfinance'):
+                info = yf.Ticker(company.ticker_symbol).info or {}
+        except Exception as e:
+            logger.warning(f"Could not fetch company info for {company.ticker_symbol}: {e}")
+            continue
+        snapshot = existing.get(company.company_id)
+        if snapshot is None:
+            snapshot = CompanySnapshot(company_id=company.company_id)
+            db.add(snapshot)
+        values = snapshot_values(info)
+        for field, value in values.items():
+            setattr(snapshot, field, value)
+        snapshot.updated_at = now
+        refreshed[company.company_id] = values
+        if delay_seconds:
+            time.sleep(delay_seconds)
+    try:
+        db.commit()
+    except Exception as e:
+        logger.error(f"Error storing company snapshots: {e}")
+        db.rollback()
+        return 0
+    watermark_service.bump_watermarks(db, refreshed)
+    if event_service.broker.has_audience():
+        for company_id, values in refreshed.items():
+            event_service.broker.publish('snapshot', {'company_id': company_id, **values})
+    return len(refreshed)
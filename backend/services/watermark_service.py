@@ -0,0 +1,132 @@
+# backend/services/watermark_service.py
+# Ingestion watermarks: a per-company version that changes whenever the company's price data is written.
+# Read endpoints derive ETag/Last-Modified from them, so "has anything changed?" costs one tiny query
+# instead of recomputing the response.
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from backend.models.data_model import FinancialData, IngestionWatermark
+from backend.utils import metrics
+
+logger = logging.getLogger(__name__)
+
+BUMP_BATCH_SIZE = 500  # keeps IN (...) lists under SQLite's bound-parameter limit for bulk imports
+# How long a worker trusts its in-memory copy of a watermark. Writes in the same process invalidate it at once;
+# writes from other workers (scheduler, bulk import CLI) become visible after at most this many seconds.
+WATERMARK_CACHE_SECONDS = float(os.environ.get('WATERMARK_CACHE_SECONDS') or 5)
+
+_watermark_cache: Dict[Any, Any] = {}  # company_id (None = global) -> (expires_at, watermark)
+_watermark_cache_lock = threading.Lock()
+_bump_listeners: List[Callable[[List[int]], None]] = []
+_bump_writers: List[Callable[[Session, List[int]], Any]] = []
+metrics.callback('response_cache_entries', "Entries in this worker's response cache.",
+                 lambda: [({'cache': 'watermark'}, len(_watermark_cache))])
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None, microsecond=0)
+
+
+def add_bump_listener(listener: Callable[[List[int]], None]) -> None:
+    """Registers a callback run with the company ids after each successful bump (e.g. to drop cached responses)."""
+    if listener not in _bump_listeners:
+        _bump_listeners.append(listener)
+
+
+def add_bump_writer(writer: Callable[[Session, List[int]], Any]) -> None:
+    """
+    Registers a callback run with the bumping session and the company ids after each successful bump, before the
+    listeners: for data derived from the new bars that must land in the same database (e.g. rolling statistics).
+    """
+    if writer not in _bump_writers:
+        _bump_writers.append(writer)
+
+
+def bump_watermarks(db: Session, company_ids: Iterable[int]) -> None:
+    """Advances the watermark of each company and records its newest bar date. Commits."""
+    ids = sorted({int(company_id) for company_id in company_ids})
+    if not ids:
+        return
+    now = _utcnow()
+    try:
+        for start in range(0, len(ids), BUMP_BATCH_SIZE):
+            batch_ids = ids[start:start + BUMP_BATCH_SIZE]
+            latest = dict(db.query(FinancialData.company_id, func.max(FinancialData.date))
+                          .filter(FinancialData.company_id.in_(batch_ids)).group_by(FinancialData.company_id).all())
+            existing = {row.company_id: row for row in
+                        db.query(IngestionWatermark).filter(IngestionWatermark.company_id.in_(batch_ids))}
+            for company_id in batch_ids:
+                watermark = existing.get(company_id)
+                if watermark is None:
+                    watermark = IngestionWatermark(company_id=company_id, version=0)
+                    db.add(watermark)
+                watermark.version += 1
+                watermark.last_date = latest.get(company_id)
+                watermark.updated_at = now
+        db.commit()
+        clear_watermark_cache()
+    except Exception as e:
+        logger.error(f"Error bumping ingestion watermarks for {ids}: {e}")
+        db.rollback()
+        return
+    for writer in _bump_writers:
+        try:
+            writer(db, ids)
+        except Exception as e:
+            logger.error(f"Watermark writer {writer} failed for {ids}: {e}")
+            db.rollback()
+    for listener in _bump_listeners:
+        try:
+            listener(ids)
+        except Exception as e:
+            logger.error(f"Watermark listener {listener} failed for {ids}: {e}")
+
+
+def get_company_watermark(db: Session, company_id: int) -> Optional[Dict[str, Any]]:
+    row = db.query(IngestionWatermark).filter(IngestionWatermark.company_id == company_id).first()
+    if row is None:
+        return None
+    return {'company_id': row.company_id, 'version': row.version, 'last_date': row.last_date, 'updated_at': row.updated_at}
+
+
+def get_global_watermark(db: Session) -> Optional[Dict[str, Any]]:
+    """Aggregate over all companies; changes whenever any company's watermark does. None before the first bump."""
+    count, versions, updated_at = db.query(
+        func.count(IngestionWatermark.company_id), func.sum(IngestionWatermark.version),
+        func.max(IngestionWatermark.updated_at)).one()
+    if not count:
+        return None
+    return {'companies': count, 'version': int(versions), 'updated_at': updated_at}
+
+
+def clear_watermark_cache() -> None:
+    with _watermark_cache_lock:
+        _watermark_cache.clear()
+
+
+def get_cached_watermark(session_factory: Callable[[], Session], company_id: Optional[int] = None) -> Optional[Dict[str, Any]]:
+    """
+    Company (or, with company_id=None, global) watermark through a short in-process cache,
+    so validating a repeat request usually needs no database round trip at all.
+    """
+    now = time.monotonic()
+    with _watermark_cache_lock:
+        cached = _watermark_cache.get(company_id)
+    if cached and cached[0] > now:
+        return cached[1]
+    db = session_factory()
+    try:
+        watermark = get_global_watermark(db) if company_id is None else get_company_watermark(db, company_id)
+    finally:
+        db.close()
+    with _watermark_cache_lock:
+        _watermark_cache[company_id] = (now + WATERMARK_CACHE_SECONDS, watermark)
+    return watermark
+
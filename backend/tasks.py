@@ -17,8 +17,71 @@ from flask import Flask
 from sqlalchemy.orm import Session
 from typing import List, Optional, Union #Import typing
 import time
+from functools import wraps
+from apscheduler.events import (EVENT_JOB_ERROR, EVENT_JOB_EXECUTED, EVENT_JOB_MAX_INSTANCES, EVENT_JOB_MISSED,
+                                EVENT_JOB_SUBMITTED)
+from backend.utils import metrics
 logger = logging.getLogger(__name__)
 
+JOB_DURATION = metrics.histogram('job_duration_seconds', "Run time of background jobs.", ['job'],
+                                 buckets=(1, 5, 15, 60, 300, 900, 1800, 3600, 7200, 14400))
+JOB_RUNS = metrics.counter('job_runs_total', "Background job runs, by outcome (error: the job raised).", ['job', 'outcome'])
+JOB_LAST_SUCCESS = metrics.gauge('job_last_success_timestamp_seconds', "When each job last finished without raising.",
+                                 ['job'])
+SCHEDULER_IN_FLIGHT = metrics.gauge('scheduler_jobs_in_flight', "Jobs handed to the scheduler's executor and not "
+                                    "finished yet (queued or running).")
+SCHEDULER_SKIPPED = metrics.counter('scheduler_jobs_skipped_total', "Job runs the scheduler skipped, by reason.",
+                                    ['job', 'reason'])
+
+
+def timed_job(job):
+    """Records the run time and outcome of a background job for /metrics."""
+    @wraps(job)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        outcome = 'error'
+        try:
+            result = job(*args, **kwargs)
+            outcome = 'success'
+            return result
+        finally:
+            JOB_DURATION.labels(job.__name__).observe(time.perf_counter() - started)
+            JOB_RUNS.labels(job.__name__, outcome).inc()
+            if outcome == 'success':
+                JOB_LAST_SUCCESS.labels(job.__name__).set(time.time())
+    return wrapper
+
+
+def instrument_scheduler(scheduler):
+    """Tracks the scheduler's in-flight jobs and skipped runs, and exposes how many jobs it has scheduled."""
+    def job_name(job_id):
+        job = scheduler.get_job(job_id)
+        return job.name if job is not None else job_id
+
+    def on_event(event):
+        if event.code == EVENT_JOB_SUBMITTED:
+            SCHEDULER_IN_FLIGHT.inc()
+        elif event.code in (EVENT_JOB_EXECUTED, EVENT_JOB_ERROR):
+            SCHEDULER_IN_FLIGHT.dec()
+        elif event.code == EVENT_JOB_MISSED:
+            SCHEDULER_SKIPPED.labels(job_name(event.job_id), 'missed').inc()
+        elif event.code == EVENT_JOB_MAX_INSTANCES:
+            SCHEDULER_SKIPPED.labels(job_name(event.job_id), 'still_running').inc()
+
+    scheduler.add_listener(on_event, EVENT_JOB_SUBMITTED | EVENT_JOB_EXECUTED | EVENT_JOB_ERROR | EVENT_JOB_MISSED
+                           | EVENT_JOB_MAX_INSTANCES)
+    metrics.callback('scheduler_jobs', "Jobs registered with the scheduler.", lambda: [({}, len(scheduler.get_jobs()))])
+
+
+def run_after(scheduler, job_id: str, func, args=()):
+    """Runs `func` as a one-off job each time the scheduled job `job_id` finishes without raising."""
+    def on_executed(event):
+        if event.job_id == job_id:
+            scheduler.add_job(func, args=args, id=f'{func.__name__}-after-{job_id}', name=func.__name__,
+                              replace_existing=True, misfire_grace_time=None)
+
+    scheduler.add_listener(on_executed, EVENT_JOB_EXECUTED)
+
 
 def update_financial_data_for_company(db: Session, company):
     ticker: str = company.ticker_symbol
@@ -57,6 +120,7 @@ def update_financial_data_for_company(db: Session, company):
         elif days_difference <= 1:
             logger.info(f"Financial data for {ticker} seems up to date.")
 
+@timed_job
 def update_all_financial_data(app: Flask, batch_size=10, delay_per_batch=60):
     """Checks and updates financial data for all companies in batches with delays."""
     logger.info("Starting scheduled financial data update check for all companies (batched)...")
@@ -82,6 +146,7 @@ def update_all_financial_data(app: Flask, batch_size=10, delay_per_batch=60):
             db.close()
     logger.info("Scheduled financial data update check finished.")
 
+@timed_job
 def daily_news_update(app: Flask):
     """Fetches and stores news articles for all companies."""
     sgt = pytz.timezone("Asia/Singapore")
@@ -141,6 +206,7 @@ def daily_news_update(app: Flask):
     else:
         logger.debug(f"Skipping news update. Current time is {now.strftime('%H:%M')} SGT.")
 
+@timed_job
 def daily_financial_data_update(app: Flask):
     """Fetches and stores the latest financial data for all companies at 6AM SGT."""
     sgt = pytz.timezone('Asia/Singapore')
@@ -168,6 +234,75 @@ def daily_financial_data_update(app: Flask):
     else:
         logger.debug(f"Skipping scheduled financial data update. Current time is {now.strftime('%H:%M')} SGT.")
 
+@timed_job
+def maintain_financial_data_partitions(app: Flask, years_ahead: int = 1):
+    """Creates the upcoming yearly financial_data partitions ahead of time (no-op unless MySQL and partitioned)."""
+    from backend.services.partition_service import ensure_future_partitions
+    logger.info("Checking financial_data partitions...")
+    with app.app_context():
+        db: Session = get_db()
+        try:
+            created = ensure_future_partitions(db, years_ahead=years_ahead)
+            if created:
+                logger.info(f"Created financial_data partitions: {created}")
+            else:
+                logger.debug("No new financial_data partitions needed.")
+        except Exception as e:
+            logger.error(f"Error maintaining financial_data partitions: {e}")
+            db.rollback()
+        finally:
+            db.close()
+
+@timed_job
+def compact_news_archive(app: Flask):
+    """Moves news past the retention age / per-company cap into news_archive."""
+    from backend.services.news_retention_service import compact_news
+    logger.info("Starting news retention compaction...")
+    with app.app_context():
+        db: Session = get_db()
+        try:
+            result = compact_news(db)
+            logger.info(f"News retention compaction finished: archived {result['archived']} articles across {result['companies']} companies.")
+        except Exception as e:
+            logger.error(f"Error during news retention compaction: {e}")
+            db.rollback()
+        finally:
+            db.close()
+
+@timed_job
+def refresh_company_snapshots(app: Flask, delay_seconds: float = 1.0):
+    """Refreshes the Yahoo Finance company info (market cap, beta, dividends...) served by the company page."""
+    from backend.services.summary_service import refresh_company_snapshots as refresh_snapshots
+    logger.info("Starting company snapshot refresh...")
+    with app.app_context():
+        db: Session = get_db()
+        try:
+            refreshed = refresh_snapshots(db, delay_seconds=delay_seconds)
+            logger.info(f"Company snapshot refresh finished: {refreshed} companies refreshed.")
+        except Exception as e:
+            logger.error(f"Error during company snapshot refresh: {e}")
+            db.rollback()
+        finally:
+            db.close()
+
+@timed_job
+def pregenerate_sentiment_reports(app: Flask):
+    """Generates the news sentiment reports of companies whose news changed, so the sentiment route only reads."""
+    from backend.services.sentiment_service import pregenerate_reports
+    logger.info("Starting sentiment report pre-generation...")
+    with app.app_context():
+        db: Session = get_db()
+        try:
+            result = pregenerate_reports(db)
+            logger.info(f"Sentiment report pre-generation finished: {result['generated']} generated, {result['failed']} failed "
+                        f"of {result['changed']} companies with changed news in {result['seconds']}s "
+                        f"({result['reports_per_minute']}/min, {result['prompt_tokens']} prompt + {result['output_tokens']} output tokens).")
+        except Exception as e:
+            logger.error(f"Error during sentiment report pre-generation: {e}")
+            db.rollback()
+        finally:
+            db.close()
+
 
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO)
@@ -179,4 +314,3 @@ if __name__ == "__main__":
     with app.app_context():
         daily_financial_data_update(app)
         daily_news_update(app)
-
@@ -0,0 +1,226 @@
+# backend/utils/compression.py
+# Response compression for the Flask app:
+#   - dynamic responses above COMPRESSION_MIN_BYTES are gzip/brotli encoded per Accept-Encoding, at levels
+#     chosen for latency rather than ratio (they are compressed on every request);
+#   - streamed responses are compressed chunk by chunk (flushed per chunk, so the first bytes still go out at once);
+#   - files under the static folder are precompressed once (max level) and served from the .br/.gz siblings.
+# Bytes before/after are counted per encoding and exposed through compression_stats().
+import gzip
+import logging
+import mimetypes
+import os
+import tempfile
+import threading
+import zlib
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+from flask import Flask, request, send_from_directory
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+COMPRESSION_MIN_BYTES = int(os.environ.get('COMPRESSION_MIN_BYTES') or 1024)  # below ~1 packet it is not worth it
+GZIP_LEVEL = int(os.environ.get('COMPRESSION_GZIP_LEVEL') or 5)
+BROTLI_QUALITY = int(os.environ.get('COMPRESSION_BROTLI_QUALITY') or 4)
+STATIC_EXTENSIONS = ('.js', '.css', '.svg', '.html', '.json', '.txt', '.map')
+COMPRESSIBLE_TYPES = ('text/', 'application/json', 'application/javascript', 'image/svg+xml',
+                      'application/vnd.fypquant.', 'application/xml')
+UNCOMPRESSED_TYPES = ('text/event-stream',)  # per-event delivery matters more than size
+
+_stats_lock = threading.Lock()
+_stats: Dict[str, Dict[str, int]] = {}
+
+
+def _record(encoding: str, bytes_in: int, bytes_out: int) -> None:
+    with _stats_lock:
+        entry = _stats.setdefault(encoding, {'responses': 0, 'bytes_in': 0, 'bytes_out': 0})
+        entry['responses'] += 1
+        entry['bytes_in'] += bytes_in
+        entry['bytes_out'] += bytes_out
+
+
+def compression_stats() -> Dict[str, Any]:
+    """Per-encoding response counts and bytes before/after compression in this worker."""
+    with _stats_lock:
+        result = {encoding: dict(entry, ratio=round(entry['bytes_out'] / entry['bytes_in'], 4) if entry['bytes_in'] else None)
+                  for encoding, entry in _stats.items()}
+    total_in = sum(entry['bytes_in'] for entry in result.values())
+    total_out = sum(entry['bytes_out'] for entry in result.values())
+    result['total'] = {'bytes_in': total_in, 'bytes_out': total_out, 'saved': total_in - total_out}
+    return result
+
+
+def reset_compression_stats() -> None:
+    with _stats_lock:
+        _stats.clear()
+
+
+def choose_encoding(accept_encodings) -> Optional[str]:
+    """'br' when brotli is installed and accepted, else 'gzip' when accepted, else None."""
+    candidates = (['br'] if brotli is not None else []) + ['gzip']
+    best = accept_encodings.best_match(candidates)
+    return best if best and accept_encodings[best] > 0 else None
+
+
+def compress(data: bytes, encoding: str, static: bool = False) -> bytes:
+    if encoding == 'br':
+        return brotli.compress(data, quality=11 if static else BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=9 if static else GZIP_LEVEL, mtime=0)
+
+
+def _is_compressible(mimetype: Optional[str]) -> bool:
+    return bool(mimetype) and mimetype.startswith(COMPRESSIBLE_TYPES) and not mimetype.startswith(UNCOMPRESSED_TYPES)
+
+
+def compress_chunks(chunks: Iterable[Any], encoding: str) -> Iterator[bytes]:
+    """Incrementally compresses a streamed body, flushing after each chunk. Closes `chunks` when done."""
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+        step, finish = (lambda chunk: compressor.process(chunk) + compressor.flush()), compressor.finish
+    else:
+        compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)  # wbits 31: gzip container
+        step, finish = (lambda chunk: compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)), compressor.flush
+    bytes_in = bytes_out = 0
+    try:
+        for chunk in chunks:
+            if not chunk:
+                continue
+            if isinstance(chunk, str):
+                chunk = chunk.encode()
+            bytes_in += len(chunk)
+            data = step(chunk)
+            bytes_out += len(data)
+            yield data
+        data = finish()
+        bytes_out += len(data)
+        yield data
+    finally:
+        if hasattr(chunks, 'close'):
+            chunks.close()
+        _record(f"{encoding}-stream", bytes_in, bytes_out)
+
+
+def compress_response(response):
+    """after_request hook: encodes eligible responses in place."""
+    response.vary.add('Accept-Encoding')
+    if (response.direct_passthrough or not 200 <= response.status_code < 300
+            or response.status_code == 206 or 'Content-Encoding' in response.headers
+            or not _is_compressible(response.mimetype)):
+        return response
+    encoding = choose_encoding(request.accept_encodings)
+    if encoding is None:
+        return response
+    if response.is_streamed:
+        response.response = compress_chunks(response.response, encoding)
+        response.headers.pop('Content-Length', None)
+        response.headers['Content-Encoding'] = encoding
+        _weaken_etag(response)
+        return response
+    data = response.get_data()
+    if len(data) < COMPRESSION_MIN_BYTES:
+        return response
+    compressed = compress(data, encoding)
+    if len(compressed) >= len(data):
+        return response
+    response.set_data(compressed)
+    response.headers['Content-Encoding'] = encoding
+    _weaken_etag(response)
+    _record(encoding, len(data), len(compressed))
+    return response
+
+
+def _weaken_etag(response) -> None:
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)  # same content, different bytes
+
+
+def _write_atomically(path: str, data: bytes) -> None:
+    # Every worker precompresses at startup: write a temporary sibling and rename it over the target, so a
+    # request served by another worker sees the old file or the new one, never a partial write.
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.' + os.path.basename(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as out:
+            out.write(data)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+
+
+def precompress_static(static_folder: str, min_bytes: int = COMPRESSION_MIN_BYTES) -> Dict[str, int]:
+    """Writes .gz (and .br when brotli is available) next to each compressible static file that changed."""
+    encodings = ['gzip'] + (['br'] if brotli is not None else [])
+    suffixes = {'gzip': '.gz', 'br': '.br'}
+    totals = {'files': 0, 'bytes': 0, 'gzip_bytes': 0, 'br_bytes': 0}
+    for root, _, filenames in os.walk(static_folder):
+        for filename in filenames:
+            if not filename.endswith(STATIC_EXTENSIONS):
+                continue
+            path = os.path.join(root, filename)
+            size = os.path.getsize(path)
+            if size < min_bytes:
+                continue
+            data = None
+            totals['files'] += 1
+            totals['bytes'] += size
+            for encoding in encodings:
+                target = path + suffixes[encoding]
+                if not os.path.exists(target) or os.path.getmtime(target) < os.path.getmtime(path):
+                    if data is None:
+                        with open(path, 'rb') as source:
+                            data = source.read()
+                    _write_atomically(target, compress(data, encoding, static=True))
+                totals[f"{encoding}_bytes"] += os.path.getsize(target)
+    return totals
+
+
+def _precompressed_static_view(app: Flask):
+    suffixes = {'gzip': '.gz', 'br': '.br'}
+
+    def static(filename):
+        encoding = choose_encoding(request.accept_encodings)
+        if encoding is not None and filename.endswith(STATIC_EXTENSIONS):
+            candidate = filename + suffixes[encoding]
+            if os.path.isfile(os.path.join(app.static_folder, candidate)):
+                original = os.path.join(app.static_folder, filename)
+                response = send_from_directory(app.static_folder, candidate,
+                                               mimetype=mimetypes.guess_type(filename)[0],
+                                               max_age=app.get_send_file_max_age(filename))
+                response.headers['Content-Encoding'] = encoding
+                response.vary.add('Accept-Encoding')
+                if response.status_code == 200 and os.path.isfile(original):
+                    _record(f"static-{encoding}", os.path.getsize(original), response.content_length or 0)
+                return response
+        return app.send_static_file(filename)
+
+    return static
+
+
+def init_compression(app: Flask, precompress: bool = True) -> None:
+    """Registers the compression hook and, if asked, precompresses the static folder and serves the results."""
+    app.after_request(compress_response)
+    if not precompress or not app.static_folder or not os.path.isdir(app.static_folder):
+        return
+    try:
+        totals = precompress_static(app.static_folder)
+        logger.info(f"Precompressed {totals['files']} static files: {totals['bytes']} bytes -> "
+                    f"{totals['gzip_bytes']} gzip / {totals['br_bytes']} br.")
+    except OSError as e:
+        logger.warning(f"Static precompression skipped: {e}")
+    app.view_functions['static'] = _precompressed_static_view(app)
+
+
+if __name__ == '__main__':
+    import argparse
+
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Precompress static assets (.gz/.br) for the Flask app.")
+    parser.add_argument('static_folder', nargs='?', default=os.path.join(
+        os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'frontend', 'static'))
+    args = parser.parse_args()
+    print(precompress_static(args.static_folder, min_bytes=0))
@@ -0,0 +1,58 @@
+# backend/utils/data_utils.py
+import base64
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+def encode_cursor(last_date: date, last_company_id: int) -> str:
+    """Opaque keyset cursor for (date, company_id) pagination."""
+    raw = f"{last_date.isoformat()}|{last_company_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[date, int]:
+    """Inverse of encode_cursor. Raises ValueError for malformed cursors."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        date_part, company_part = raw.split('|')
+        return date.fromisoformat(date_part), int(company_part)
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def parse_csv_param(value: Optional[str]) -> List[str]:
+    """Splits a comma-separated query parameter, dropping blanks."""
+    return [item.strip() for item in (value or '').split(',') if item.strip()]
+
+
+def parse_fields(value: Optional[str], allowed: Iterable[str]) -> List[str]:
+    """Validates a `fields=` projection. Empty means every allowed field (in the allowed order)."""
+    allowed = list(allowed)
+    requested = parse_csv_param(value)
+    if not requested:
+        return allowed
+    unknown = [field for field in requested if field not in allowed]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return requested
+
+
+def parse_int_param(value: Optional[str], default: int, minimum: int, maximum: int, name: str) -> int:
+    if value in (None, ''):
+        return default
+    try:
+        number = int(value)
+    except ValueError as e:
+        raise ValueError(f"{name} must be an integer") from e
+    if not minimum <= number <= maximum:
+        raise ValueError(f"{name} must be between {minimum} and {maximum}")
+    return number
+
+
+def parse_date_param(value: Optional[str], name: str) -> Optional[date]:
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(value)
+    except ValueError as e:
+        raise ValueError(f"{name} must be a YYYY-MM-DD date") from e
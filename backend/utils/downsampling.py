@@ -0,0 +1,83 @@
+# backend/utils/downsampling.py
+# Server-side downsampling of long price series for charting. A canvas ~1000px wide cannot show more
+# points than it has pixels, so multi-decade daily histories are reduced to a target point count:
+#   lttb   - Largest-Triangle-Three-Buckets on the close series (keeps the visual shape)
+#   minmax - the min and max close of each bucket (keeps every extreme)
+# Volume bars are aggregated as the max volume over the rows each kept point stands for, so spikes survive.
+from typing import Any, Dict, List
+
+import numpy as np
+import pandas as pd
+
+DOWNSAMPLE_METHODS = ('lttb', 'minmax')
+MIN_POINTS = 3
+MAX_POINTS = 10000
+
+
+def _as_float_array(values: List[Any]) -> np.ndarray:
+    """Floats with gaps filled from neighbours so missing closes do not win the triangle-area comparison."""
+    series = pd.to_numeric(pd.Series(values, dtype=object), errors='coerce').astype(float)
+    return series.ffill().bfill().fillna(0.0).to_numpy()
+
+
+def lttb_indices(y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Indices of the points kept by Largest-Triangle-Three-Buckets (x = position, as on a category axis).
+    The first and last points are always kept; each bucket's triangle areas are computed in one vectorized step.
+    """
+    n = len(y)
+    if n_out >= n or n_out < MIN_POINTS:
+        return np.arange(n)
+    x = np.arange(n, dtype=float)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)  # n_out - 2 buckets between the endpoints
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        if i == n_out - 3:
+            avg_x, avg_y = x[n - 1], y[n - 1]
+        else:
+            next_end = edges[i + 2]
+            avg_x, avg_y = x[end:next_end].mean(), y[end:next_end].mean()
+        areas = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(areas))
+        selected[i + 1] = a
+    return selected
+
+
+def minmax_indices(y: np.ndarray, n_out: int) -> np.ndarray:
+    """Indices of the min and max of each of n_out // 2 buckets, in time order, plus both endpoints."""
+    n = len(y)
+    if n_out >= n or n_out < MIN_POINTS:
+        return np.arange(n)
+    edges = np.linspace(0, n, max(n_out // 2, 1) + 1).astype(np.int64)
+    picks = [0, n - 1]
+    for start, end in zip(edges[:-1], edges[1:]):
+        if end > start:
+            window = y[start:end]
+            picks.extend((start + int(np.argmin(window)), start + int(np.argmax(window))))
+    return np.unique(np.asarray(picks, dtype=np.int64))
+
+
+def span_max(values: np.ndarray, indices: np.ndarray) -> np.ndarray:
+    """Max of `values` over [indices[i], indices[i+1]) for each kept index (the last one spans to the end)."""
+    return np.maximum.reduceat(values, indices)
+
+
+def downsample_records(records: List[Dict[str, Any]], points: int, method: str = 'lttb',
+                       value_key: str = 'close', volume_key: str = 'volume') -> List[Dict[str, Any]]:
+    """Reduces chart records to about `points` rows. Rows are returned unchanged except for aggregated volume."""
+    if method not in DOWNSAMPLE_METHODS:
+        raise ValueError(f"Unknown downsample method: {method} (expected one of {', '.join(DOWNSAMPLE_METHODS)})")
+    if len(records) <= points:
+        return records
+    y = _as_float_array([record.get(value_key) for record in records])
+    indices = lttb_indices(y, points) if method == 'lttb' else minmax_indices(y, points)
+    result = [dict(records[i]) for i in indices]
+    if volume_key in records[0]:
+        volumes = pd.to_numeric(pd.Series([record.get(volume_key) for record in records], dtype=object),
+                                errors='coerce').fillna(0).to_numpy(dtype=float)
+        for record, volume in zip(result, span_max(volumes, indices)):
+            record[volume_key] = int(volume)
+    return result
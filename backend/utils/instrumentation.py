@@ -0,0 +1,185 @@
+# backend/utils/instrumentation.py
+# Per-request timing for the Flask app:
+#   - wall time, database time/query count (SQLAlchemy cursor events, every engine) and upstream call time/count
+#     (yfinance, Guardian, Gemini; wrapped in upstream_call() at the call sites) for each request;
+#   - a Server-Timing header with those numbers, so the browser's network panel shows where the time went;
+#   - a rolling window of recent requests per endpoint, exposed slowest-first through perf_stats();
+#   - the route latency histogram and upstream call/error counters of the /metrics endpoint.
+# Streamed bodies are timed up to the point the response starts; rows read while streaming are not counted.
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional
+
+from flask import Flask, g, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from backend.utils import metrics
+
+PERF_WINDOW_REQUESTS = int(os.environ.get('PERF_WINDOW_REQUESTS') or 200)  # recent requests kept per endpoint
+PERF_SERVER_TIMING = os.environ.get('PERF_SERVER_TIMING', '1') != '0'
+
+REQUEST_LATENCY = metrics.histogram('http_request_duration_seconds', "Time to produce a response, by route.",
+                                    ['method', 'route', 'status'])
+UPSTREAM_CALLS = metrics.counter('upstream_calls_total', "Calls to external services.", ['service'])
+UPSTREAM_ERRORS = metrics.counter('upstream_errors_total', "Calls to external services that raised.", ['service'])
+UPSTREAM_LATENCY = metrics.histogram('upstream_call_duration_seconds', "Latency of calls to external services.",
+                                     ['service'], buckets=(.05, .1, .25, .5, 1, 2.5, 5, 10, 30, 60))
+
+
+class RequestStats:
+    __slots__ = ('started', 'db_count', 'db_seconds', 'upstream_count', 'upstream_seconds')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.db_count = self.upstream_count = 0
+        self.db_seconds = self.upstream_seconds = 0.0
+
+
+_current: ContextVar[Optional[RequestStats]] = ContextVar('request_stats', default=None)
+
+
+def current_stats() -> Optional[RequestStats]:
+    """Stats of the request being handled in this context (None outside a request)."""
+    return _current.get()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and _current.get() is not None:
+        context._perf_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    started = getattr(context, '_perf_started', None)
+    if stats is not None and started is not None:
+        stats.db_seconds += time.perf_counter() - started
+        stats.db_count += 1
+
+
+@contextmanager
+def upstream_call(service: str) -> Iterator[None]:
+    """Times a call to an external service (yfinance, guardian, gemini): metrics, plus the current request if any."""
+    started = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        UPSTREAM_ERRORS.labels(service).inc()
+        raise
+    finally:
+        elapsed = time.perf_counter() - started
+        UPSTREAM_CALLS.labels(service).inc()
+        UPSTREAM_LATENCY.labels(service).observe(elapsed)
+        stats = _current.get()
+        if stats is not None:
+            stats.upstream_seconds += elapsed
+            stats.upstream_count += 1
+
+
+class EndpointWindow:
+    """The last `size` requests of one endpoint: (wall, db, queries, upstream, upstream calls, bytes)."""
+
+    def __init__(self, size: int):
+        self.requests = 0
+        self.recent: deque = deque(maxlen=size)
+
+    def add(self, sample: tuple) -> None:
+        self.requests += 1
+        self.recent.append(sample)
+
+    def summary(self) -> Dict[str, Any]:
+        samples = list(self.recent)
+        walls = sorted(sample[0] for sample in samples)
+        count = len(samples)
+        sizes = [sample[5] for sample in samples if sample[5] is not None]
+        return {
+            'requests': self.requests,
+            'window': count,
+            'avg_ms': round(sum(walls) / count, 2),
+            'p50_ms': round(walls[count // 2], 2),
+            'p95_ms': round(walls[min(count - 1, int(count * 0.95))], 2),
+            'max_ms': round(walls[-1], 2),
+            'avg_db_ms': round(sum(sample[1] for sample in samples) / count, 2),
+            'avg_queries': round(sum(sample[2] for sample in samples) / count, 2),
+            'avg_upstream_ms': round(sum(sample[3] for sample in samples) / count, 2),
+            'avg_upstream_calls': round(sum(sample[4] for sample in samples) / count, 2),
+            'avg_bytes': round(sum(sizes) / len(sizes)) if sizes else None,
+        }
+
+
+_windows_lock = threading.Lock()
+_windows: Dict[str, EndpointWindow] = {}
+
+
+def _record(endpoint: str, sample: tuple) -> None:
+    with _windows_lock:
+        window = _windows.get(endpoint)
+        if window is None:
+            window = _windows[endpoint] = EndpointWindow(PERF_WINDOW_REQUESTS)
+        window.add(sample)
+
+
+def perf_stats(limit: int = 20, sort: str = 'p95_ms') -> List[Dict[str, Any]]:
+    """Endpoints in this worker, slowest first by `sort` over their recent requests."""
+    with _windows_lock:
+        rows = [dict(endpoint=endpoint, **window.summary()) for endpoint, window in _windows.items()]
+    rows.sort(key=lambda row: row.get(sort) or 0, reverse=True)
+    return rows[:limit]
+
+
+def reset_perf_stats() -> None:
+    with _windows_lock:
+        _windows.clear()
+
+
+def _start_request() -> None:
+    g._request_stats_token = _current.set(RequestStats())
+
+
+def _finish_request(response):
+    stats = _current.get()
+    if stats is None:
+        return response
+    elapsed = time.perf_counter() - stats.started
+    wall, db, upstream = elapsed * 1000, stats.db_seconds * 1000, stats.upstream_seconds * 1000
+    size = None if response.is_streamed else response.calculate_content_length()
+    rule = request.url_rule.rule if request.url_rule is not None else '<unmatched>'
+    REQUEST_LATENCY.labels(request.method, rule, response.status_code).observe(elapsed)
+    _record(f"{request.method} {rule}", (wall, db, stats.db_count, upstream, stats.upstream_count, size))
+    if PERF_SERVER_TIMING:
+        response.headers.add('Server-Timing', f'db;dur={db:.1f};desc="{stats.db_count} queries"')
+        if stats.upstream_count:
+            response.headers.add('Server-Timing', f'upstream;dur={upstream:.1f};desc="{stats.upstream_count} calls"')
+        response.headers.add('Server-Timing', f'app;dur={wall:.1f}')
+    return response
+
+
+def _end_request(exc=None) -> None:
+    token = g.pop('_request_stats_token', None)
+    if token is not None:
+        try:
+            _current.reset(token)
+        except ValueError:  # torn down from another context (e.g. after a streamed body)
+            _current.set(None)
+
+
+_engine_hooks_installed = False
+
+
+def init_instrumentation(app: Flask) -> None:
+    """
+    Registers the request hooks and the (process-wide) SQLAlchemy cursor hooks. Call it before init_compression
+    so the timing and the recorded size cover compression: after_request hooks run in reverse order.
+    """
+    global _engine_hooks_installed
+    if not _engine_hooks_installed:
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+        _engine_hooks_installed = True
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+    app.teardown_request(_end_request)
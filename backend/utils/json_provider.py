@@ -0,0 +1,81 @@
+# backend/utils/json_provider.py
+# Flask JSON provider backed by orjson, with native handling of Decimal (Numeric columns), date/datetime
+# and NumPy values. Falls back to the standard library encoder with the same type handling when orjson
+# is not installed, so responses look the same either way:
+#   Decimal  -> number (not the string Flask's default provider emits)
+#   date     -> "YYYY-MM-DD", datetime -> ISO 8601 (not RFC 822 HTTP dates)
+#   NumPy    -> numbers / arrays
+import dataclasses
+import decimal
+import json
+import uuid
+from datetime import date, datetime, time
+from typing import Any
+
+import numpy as np
+from flask.json.provider import JSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+
+def _default(obj: Any) -> Any:
+    """Types neither encoder handles natively. Raises TypeError like json.JSONEncoder.default."""
+    if isinstance(obj, decimal.Decimal):
+        return float(obj)
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, (date, datetime, time)):
+        return obj.isoformat()
+    if isinstance(obj, uuid.UUID):
+        return str(obj)
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return dataclasses.asdict(obj)
+    if hasattr(obj, '__html__'):
+        return str(obj.__html__())
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(obj: Any) -> str:
+    """Compact JSON with the provider's type handling, for code that runs outside an app context."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(obj, default=_default, ensure_ascii=False, separators=(',', ':'))
+
+
+class FastJSONProvider(JSONProvider):
+    """orjson-backed provider; registered by create_app via `app.json = FastJSONProvider(app)`."""
+
+    mimetype = 'application/json'
+
+    def _options(self) -> int:
+        options = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        if self._app.debug:
+            options |= orjson.OPT_INDENT_2
+        return options
+
+    def dumps_bytes(self, obj: Any, **kwargs: Any) -> bytes:
+        if orjson is not None and not kwargs:
+            return orjson.dumps(obj, default=_default, option=self._options())
+        return self.dumps(obj, **kwargs).encode()
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        if orjson is not None and not kwargs:
+            return orjson.dumps(obj, default=_default, option=self._options()).decode()
+        kwargs.setdefault('default', _default)
+        kwargs.setdefault('ensure_ascii', False)
+        kwargs.setdefault('separators', (',', ':'))
+        return json.dumps(obj, **kwargs)
+
+    def loads(self, s: Any, **kwargs: Any) -> Any:
+        if orjson is not None and not kwargs:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+    def response(self, *args: Any, **kwargs: Any):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.dumps_bytes(obj), mimetype=self.mimetype)
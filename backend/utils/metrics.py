@@ -0,0 +1,259 @@
+# backend/utils/metrics.py
+# In-process metrics registry with Prometheus text exposition (served at /metrics).
+#   - counter / gauge / histogram: recorded on the hot path; a labelled child is looked up once per event and
+#     updated in a per-thread cell without locking (well under a microsecond, see benchmarks/bench_metrics.py);
+#   - callback metrics: read at scrape time from state other modules already keep (pool usage, cache sizes,
+#     subscribers), so they cost nothing between scrapes.
+# Values are per worker process, like the other /api/admin stats; scrape every worker or aggregate upstream.
+import math
+import threading
+from bisect import bisect_left
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+try:
+    # Cells are per OS thread. gevent's monkey.patch_all() makes threading.get_ident() per greenlet, which would
+    # leave a cell behind for every request greenlet, so take the unpatched function.
+    from gevent.monkey import get_original
+    get_ident = get_original('_thread', 'get_ident')
+except ImportError:
+    from _thread import get_ident
+
+DEFAULT_BUCKETS = (.005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10)  # seconds, for request latency
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+Sample = Tuple[str, Dict[str, str], float]  # (name suffix, labels, value)
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return '+Inf'
+    if isinstance(value, int) or float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(str(value))}"' for key, value in labels.items()) + '}'
+
+
+class _Value:
+    """
+    A counter/gauge value kept as one cell per OS thread: each thread only ever writes its own cell, so recording
+    needs no lock, and a scrape sums the cells. Under gevent all greenlets of a thread share its cell (get_ident is
+    the unpatched one), which is safe because a greenlet never yields in the middle of an update.
+    set() replaces the value, so a gauge that is set() should not also be inc()/dec()'d.
+    """
+    __slots__ = ('_cells',)
+
+    def __init__(self):
+        self._cells: Dict[int, float] = {}
+
+    def inc(self, amount: float = 1) -> None:
+        cells = self._cells
+        ident = get_ident()
+        cells[ident] = cells.get(ident, 0) + amount
+
+    def dec(self, amount: float = 1) -> None:
+        self.inc(-amount)
+
+    def set(self, value: float) -> None:
+        self._cells = {get_ident(): value}
+
+    @property
+    def value(self) -> float:
+        return sum(list(self._cells.values()))
+
+
+class _HistogramValue:
+    """Histogram with per-thread cells of [bucket counts, sum, count], summed at scrape time like _Value."""
+    __slots__ = ('buckets', '_cells')
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = buckets
+        self._cells: Dict[int, list] = {}
+
+    def observe(self, value: float) -> None:
+        cell = self._cells.get(get_ident())
+        if cell is None:
+            cell = self._cells[get_ident()] = [[0] * (len(self.buckets) + 1), 0.0, 0]  # last bucket: above the top
+        cell[0][bisect_left(self.buckets, value)] += 1
+        cell[1] += value
+        cell[2] += 1
+
+    def samples(self) -> Iterator[Tuple[str, Optional[float], float]]:
+        counts = [0] * (len(self.buckets) + 1)
+        total = count = 0
+        for cell in list(self._cells.values()):
+            counts = [a + b for a, b in zip(counts, cell[0])]
+            total += cell[1]
+            count += cell[2]
+        cumulative = 0
+        for bound, bucket_count in zip(list(self.buckets) + [math.inf], counts):
+            cumulative += bucket_count
+            yield '_bucket', bound, cumulative
+        yield '_sum', None, total
+        yield '_count', None, count
+
+
+class Metric:
+    """A named metric with a fixed set of label names; labels(...) returns the child to record on."""
+
+    type = 'untyped'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], Any] = {}  # label values as strings -> child
+        self._lookup: Dict[Tuple[Any, ...], Any] = {}  # label values as passed -> child (the hot path)
+        self._lock = threading.Lock()
+
+    def _new_child(self):
+        return _Value()
+
+    def labels(self, *values: Any):
+        child = self._lookup.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} takes labels {self.labelnames}, got {values}")
+            with self._lock:
+                child = self._children.setdefault(tuple(str(value) for value in values), self._new_child())
+                self._lookup[values] = child
+        return child
+
+    def samples(self) -> Iterator[Sample]:
+        for key, child in list(self._children.items()):
+            yield '', dict(zip(self.labelnames, key)), child.value
+
+
+class Counter(Metric):
+    type = 'counter'
+
+    def inc(self, amount: float = 1) -> None:
+        self.labels().inc(amount)
+
+
+class Gauge(Metric):
+    type = 'gauge'
+
+    def inc(self, amount: float = 1) -> None:
+        self.labels().inc(amount)
+
+    def dec(self, amount: float = 1) -> None:
+        self.labels().dec(amount)
+
+    def set(self, value: float) -> None:
+        self.labels().set(value)
+
+
+class Histogram(Metric):
+    type = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramValue(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+
+    def samples(self) -> Iterator[Sample]:
+        for key, child in list(self._children.items()):
+            labels = dict(zip(self.labelnames, key))
+            for suffix, bound, value in child.samples():
+                yield suffix, (dict(labels, le=_format_value(bound)) if bound is not None else labels), value
+
+
+class CallbackMetric:
+    """
+    Gauge or counter whose samples come from collectors called at scrape time, each returning [(labels, value)].
+    Several modules may add collectors to one name (e.g. a cache size per cache), told apart by label values.
+    """
+
+    def __init__(self, name: str, documentation: str, collect: Callable[[], Iterable[Tuple[Dict[str, Any], float]]],
+                 metric_type: str = 'gauge'):
+        self.name = name
+        self.documentation = documentation
+        self.type = metric_type
+        self.collectors: Dict[Tuple[str, str], Callable] = {}
+        self.add(collect)
+
+    def add(self, collect: Callable[[], Iterable[Tuple[Dict[str, Any], float]]]) -> None:
+        # Keyed by where the collector is defined, so re-importing a module replaces its collector.
+        self.collectors[(collect.__module__, collect.__qualname__)] = collect
+
+    def samples(self) -> Iterator[Sample]:
+        for collect in list(self.collectors.values()):
+            for labels, value in collect():
+                if value is not None:
+                    yield '', {key: str(label) for key, label in labels.items()}, value
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        """Registers `metric`, or returns the one already registered under its name (modules may be re-imported)."""
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if existing.type != metric.type:
+                    raise ValueError(f"Metric {metric.name} is already registered as a {existing.type}")
+                if isinstance(existing, CallbackMetric):
+                    for collect in metric.collectors.values():
+                        existing.add(collect)
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: List[str] = []
+        for metric in metrics:
+            try:
+                samples = list(metric.samples())
+            except Exception as e:  # one broken collector must not take the whole scrape down
+                lines.append(f"# {metric.name} collection failed: {type(e).__name__}")
+                continue
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            for suffix, labels, value in samples:
+                lines.append(f"{metric.name}{suffix}{_format_labels(labels)} {_format_value(value)}")
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+
+def counter(name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+    return REGISTRY.register(Counter(name, documentation, labelnames))
+
+
+def gauge(name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+    return REGISTRY.register(Gauge(name, documentation, labelnames))
+
+
+def histogram(name: str, documentation: str, labelnames: Sequence[str] = (),
+              buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+    return REGISTRY.register(Histogram(name, documentation, labelnames, buckets))
+
+
+def callback(name: str, documentation: str, collect: Callable[[], Iterable[Tuple[Dict[str, Any], float]]],
+             metric_type: str = 'gauge') -> CallbackMetric:
+    return REGISTRY.register(CallbackMetric(name, documentation, collect, metric_type))
+
+
+def render() -> str:
+    return REGISTRY.render()
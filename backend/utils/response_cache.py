@@ -0,0 +1,228 @@
+# backend/utils/response_cache.py
+# Serialized-response caches for hot read endpoints.
+#   LRUResponseCache     - per-process, bounded by entry count and total bytes
+#   SQLiteSharedCache    - optional file-backed tier shared by all workers on the host
+#   TieredResponseCache  - local tier in front of the optional shared tier
+# Entries carry a tag (e.g. a company_id) so a write can drop everything derived from that entity.
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+
+class LRUResponseCache:
+    """Thread-safe LRU of bytes values, evicting until both max_entries and max_bytes hold."""
+
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: 'OrderedDict[Hashable, tuple]' = OrderedDict()  # key -> (value, tag)
+        self._tags: Dict[Any, set] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key: Hashable, value: bytes, tag: Any = None) -> None:
+        if len(value) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, tag)
+            self._tags.setdefault(tag, set()).add(key)
+            self._bytes += len(value)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _remove(self, key: Hashable) -> None:
+        value, tag = self._entries.pop(key)
+        self._bytes -= len(value)
+        keys = self._tags.get(tag)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._tags[tag]
+
+    def invalidate_tag(self, tag: Any) -> int:
+        with self._lock:
+            keys = list(self._tags.get(tag, ()))
+            for key in keys:
+                self._remove(key)
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else None,
+            }
+
+
+class SQLiteSharedCache:
+    """
+    File-backed cache shared by every worker process on the host (gunicorn workers, scheduler).
+    Uses one SQLite connection per thread in WAL mode; LRU is approximated by last access time.
+    The total size is kept in response_cache_size by triggers, so a write checks the byte limit without
+    summing the table, and the total stays right whichever worker wrote or deleted an entry.
+    """
+
+    def __init__(self, path: str, max_bytes: int = 256 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        self._lock = threading.Lock()  # guards the hit/miss counters
+        self.hits = self.misses = 0
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")  # one schema setup at a time across workers, so the seeded total is exact
+        try:
+            connection.execute("CREATE TABLE IF NOT EXISTS response_cache ("
+                               "key TEXT PRIMARY KEY, tag TEXT, value BLOB NOT NULL, size INTEGER NOT NULL, accessed_at REAL NOT NULL)")
+            connection.execute("CREATE INDEX IF NOT EXISTS ix_response_cache_tag ON response_cache (tag)")
+            connection.execute("CREATE INDEX IF NOT EXISTS ix_response_cache_accessed ON response_cache (accessed_at)")
+            connection.execute("CREATE TABLE IF NOT EXISTS response_cache_size (id INTEGER PRIMARY KEY CHECK (id = 0), bytes INTEGER NOT NULL)")
+            connection.execute("INSERT OR IGNORE INTO response_cache_size (id, bytes) "
+                               "SELECT 0, COALESCE(SUM(size), 0) FROM response_cache")
+            connection.execute("CREATE TRIGGER IF NOT EXISTS response_cache_size_insert AFTER INSERT ON response_cache "
+                               "BEGIN UPDATE response_cache_size SET bytes = bytes + NEW.size WHERE id = 0; END")
+            connection.execute("CREATE TRIGGER IF NOT EXISTS response_cache_size_update AFTER UPDATE OF size ON response_cache "
+                               "BEGIN UPDATE response_cache_size SET bytes = bytes + NEW.size - OLD.size WHERE id = 0; END")
+            connection.execute("CREATE TRIGGER IF NOT EXISTS response_cache_size_delete AFTER DELETE ON response_cache "
+                               "BEGIN UPDATE response_cache_size SET bytes = bytes - OLD.size WHERE id = 0; END")
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def get(self, key: Hashable) -> Optional[bytes]:
+        connection = self._connection()
+        row = connection.execute("SELECT value FROM response_cache WHERE key = ?", (repr(key),)).fetchone()
+        if row is None:
+            with self._lock:
+                self.misses += 1
+            return None
+        connection.execute("UPDATE response_cache SET accessed_at = ? WHERE key = ?", (time.time(), repr(key)))
+        with self._lock:
+            self.hits += 1
+        return row[0]
+
+    def set(self, key: Hashable, value: bytes, tag: Any = None) -> None:
+        if len(value) > self.max_bytes:
+            return
+        connection = self._connection()
+        # An upsert rather than INSERT OR REPLACE: the implicit delete of a REPLACE does not fire the size triggers.
+        connection.execute("INSERT INTO response_cache (key, tag, value, size, accessed_at) VALUES (?, ?, ?, ?, ?) "
+                           "ON CONFLICT (key) DO UPDATE SET tag = excluded.tag, value = excluded.value, "
+                           "size = excluded.size, accessed_at = excluded.accessed_at",
+                           (repr(key), repr(tag), value, len(value), time.time()))
+        total = connection.execute("SELECT bytes FROM response_cache_size WHERE id = 0").fetchone()[0]
+        if total > self.max_bytes:
+            self._evict(connection, total - self.max_bytes)
+
+    @staticmethod
+    def _evict(connection: sqlite3.Connection, excess: int) -> None:
+        freed = 0
+        victims = []
+        for key, size in connection.execute("SELECT key, size FROM response_cache ORDER BY accessed_at"):
+            victims.append((key,))
+            freed += size
+            if freed >= excess:
+                break
+        connection.executemany("DELETE FROM response_cache WHERE key = ?", victims)
+
+    def invalidate_tag(self, tag: Any) -> int:
+        return self._connection().execute("DELETE FROM response_cache WHERE tag = ?", (repr(tag),)).rowcount
+
+    def clear(self) -> None:
+        self._connection().execute("DELETE FROM response_cache")
+
+    def stats(self) -> Dict[str, Any]:
+        connection = self._connection()
+        entries = connection.execute("SELECT COUNT(*) FROM response_cache").fetchone()[0]
+        size = connection.execute("SELECT bytes FROM response_cache_size WHERE id = 0").fetchone()[0]
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        lookups = hits + misses
+        return {
+            'path': self.path,
+            'entries': entries,
+            'bytes': size,
+            'max_bytes': self.max_bytes,
+            'hits': hits,  # this worker's lookups only
+            'misses': misses,
+            'hit_ratio': round(hits / lookups, 4) if lookups else None,
+        }
+
+
+class TieredResponseCache:
+    """Per-process LRU in front of an optional shared tier; shared hits are promoted into the local tier."""
+
+    def __init__(self, local: LRUResponseCache, shared: Optional[SQLiteSharedCache] = None):
+        self.local = local
+        self.shared = shared
+
+    def get(self, key: Hashable, tag: Any = None) -> Optional[bytes]:
+        """tag is only used to file a shared-tier hit under the right tag in the local tier."""
+        value = self.local.get(key)
+        if value is None and self.shared is not None:
+            value = self.shared.get(key)
+            if value is not None:
+                self.local.set(key, value, tag=tag)
+        return value
+
+    def set(self, key: Hashable, value: bytes, tag: Any = None) -> None:
+        self.local.set(key, value, tag=tag)
+        if self.shared is not None:
+            self.shared.set(key, value, tag=tag)
+
+    def invalidate_tag(self, tag: Any) -> None:
+        self.local.invalidate_tag(tag)
+        if self.shared is not None:
+            self.shared.invalidate_tag(tag)
+
+    def invalidate_tags(self, tags) -> None:
+        for tag in tags:
+            self.invalidate_tag(tag)
+
+    def clear(self) -> None:
+        self.local.clear()
+        if self.shared is not None:
+            self.shared.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {'local': self.local.stats(), 'shared': self.shared.stats() if self.shared is not None else None}
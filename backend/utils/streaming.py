@@ -0,0 +1,62 @@
+# backend/utils/streaming.py
+# Streaming JSON responses for large reads: rows come off a server-side cursor (yield_per) and are written
+# out in batches, so memory stays flat however many rows match and the first bytes leave immediately.
+import logging
+import os
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional
+
+from flask import current_app, stream_with_context
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+STREAM_YIELD_PER = int(os.environ.get('STREAM_YIELD_PER') or 1000)  # rows fetched from the cursor at a time
+STREAM_BATCH_ROWS = int(os.environ.get('STREAM_BATCH_ROWS') or 500)  # rows serialized per chunk
+
+
+def iter_rows(db: Session, statement, params: Optional[Dict[str, Any]] = None,
+              yield_per: int = STREAM_YIELD_PER) -> Iterator[Any]:
+    """Rows of `statement` fetched `yield_per` at a time (server-side cursor where the driver supports it)."""
+    result = db.execute(statement.execution_options(yield_per=yield_per), params or {})
+    try:
+        yield from result
+    finally:
+        result.close()
+
+
+def json_array_chunks(items: Iterable[Any], dumps: Callable[[Any], str], batch_rows: int = STREAM_BATCH_ROWS,
+                      prefix: str = '', suffix: str = '') -> Iterator[bytes]:
+    """A JSON array of `items` in chunks of `batch_rows` elements, with optional text around it (e.g. '{"rows":')."""
+    yield (prefix + '[').encode()
+    separator = ''
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= batch_rows:
+            yield (separator + dumps(batch)[1:-1]).encode()
+            separator = ','
+            batch = []
+    if batch:
+        yield (separator + dumps(batch)[1:-1]).encode()
+    yield (']' + suffix).encode()
+
+
+def stream_json(items: Iterable[Any], prefix: str = '', suffix: str = '',
+                on_close: Optional[Callable[[], None]] = None):
+    """
+    Streamed application/json response of `items` (an iterator, typically over iter_rows).
+    `on_close` runs once the body is sent (or the client goes away): close the session there, not in the view.
+    An error mid-stream can no longer change the status code, so it is logged and the body ends truncated.
+    """
+    dumps = current_app.json.dumps
+
+    def generate():
+        try:
+            yield from json_array_chunks(items, dumps, prefix=prefix, suffix=suffix)
+        except Exception as e:
+            logger.error(f"Streaming response aborted: {e}")
+        finally:
+            if on_close is not None:
+                on_close()
+
+    return current_app.response_class(stream_with_context(generate()), mimetype='application/json')
@@ -0,0 +1,137 @@
+# backend/utils/wire_format.py
+# Compact encodings for chart series, negotiated through the Accept header:
+#   application/json                          - list of row objects (default, unchanged)
+#   application/vnd.fypquant.columnar+json    - {"date": [...], "close": [...], "volume": [...]}
+#   application/vnd.fypquant.float64          - packed little-endian float64 columns (see encode_float64)
+#   application/vnd.apache.arrow.stream       - Arrow IPC stream, only when pyarrow is installed
+# Columns are built once as NumPy arrays and every encoder works on the arrays, not on per-row dicts.
+import json
+import struct
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+except ImportError:  # optional dependency
+    pa = None
+
+ROWS_JSON = 'application/json'
+COLUMNAR_JSON = 'application/vnd.fypquant.columnar+json'
+FLOAT64_BINARY = 'application/vnd.fypquant.float64'
+ARROW_STREAM = 'application/vnd.apache.arrow.stream'
+
+FLOAT64_MAGIC = b'FQF8'
+_FLOAT64_HEADER = struct.Struct('<4sIII')  # magic, rows, columns, length of the comma-separated column names
+_EPOCH = np.datetime64('1970-01-01', 'D')
+
+
+def available_formats() -> List[str]:
+    formats = [ROWS_JSON, COLUMNAR_JSON, FLOAT64_BINARY]
+    if pa is not None:
+        formats.append(ARROW_STREAM)
+    return formats
+
+
+def negotiate(accept) -> str:
+    """
+    Best supported media type for a werkzeug Accept header. Row JSON is listed first, so wildcards
+    (browsers, jQuery's default Accept) keep getting the format the existing pages expect.
+    """
+    return accept.best_match(available_formats(), default=ROWS_JSON) if accept else ROWS_JSON
+
+
+def to_columns(records: List[Dict[str, Any]], fields: Sequence[str], date_field: str = 'date') -> Dict[str, np.ndarray]:
+    """Row dicts -> one NumPy array per field: datetime64[D] for the date field, float64 for the rest."""
+    columns = {}
+    for field in fields:
+        values = [record.get(field) for record in records]
+        try:
+            # NumPy parses ISO date strings, date objects, Decimals and None (-> NaT/NaN) in C.
+            columns[field] = np.array(values, dtype='datetime64[D]' if field == date_field else np.float64)
+        except (TypeError, ValueError):
+            series = pd.Series(values, dtype=object)
+            columns[field] = (pd.to_datetime(series, errors='coerce').to_numpy(dtype='datetime64[D]') if field == date_field
+                              else pd.to_numeric(series, errors='coerce').to_numpy(dtype=np.float64))
+    return columns
+
+
+def json_list(values: np.ndarray) -> list:
+    """One column as a JSON-ready list: ISO dates, None for NaN/NaT, ints for integral columns."""
+    if np.issubdtype(values.dtype, np.datetime64):
+        text = np.datetime_as_string(values, unit='D')
+        missing = np.isnat(values)
+        return np.where(missing, None, text).tolist() if missing.any() else text.tolist()
+    missing = np.isnan(values)
+    if missing.any():
+        return np.where(missing, None, values).tolist()
+    if np.array_equal(values, np.trunc(values)) and np.abs(values).max(initial=0) < 2 ** 53:
+        return values.astype(np.int64).tolist()  # e.g. volume: 1234 rather than 1234.0
+    return values.tolist()
+
+
+def encode_columnar_json(columns: Dict[str, np.ndarray]) -> bytes:
+    return json.dumps({name: json_list(values) for name, values in columns.items()},
+                      separators=(',', ':')).encode()
+
+
+def encode_float64(columns: Dict[str, np.ndarray]) -> bytes:
+    """
+    Layout: header (magic 'FQF8', uint32 rows, uint32 columns, uint32 names length), the column names as
+    comma-separated UTF-8 padded to an 8-byte boundary, then each column as `rows` little-endian float64s.
+    Dates are encoded as days since 1970-01-01. Missing values are NaN. Every column starts on an 8-byte
+    boundary so a browser can view it with `new Float64Array(buffer, offset, rows)` without copying.
+    """
+    names = ','.join(columns).encode()
+    rows = len(next(iter(columns.values()))) if columns else 0
+    header = _FLOAT64_HEADER.pack(FLOAT64_MAGIC, rows, len(columns), len(names))
+    padding = b'\0' * (-(len(header) + len(names)) % 8)
+    blocks = []
+    for values in columns.values():
+        if np.issubdtype(values.dtype, np.datetime64):
+            days = (values - _EPOCH).astype('timedelta64[D]').astype(np.float64)
+            values = np.where(np.isnat(values), np.nan, days)
+        blocks.append(np.ascontiguousarray(values, dtype='<f8').tobytes())
+    return header + names + padding + b''.join(blocks)
+
+
+def decode_float64(body: bytes) -> Dict[str, np.ndarray]:
+    """Inverse of encode_float64 (for Python clients and tests). Dates stay as days since the epoch."""
+    magic, rows, column_count, names_length = _FLOAT64_HEADER.unpack_from(body)
+    if magic != FLOAT64_MAGIC:
+        raise ValueError("Not a float64 column payload")
+    offset = _FLOAT64_HEADER.size
+    names = body[offset:offset + names_length].decode().split(',') if column_count else []
+    offset += names_length + (-(offset + names_length) % 8)
+    data = np.frombuffer(body, dtype='<f8', count=rows * column_count, offset=offset).reshape(column_count, rows)
+    return dict(zip(names, data))
+
+
+def encode_arrow(columns: Dict[str, np.ndarray]) -> bytes:
+    if pa is None:
+        raise RuntimeError("Arrow responses need pyarrow (`pip install pyarrow`).")
+    table = pa.table({name: pa.array(values, from_pandas=True) for name, values in columns.items()})
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def encode(records: List[Dict[str, Any]], mimetype: str, fields: Sequence[str],
+           dumps: Optional[Callable[[Any], str]] = None) -> bytes:
+    """Encodes chart records as `mimetype`. Row JSON goes through `dumps` (the app's JSON provider)."""
+    if mimetype == ROWS_JSON:
+        return (dumps or json.dumps)(records).encode()
+    return encode_columns(to_columns(records, fields), mimetype)
+
+
+def encode_columns(columns: Dict[str, np.ndarray], mimetype: str) -> bytes:
+    """Encodes already-built columns in one of the columnar formats."""
+    if mimetype == COLUMNAR_JSON:
+        return encode_columnar_json(columns)
+    if mimetype == FLOAT64_BINARY:
+        return encode_float64(columns)
+    if mimetype == ARROW_STREAM:
+        return encode_arrow(columns)
+    raise ValueError(f"Unsupported wire format: {mimetype}")
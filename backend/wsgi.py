@@ -0,0 +1,11 @@
+# backend/wsgi.py
+# WSGI entry point for gunicorn (settings in backend/gunicorn_conf.py):
+#   gunicorn -c backend/gunicorn_conf.py backend.wsgi:app
+# Every worker would otherwise start its own copy of the scheduled jobs, and the initial data update runs before
+# the worker can answer its first request, so the scheduler is off here unless RUN_SCHEDULER=1. Run the jobs from
+# a single process instead (python backend/app.py, or one instance with RUN_SCHEDULER=1 and WEB_CONCURRENCY=1).
+import os
+
+from backend.app import create_app
+
+app = create_app(start_scheduler=os.environ.get('RUN_SCHEDULER') == '1')
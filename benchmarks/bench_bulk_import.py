@@ -0,0 +1,45 @@
+# benchmarks/bench_bulk_import.py
+# Measures bulk_import_service throughput on a synthetic vendor dump (target: >= 1M rows/min).
+# Usage: python -m benchmarks.bench_bulk_import [rows] [tickers]
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from backend import database
+from backend.database import Base
+from backend.services.bulk_import_service import import_prices
+
+
+def make_price_file(path: str, rows: int, tickers: int) -> None:
+    days = -(-rows // tickers)
+    dates = pd.bdate_range('2000-01-03', periods=days).strftime('%Y-%m-%d')
+    rng = np.random.default_rng(0)
+    close = np.round(rng.uniform(5, 500, rows), 2)
+    pd.DataFrame({
+        'ticker': np.repeat([f"T{i:04d}" for i in range(tickers)], days)[:rows],
+        'date': np.tile(dates, tickers)[:rows],
+        'open': close, 'high': close + 1, 'low': close - 1, 'close': close,
+        'volume': rng.integers(1_000, 10_000_000, rows),
+    }).to_csv(path, index=False)
+
+
+def main(rows: int = 1_000_000, tickers: int = 500) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, 'prices.csv')
+        make_price_file(csv_path, rows, tickers)
+        engine = database._create_engine(f"sqlite:///{os.path.join(tmp, 'bench.sqlite3')}")
+        Base.metadata.create_all(bind=engine)
+
+        started = time.perf_counter()
+        stats = import_prices(csv_path, engine=engine, create_missing=True)
+        elapsed = time.perf_counter() - started
+        engine.dispose()
+    print(f"rows={stats['rows_loaded']:,} seconds={elapsed:.2f} rows/min={stats['rows_loaded'] / elapsed * 60:,.0f}")
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:3]))
@@ -0,0 +1,129 @@
+# benchmarks/bench_concurrency.py
+# Load test of the gunicorn worker profiles (backend/gunicorn_conf.py) on an I/O-bound route: each request waits
+# on a slow upstream over HTTP, the way the LLM, news and yfinance routes do. With the same number of workers the
+# sync profile serves `workers` requests at a time; gevent and gthread serve many more, and the worker RSS shows
+# what that costs in memory.
+# Usage: python -m benchmarks.bench_concurrency [clients] [upstream_delay_seconds]
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+from flask import Flask
+
+WORKERS = 2
+PORT = 8765
+UPSTREAM_PORT = 8766
+
+# The app served by gunicorn (loaded as benchmarks.bench_concurrency:app in each worker).
+app = Flask(__name__)
+
+
+@app.route('/upstream')
+def call_upstream():
+    response = requests.get(os.environ['BENCH_UPSTREAM_URL'], timeout=30)
+    return {'upstream': response.status_code}
+
+
+def start_upstream(delay: float) -> ThreadingHTTPServer:
+    class SlowHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(delay)
+            self.send_response(200)
+            self.send_header('Content-Length', '2')
+            self.end_headers()
+            self.wfile.write(b'ok')
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', UPSTREAM_PORT), SlowHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _children(pid: int):
+    children = []
+    for entry in os.listdir('/proc'):
+        if entry.isdigit():
+            try:
+                with open(f'/proc/{entry}/stat') as stat:
+                    if int(stat.read().rsplit(')', 1)[1].split()[1]) == pid:
+                        children.append(int(entry))
+            except (OSError, IndexError, ValueError):
+                pass
+    return children
+
+
+def _rss_mib(pid: int) -> float:
+    with open(f'/proc/{pid}/status') as status:
+        for line in status:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def _wait_until_up(url: str, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(url, timeout=60).read()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"gunicorn did not come up on {url}")
+
+
+def run_profile(profile: str, clients: int) -> dict:
+    url = f'http://127.0.0.1:{PORT}/upstream'
+    env = dict(os.environ, GUNICORN_PROFILE=profile, WEB_CONCURRENCY=str(WORKERS), GUNICORN_BIND=f'127.0.0.1:{PORT}',
+               GUNICORN_ACCESS_LOG='/dev/null', GUNICORN_LOG_LEVEL='warning', GUNICORN_THREADS=str(clients),
+               BENCH_UPSTREAM_URL=f'http://127.0.0.1:{UPSTREAM_PORT}/')
+    server = subprocess.Popen([sys.executable, '-m', 'gunicorn', '-c', 'backend/gunicorn_conf.py',
+                               'benchmarks.bench_concurrency:app'], env=env)
+    try:
+        _wait_until_up(url)
+
+        def fetch(_):
+            started = time.perf_counter()
+            urllib.request.urlopen(url, timeout=600).read()
+            return time.perf_counter() - started
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=clients) as pool:
+            latencies = sorted(pool.map(fetch, range(clients)))
+        elapsed = time.perf_counter() - started
+        workers = _children(server.pid)
+        return {
+            'elapsed': elapsed,
+            'p50': latencies[len(latencies) // 2],
+            'max': latencies[-1],
+            'rss': sum(_rss_mib(pid) for pid in workers),
+        }
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=60)
+
+
+def main(clients: int = 200, delay: float = 0.5) -> None:
+    upstream = start_upstream(delay)
+    print(f"{clients} concurrent clients, {WORKERS} workers, upstream latency {delay * 1000:.0f} ms")
+    print(f"{'profile':8} {'wall s':>8} {'req/s':>8} {'p50 ms':>9} {'max ms':>9} {'worker RSS MiB':>15}")
+    try:
+        for profile in ('sync', 'gthread', 'gevent'):
+            result = run_profile(profile, clients)
+            print(f"{profile:8} {result['elapsed']:8.2f} {clients / result['elapsed']:8.1f} {result['p50'] * 1000:9.0f} "
+                  f"{result['max'] * 1000:9.0f} {result['rss']:15.1f}")
+    finally:
+        upstream.shutdown()
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200, float(sys.argv[2]) if len(sys.argv) > 2 else 0.5)
@@ -0,0 +1,55 @@
+# benchmarks/bench_json_provider.py
+# Encode time of a dashboard-style payload (Decimal prices, dates) through Flask's default JSON provider
+# versus backend.utils.json_provider.FastJSONProvider.
+# Usage: python -m benchmarks.bench_json_provider [rows]
+import sys
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+import numpy as np
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from backend.utils import json_provider
+from backend.utils.json_provider import FastJSONProvider
+
+
+def make_rows(rows: int):
+    rng = np.random.default_rng(0)
+    prices = np.round(rng.uniform(5, 500, rows), 2)
+    start = date(2000, 1, 3)
+    return [{
+        'ticker_symbol': f"T{i % 500:04d}", 'company_name': f"Company {i % 500}", 'industry': 'Technology',
+        'date': start + timedelta(days=i // 500), 'open': Decimal(str(p)), 'high': Decimal(str(p + 1)),
+        'low': Decimal(str(p - 1)), 'close': Decimal(str(p)), 'volume': int(p * 1000),
+        'updated_at': datetime(2024, 1, 1, 12, 0),
+    } for i, p in enumerate(prices)]
+
+
+def _best_of(fn, repeat: int = 5) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main(rows: int = 100_000) -> None:
+    payload = make_rows(rows)
+    app = Flask(__name__)
+    providers = [('flask default', DefaultJSONProvider(app)), ('fast (orjson)' if json_provider.orjson else 'fast (stdlib)',
+                                                                FastJSONProvider(app))]
+    with app.app_context():
+        baseline = None
+        for name, provider in providers:
+            seconds = _best_of(lambda: provider.response(payload).get_data())
+            size = len(provider.response(payload).get_data())
+            baseline = baseline or seconds
+            print(f"{name:16} {seconds * 1000:8.1f} ms  {rows / seconds:12,.0f} rows/s  {size:12,} bytes  "
+                  f"{baseline / seconds:5.1f}x")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,47 @@
+# benchmarks/bench_llm_batch.py
+# Compares analyzing a batch of prompts one call at a time with GeminiClient.analyze_many, against a fake model
+# whose calls sleep for a random latency (no API key or network needed). analyze_many should take about as long as
+# the slowest call.
+# Usage: python -m benchmarks.bench_llm_batch [prompts] [max_latency_ms]
+import random
+import sys
+import time
+from types import SimpleNamespace
+
+from backend.services import gemini_client
+from backend.services.gemini_client import GeminiClient
+
+
+class FakeModel:
+    def __init__(self, name: str, max_latency: float):
+        self.max_latency = max_latency
+        self.rng = random.Random(0)
+
+    def generate_content(self, contents, request_options=None):
+        time.sleep(self.rng.uniform(self.max_latency / 2, self.max_latency))
+        return SimpleNamespace(parts=[SimpleNamespace(text='{}')], resolve=lambda: None, usage_metadata=None)
+
+
+def main(prompts: int = 100, max_latency_ms: int = 200) -> None:
+    max_latency = max_latency_ms / 1000
+    gemini_client.genai.configure = lambda api_key: None
+    gemini_client.genai.GenerativeModel = lambda name: FakeModel(name, max_latency)
+    batch = [f"prompt {index}" for index in range(prompts)]
+    client = GeminiClient(api_key='bench', max_concurrency=prompts)
+
+    started = time.perf_counter()
+    sequential = [client.generate(prompt, 'fake') for prompt in batch]
+    sequential_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    concurrent = client.analyze_many(batch, 'fake')
+    concurrent_seconds = time.perf_counter() - started
+
+    slowest = max(response.seconds for response in concurrent)
+    print(f"prompts={prompts} sequential={sequential_seconds:.2f}s analyze_many={concurrent_seconds:.2f}s "
+          f"slowest_call={slowest:.2f}s speedup={sequential_seconds / concurrent_seconds:.1f}x "
+          f"errors={sum(response.error is not None for response in sequential + concurrent)}")
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:3]))
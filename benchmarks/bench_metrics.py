@@ -0,0 +1,45 @@
+# benchmarks/bench_metrics.py
+# Cost of recording one event in backend.utils.metrics (the budget is under a microsecond per event).
+# Usage: python -m benchmarks.bench_metrics [events]
+import sys
+import time
+
+from backend.utils.metrics import Counter, Histogram
+
+
+def _per_event_ns(fn, events: int) -> float:
+    started = time.perf_counter()
+    fn(events)
+    return (time.perf_counter() - started) / events * 1e9
+
+
+def main(events: int = 1_000_000) -> None:
+    calls = Counter('bench_calls_total', 'bench', ['service'])
+    latency = Histogram('bench_latency_seconds', 'bench', ['method', 'endpoint', 'status'])
+    unlabelled = Counter('bench_plain_total', 'bench')
+
+    def baseline(n):
+        for _ in range(n):
+            pass
+
+    def counter_inc(n):
+        for _ in range(n):
+            calls.labels('gemini').inc()
+
+    def counter_plain(n):
+        for _ in range(n):
+            unlabelled.inc()
+
+    def histogram_observe(n):
+        for i in range(n):
+            latency.labels('GET', '/api/graph/compare', 200).observe(0.0123)
+
+    loop = _per_event_ns(baseline, events)
+    print(f"{events:,} events, loop overhead {loop:.0f} ns subtracted")
+    for name, fn in [('counter.labels().inc()', counter_inc), ('counter.inc()', counter_plain),
+                     ('histogram.labels().observe()', histogram_observe)]:
+        print(f"{name:30} {_per_event_ns(fn, events) - loop:8.0f} ns/event")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
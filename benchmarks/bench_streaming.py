@@ -0,0 +1,79 @@
+# benchmarks/bench_streaming.py
+# Peak Python memory and time to first byte of GET /api/data/companies/<id>/financials?period=daily,
+# materialized (rows -> list of dicts -> jsonify) versus streamed (backend.utils.streaming), on SQLite.
+# Usage: python -m benchmarks.bench_streaming [rows]
+import sys
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+from flask import Flask, jsonify
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+import backend.database  # noqa: F401  (registers the models)
+from backend.database import Base
+from backend.models.data_model import Company, FinancialData
+from backend.utils.json_provider import FastJSONProvider
+from backend.utils.streaming import iter_rows, stream_json
+
+
+def make_db(rows: int):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    SessionLocal = sessionmaker(bind=engine)
+    with SessionLocal() as session:
+        session.add(Company(company_name="Bench Corp", ticker_symbol="BNCH"))
+        session.flush()
+        start = date(1900, 1, 1)
+        session.execute(FinancialData.__table__.insert(), [
+            {'company_id': 1, 'date': start + timedelta(days=i), 'open': 10 + i % 7, 'high': 12, 'low': 9,
+             'close': 11 + i % 5, 'volume': 1000 + i} for i in range(rows)])
+        session.commit()
+    return SessionLocal
+
+
+def _query():
+    return select(FinancialData.date, FinancialData.open, FinancialData.close, FinancialData.volume)\
+        .where(FinancialData.company_id == 1).order_by(FinancialData.date)
+
+
+def _item(row):
+    return {"date": row.date.strftime('%Y-%m-%d'), "open": row.open, "close": row.close, "volume": row.volume}
+
+
+def materialized(db):
+    return jsonify([_item(row) for row in db.execute(_query()).all()])
+
+
+def streamed(db):
+    return stream_json((_item(row) for row in iter_rows(db, _query())))
+
+
+def measure(app, SessionLocal, view):
+    with app.test_request_context(), SessionLocal() as db:
+        tracemalloc.start()
+        started = time.perf_counter()
+        chunks = iter(view(db).response)
+        first = next(chunks)
+        first_byte = time.perf_counter() - started
+        size = len(first) + sum(len(chunk) for chunk in chunks)
+        total = time.perf_counter() - started
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return first_byte, total, size, peak
+
+
+def main(rows: int = 200_000) -> None:
+    SessionLocal = make_db(rows)
+    app = Flask(__name__)
+    app.json = FastJSONProvider(app)
+    print(f"{rows} rows")
+    print(f"{'mode':14} {'first byte ms':>14} {'total ms':>10} {'body bytes':>12} {'peak MiB':>10}")
+    for name, view in [('materialized', materialized), ('streamed', streamed)]:
+        first_byte, total, size, peak = measure(app, SessionLocal, view)
+        print(f"{name:14} {first_byte * 1000:14.1f} {total * 1000:10.1f} {size:12,} {peak / 2 ** 20:10.1f}")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
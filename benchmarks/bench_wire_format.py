@@ -0,0 +1,52 @@
+# benchmarks/bench_wire_format.py
+# Compares the chart wire formats against the current path (row dicts with Decimal values through
+# Flask's JSON provider): encode time, throughput and payload size, raw and gzipped.
+# Usage: python -m benchmarks.bench_wire_format [rows]
+import gzip
+import sys
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+import numpy as np
+from flask import Flask
+
+from backend.utils import wire_format
+
+
+def make_records(rows: int):
+    rng = np.random.default_rng(0)
+    closes = np.round(100 + np.cumsum(rng.normal(0, 1, rows)), 2)
+    volumes = rng.integers(1_000, 10_000_000, rows)
+    start = date(1980, 1, 1)
+    return [{'date': (start + timedelta(days=i)).isoformat(), 'close': Decimal(str(c)), 'volume': int(v)}
+            for i, (c, v) in enumerate(zip(closes, volumes))]
+
+
+def _time(fn, repeat: int = 5) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main(rows: int = 100_000) -> None:
+    records = make_records(rows)
+    app = Flask(__name__)
+    fields = ['date', 'close', 'volume']
+    formats = [wire_format.ROWS_JSON] + [f for f in wire_format.available_formats() if f != wire_format.ROWS_JSON]
+    print(f"{rows} rows")
+    print(f"{'format':42} {'encode ms':>10} {'rows/s':>12} {'bytes':>12} {'gzip bytes':>12}")
+    with app.app_context():
+        for mimetype in formats:
+            encode = lambda: wire_format.encode(records, mimetype, fields, app.json.dumps)  # noqa: E731
+            body = encode()
+            seconds = _time(encode)
+            print(f"{mimetype:42} {seconds * 1000:10.1f} {rows / seconds:12,.0f} {len(body):12,} "
+                  f"{len(gzip.compress(body, 6)):12,}")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -257,9 +257,13 @@ let volumeCharts = {};
 
 function fetchGraphData(companyId, timeframe) {
     console.log("[DEBUG] fetchGraphData - companyId:", companyId, "timeframe:", timeframe);
+    // Ask the server for no more points than the chart has pixels; short ranges come back unchanged.
+    const canvas = document.getElementById(timeframe + 'Chart');
+    const points = Math.max(200, Math.min(2000, (canvas && canvas.clientWidth) || 1000));
     $.ajax({
-        url: `/api/graph/company/${companyId}/${timeframe}`,
+        url: `/api/graph/company/${companyId}/${timeframe}?points=${points}`,
         method: 'GET',
+        headers: { Accept: 'application/vnd.fypquant.columnar+json, application/json;q=0.5' },
         success: function (data) {
             renderCharts(data, timeframe);
         },
@@ -272,9 +276,11 @@ function fetchGraphData(companyId, timeframe) {
 
 function renderCharts(data, timeframe) { // Ensure timeframe is received here
     console.log("[DEBUG] renderCharts - Received data for timeframe:", timeframe, "Data:", data);
-    const labels = data.map(item => item.date);
-    const closePrices = data.map(item => item.close);
-    const volumes = data.map(item => item.volume);
+    // Columnar responses ({date: [], close: [], volume: []}) are used as-is; row arrays are split per field.
+    const columnar = !Array.isArray(data);
+    const labels = columnar ? data.date : data.map(item => item.date);
+    const closePrices = columnar ? data.close : data.map(item => item.close);
+    const volumes = columnar ? data.volume : data.map(item => item.volume);
     const stockCanvasId = timeframe + 'Chart';
     const stockCtx = document.getElementById(stockCanvasId).getContext('2d');
 
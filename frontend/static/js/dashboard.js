@@ -17,12 +17,19 @@ const filtersToggle = document.getElementById('filtersToggle');
 const filtersContainer = document.getElementById('filtersContainer');
 const industryCheckboxesContainer = document.getElementById('industryCheckboxes'); // Get the container for checkboxes
 
-let allFinancialData = [];
-let filteredFinancialData = []; // To hold data after search and filters
+let allFinancialData = []; // rows loaded so far for the active filters, newest first
+let nextCursor = null; // keyset cursor for the next page of /api/data/dashboard/latest (null when fully loaded)
+const DASHBOARD_FETCH_SIZE = 1000;
+let activeFilters = new URLSearchParams(); // search, industry and date filters, applied by the server
+let feedRequest = 0; // bumped per reload so a slower response for older filters is dropped
+let searchTimer = null;
 let industries = new Set();
 let currentPage = 1;
 let rowsPerPage = parseInt(pageSizeSelect.value, 10);
 let flatpickrFrom, flatpickrTo;
+let eventSource = null; // /api/events/stream: pushes the newest bar after each ingest
+let pendingBars = [];
+let barFlushTimer = null;
 
 document.addEventListener('DOMContentLoaded', () => {
     flatpickrFrom = flatpickr(dateFromInput, { dateFormat: "Y-m-d" });
@@ -49,9 +56,66 @@ document.addEventListener('DOMContentLoaded', () => {
     });
 
     applyFiltersButton.addEventListener('click', applyFilters);
+    loadIndustries();
     displayAllFinancialData();
+    subscribeToUpdates();
 });
 
+// Keeps the table current from server-sent events instead of re-fetching everything after an ingest.
+function subscribeToUpdates() {
+    if (!window.EventSource) {
+        return;
+    }
+    eventSource = new EventSource('/api/events/stream?types=bar');
+    eventSource.addEventListener('bar', (event) => {
+        pendingBars.push(JSON.parse(event.data));
+        if (!barFlushTimer) {
+            barFlushTimer = setTimeout(flushBarUpdates, 250); // one re-render per burst (bulk ingests)
+        }
+    });
+    // The server dropped events because this tab fell behind: reload the table once.
+    eventSource.addEventListener('resync', () => displayAllFinancialData());
+}
+
+function flushBarUpdates() {
+    barFlushTimer = null;
+    const bars = pendingBars;
+    pendingBars = [];
+    for (const bar of bars) {
+        if (bar.industry && !industries.has(bar.industry)) {
+            populateIndustryFilter([bar.industry]);
+        }
+        if (!matchesActiveFilters(bar)) {
+            continue;
+        }
+        const index = allFinancialData.findIndex(row => row.ticker_symbol === bar.ticker_symbol && row.date === bar.date);
+        if (index >= 0) {
+            allFinancialData[index] = { ...allFinancialData[index], ...bar };
+        } else {
+            allFinancialData.unshift(bar);
+        }
+    }
+    currentPage = Math.min(currentPage, Math.max(1, Math.ceil(allFinancialData.length / rowsPerPage)));
+    displayData(allFinancialData, currentPage);
+}
+
+// A pushed bar is checked against the same filters the server applied to the loaded rows.
+function matchesActiveFilters(bar) {
+    const search = (activeFilters.get('q') || '').toLowerCase();
+    const selectedIndustries = activeFilters.getAll('industry');
+    const dateFrom = activeFilters.get('date_from');
+    const dateTo = activeFilters.get('date_to');
+    const companyNameLower = bar.company_name ? bar.company_name.toLowerCase() : '';
+    return (search === '' || bar.ticker_symbol.toLowerCase().includes(search) || companyNameLower.includes(search)) &&
+        (selectedIndustries.length === 0 || selectedIndustries.includes(bar.industry)) &&
+        (!dateFrom || bar.date >= dateFrom) &&
+        (!dateTo || bar.date <= dateTo);
+}
+
+function isSubscribedToUpdates() {
+    return eventSource !== null && eventSource.readyState !== EventSource.CLOSED;
+}
+
 async function fetchAndStoreData() {
     console.log("fetchAndStoreData function called!");
     const ticker = tickerInput.value.toUpperCase();
@@ -66,7 +130,9 @@ async function fetchAndStoreData() {
 
             if (response.ok) {
                 ingestionStatus.textContent = result.message || `Data ingestion successful for ${ticker}`;
-                displayAllFinancialData();
+                if (!isSubscribedToUpdates()) {
+                    displayAllFinancialData(); // otherwise the new bar arrives as a 'bar' event
+                }
             } else {
                 ingestionStatus.textContent = result.error || `Failed to ingest data for ${ticker}`;
             }
@@ -78,11 +144,26 @@ async function fetchAndStoreData() {
     }
 }
 
+function dashboardFeedUrl(cursor) {
+    const params = new URLSearchParams(activeFilters);
+    params.set('limit', DASHBOARD_FETCH_SIZE);
+    if (cursor) {
+        params.set('cursor', cursor);
+    }
+    return `/api/data/dashboard/latest?${params}`;
+}
+
+// Loads the first page for the active filters, starting again from an empty cursor.
 async function displayAllFinancialData() {
     const latestDataDiv = document.getElementById('latestDataDisplay');
     latestDataDiv.textContent = 'Fetching all financial data...';
+    const request = ++feedRequest;
     try {
-        const response = await fetch('/api/data/dashboard/latest');
+        const response = await fetch(dashboardFeedUrl(null));
+        if (request !== feedRequest) {
+            return;
+        }
+        nextCursor = response.headers.get('X-Next-Cursor');
         if (response.status === 202) {
             const result = await response.json();
             latestDataDiv.textContent = result.message || 'Checking for updates... Data will refresh.';
@@ -92,14 +173,13 @@ async function displayAllFinancialData() {
             }, 5000); // Adjust the delay as needed
         } else if (response.ok) {
             const data = await response.json();
-            console.log("Data received from backend:", data);
-            if (!data || data.length === 0) {  // ADDED THIS CONDITION
-                latestDataDiv.textContent = "No financial data available (from backend).";
-                return; // Stop processing if no data
+            if (request !== feedRequest) {
+                return;
             }
-            allFinancialData = data;
-            populateIndustryFilter(allFinancialData);
-            applyFilters(); // Apply initial filters if any
+            console.log("Data received from backend:", data);
+            allFinancialData = data || [];
+            currentPage = 1;
+            displayData(allFinancialData, currentPage);
         } else {
             latestDataDiv.textContent = `Error fetching all financial data: ${response.statusText}`;
         }
@@ -108,20 +188,52 @@ async function displayAllFinancialData() {
     }
 }
 
-function populateIndustryFilter(data) {
-    industryCheckboxesContainer.innerHTML = ''; // Clear any existing checkboxes
-    industries.clear();
+// Fetches the next keyset page from the server and appends it to the loaded rows.
+async function loadMoreFinancialData() {
+    if (!nextCursor) {
+        return false;
+    }
+    const request = feedRequest;
+    const response = await fetch(dashboardFeedUrl(nextCursor));
+    if (!response.ok) {
+        console.error(`Error fetching more financial data: ${response.statusText}`);
+        return false;
+    }
+    const data = await response.json();
+    if (request !== feedRequest) {
+        return false; // the filters changed while this page was loading
+    }
+    nextCursor = response.headers.get('X-Next-Cursor');
+    allFinancialData = allFinancialData.concat(data);
+    return true;
+}
 
-    for (const item of data) {
-        if (item.industry && !industries.has(item.industry)) {
-            industries.add(item.industry);
+// The industry checkboxes list every industry, not just the ones on the loaded pages.
+async function loadIndustries() {
+    try {
+        const response = await fetch('/api/data/industries');
+        if (response.ok) {
+            populateIndustryFilter(await response.json());
+        } else {
+            console.error(`Error fetching industries: ${response.statusText}`);
+        }
+    } catch (error) {
+        console.error(`Error fetching industries: ${error.message}`);
+    }
+}
+
+// Adds a checkbox for each industry not listed yet, keeping the existing ones (and their checked state).
+function populateIndustryFilter(names) {
+    for (const industry of names) {
+        if (industry && !industries.has(industry)) {
+            industries.add(industry);
             const checkbox = document.createElement('input');
             checkbox.type = 'checkbox';
-            checkbox.value = item.industry;
-            checkbox.id = `industry-${item.industry.replace(/\s+/g, '-')}`; // Create a unique ID
+            checkbox.value = industry;
+            checkbox.id = `industry-${industry.replace(/\s+/g, '-')}`; // Create a unique ID
 
             const label = document.createElement('label');
-            label.textContent = item.industry;
+            label.textContent = industry;
             label.setAttribute('for', checkbox.id);
             label.classList.add('form-check-label', 'mr-2'); // Add Bootstrap classes for styling
 
@@ -166,7 +278,7 @@ function displayData(data, page) {
         totalPagesDisplay.textContent = totalPages;
         currentPageInput.value = page;
         prevPageButton.disabled = page === 1;
-        nextPageButton.disabled = page === totalPages;
+        nextPageButton.disabled = page === totalPages && !nextCursor;
 
         let paginationHtml = '';
         const maxVisiblePages = 5;
@@ -233,50 +345,35 @@ function displayData(data, page) {
     }
 }
 
+// Filters run on the server: the loaded rows are only the first pages of the result, so filtering them here would
+// miss matches further down. Re-query from an empty cursor instead.
 function applyFilters() {
-    console.log('applyFilters function called');
-
-    // Get the search term
-    const searchTerm = companySearchInput.value.toLowerCase();
-    console.log('Search Term:', searchTerm);
-
-    // Get selected industries from checkboxes
-    const selectedIndustries = Array.from(industryCheckboxesContainer.querySelectorAll('input[type="checkbox"]:checked'))
-        .map(checkbox => checkbox.value);
-    console.log('Selected Industries:', selectedIndustries);
-
-    // Get selected dates
-    const dateFrom = flatpickrFrom ? flatpickrFrom.selectedDates[0] : undefined;
-    const dateTo = flatpickrTo ? flatpickrTo.selectedDates[0] : undefined;
-    console.log('Date From:', dateFrom, 'Date To:', dateTo);
-
-    let filteredData = [...allFinancialData];
-
-    // Apply filters
-    filteredData = filteredData.filter(item => {
-        const companyNameLower = item.company_name ? item.company_name.toLowerCase() : '';
-        const searchMatch = searchTerm === '' || item.ticker_symbol.toLowerCase().includes(searchTerm) || companyNameLower.includes(searchTerm);
-        const industryMatch = selectedIndustries.length === 0 || selectedIndustries.includes(item.industry);
-        const dateMatch = (!dateFrom && !dateTo) ||
-                           (dateFrom && !dateTo && new Date(item.date) >= dateFrom) ||
-                           (!dateFrom && dateTo && new Date(item.date) <= dateTo) ||
-                           (dateFrom && dateTo && new Date(item.date) >= dateFrom && new Date(item.date) <= dateTo);
-        return searchMatch && industryMatch && dateMatch;
-    });
-    console.log('Final Filtered Data:', filteredData);
-
-    filteredFinancialData = filteredData;
-    currentPage = 1;
-    displayData(filteredFinancialData, currentPage);
-    console.log('filteredFinancialData before displayData:', filteredFinancialData);
+    const params = new URLSearchParams();
+    const searchTerm = companySearchInput.value.trim();
+    if (searchTerm) {
+        params.set('q', searchTerm);
+    }
+    industryCheckboxesContainer.querySelectorAll('input[type="checkbox"]:checked')
+        .forEach(checkbox => params.append('industry', checkbox.value));
+    if (dateFromInput.value) {
+        params.set('date_from', dateFromInput.value);
+    }
+    if (dateToInput.value) {
+        params.set('date_to', dateToInput.value);
+    }
+    activeFilters = params;
+    displayAllFinancialData();
 }
 
-companySearchInput.addEventListener('input', applyFilters);
+companySearchInput.addEventListener('input', () => {
+    clearTimeout(searchTimer);
+    searchTimer = setTimeout(applyFilters, 300); // one query per pause in typing
+});
 
 pageSizeSelect.addEventListener('change', () => {
     rowsPerPage = parseInt(pageSizeSelect.value, 10);
     currentPage = 1;
-    displayData(filteredFinancialData, currentPage);
+    displayData(allFinancialData, currentPage);
 });
 
 paginationContainer.addEventListener('click', (event) => {
@@ -286,7 +383,7 @@ paginationContainer.addEventListener('click', (event) => {
         const page = parseInt(target.dataset.page, 10);
         if (!isNaN(page)) {
             currentPage = page;
-            displayData(filteredFinancialData, currentPage);
+            displayData(allFinancialData, currentPage);
         }
     }
 });
@@ -294,32 +391,38 @@ paginationContainer.addEventListener('click', (event) => {
 prevPageButton.addEventListener('click', () => {
     if (currentPage > 1) {
         currentPage--;
-        displayData(filteredFinancialData, currentPage);
+        displayData(allFinancialData, currentPage);
     }
 });
 
-nextPageButton.addEventListener('click', () => {
-    const totalPages = Math.ceil(filteredFinancialData.length / rowsPerPage);
+nextPageButton.addEventListener('click', async () => {
+    const totalPages = Math.ceil(allFinancialData.length / rowsPerPage);
     if (currentPage < totalPages) {
         currentPage++;
-        displayData(filteredFinancialData, currentPage);
+        displayData(allFinancialData, currentPage);
+    } else if (nextCursor) {
+        const page = currentPage;
+        if (await loadMoreFinancialData()) {
+            currentPage = Math.min(page + 1, Math.max(1, Math.ceil(allFinancialData.length / rowsPerPage)));
+            displayData(allFinancialData, currentPage);
+        }
     }
 });
 
 currentPageInput.addEventListener('change', () => {
     const pageNumber = parseInt(currentPageInput.value, 10);
-    const totalPages = Math.ceil(filteredFinancialData.length / rowsPerPage);
+    const totalPages = Math.ceil(allFinancialData.length / rowsPerPage);
     if (!isNaN(pageNumber) && pageNumber >= 1 && pageNumber <= totalPages) {
         currentPage = pageNumber;
-        displayData(filteredFinancialData, currentPage);
+        displayData(allFinancialData, currentPage);
     } else if (isNaN(pageNumber) || pageNumber < 1) {
         currentPageInput.value = 1;
         currentPage = 1;
-        displayData(filteredFinancialData, currentPage);
+        displayData(allFinancialData, currentPage);
     } else {
         currentPageInput.value = totalPages;
         currentPage = totalPages;
-        displayData(filteredFinancialData, currentPage);
+        displayData(allFinancialData, currentPage);
     }
 });
 
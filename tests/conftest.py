@@ -1,10 +1,15 @@
-# backend/conftest.py
+# tests/conftest.py
 import pytest
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, Session
-from backend.models import Base  # Import Base
+from sqlalchemy.pool import StaticPool
+import backend.database as database  # before backend.models: the models package imports from it
+from backend.database import Base
 from backend.app import create_app  # Import your Flask app factory
-from backend.config import TEST_DATABASE_URL  # Import the test database URL
+from backend.services import watermark_service
+
+# One in-memory SQLite database per test; StaticPool keeps every session on the same connection (and database).
+TEST_DATABASE_URL = "sqlite://"
 
 @pytest.fixture(scope="session")
 def app():
@@ -14,13 +19,13 @@ def app():
     with app.app_context():
         yield app
 
-@pytest.fixture(scope="session")
+@pytest.fixture
 def engine():
-    """Create an in-memory SQLite engine for testing."""
-    engine = create_engine(TEST_DATABASE_URL)
+    """Create an in-memory SQLite engine with every table for testing."""
+    engine = create_engine(TEST_DATABASE_URL, poolclass=StaticPool, connect_args={'check_same_thread': False})
     Base.metadata.create_all(bind=engine)  # Create tables in the test database
     yield engine
-    Base.metadata.drop_all(bind=engine)
+    engine.dispose()
 
 @pytest.fixture(scope="function")
 def db(engine):
@@ -33,3 +38,16 @@ def db(engine):
     session.close()
     transaction.rollback()
     connection.close()
+
+@pytest.fixture
+def serve_reads(monkeypatch):
+    """
+    Points the read sessions of route modules (their `attribute` accessor) and the conditional-GET watermark
+    lookups at a test sessionmaker: serve_reads(SessionLocal, module, ..., attribute='get_read_db').
+    """
+    def serve(SessionLocal, *modules, attribute: str = 'get_read_db') -> None:
+        for module in modules:
+            monkeypatch.setattr(module, attribute, lambda: SessionLocal())
+        monkeypatch.setattr(database, 'get_read_session_local', lambda: SessionLocal)
+        watermark_service.clear_watermark_cache()
+    return serve
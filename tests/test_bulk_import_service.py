@@ -0,0 +1,99 @@
+# tests/test_bulk_import_service.py
+from datetime import date
+from decimal import Decimal
+
+import pandas as pd
+import pytest
+
+import backend.database as database
+from backend.database import Base
+from backend.models.data_model import Company, FinancialData
+from backend.services.bulk_import_service import add_unique_bar_key, has_unique_bar_key, import_prices
+from sqlalchemy.orm import sessionmaker
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = database._create_engine(f"sqlite:///{tmp_path / 'bulk.sqlite3'}")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    session.add_all([Company(company_name="Apple", ticker_symbol="AAPL"), Company(company_name="Microsoft", ticker_symbol="MSFT")])
+    session.commit()
+    session.close()
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def price_file(tmp_path):
+    path = tmp_path / 'prices.csv'
+    pd.DataFrame({
+        'Symbol': ['AAPL', 'AAPL', 'msft', 'ZZZZ', 'MSFT'],
+        'Date': ['2024-01-02', '2024-01-03', '2024-01-02', '2024-01-02', 'not a date'],
+        'Open': [185.0, 184.2, 370.1, 1.0, 1.0],
+        'High': [186.1, 185.9, 375.0, 1.0, 1.0],
+        'Low': [183.9, 183.4, 369.5, 1.0, 1.0],
+        'Close': [185.64, 184.25, 370.87, 1.0, 1.0],
+        'Volume': [82488700, 58414500, None, 1, 1],
+    }).to_csv(path, index=False)
+    return str(path)
+
+
+def test_import_maps_tickers_and_skips_bad_rows(engine, price_file):
+    stats = import_prices(price_file, engine=engine, chunk_size=2)
+
+    assert stats['rows_read'] == 5
+    assert stats['rows_loaded'] == 3
+    assert stats['rows_skipped'] == 2  # unknown ticker + unparseable date
+    assert stats['unknown_tickers'] == ['ZZZZ']
+
+    session = sessionmaker(bind=engine)()
+    rows = session.query(FinancialData).order_by(FinancialData.company_id, FinancialData.date).all()
+    assert [(row.date, row.close, row.volume) for row in rows] == [
+        (date(2024, 1, 2), Decimal('185.64'), 82488700),
+        (date(2024, 1, 3), Decimal('184.25'), 58414500),
+        (date(2024, 1, 2), Decimal('370.87'), None),
+    ]
+    assert rows[0].created_at is not None
+    session.close()
+
+
+def test_reimport_ignores_duplicate_bars(engine, price_file):
+    import_prices(price_file, engine=engine)
+    stats = import_prices(price_file, engine=engine)
+    assert stats['rows_loaded'] == 0
+    assert stats['rows_duplicate'] == 3
+
+
+def test_create_missing_adds_companies(engine, price_file):
+    stats = import_prices(price_file, engine=engine, create_missing=True)
+    assert stats['rows_loaded'] == 4
+    assert stats['unknown_tickers'] == []
+    session = sessionmaker(bind=engine)()
+    assert session.query(Company).filter_by(ticker_symbol='ZZZZ').count() == 1
+    session.close()
+
+
+def test_missing_required_column_is_rejected(engine, tmp_path):
+    path = tmp_path / 'bad.csv'
+    pd.DataFrame({'ticker': ['AAPL'], 'date': ['2024-01-02']}).to_csv(path, index=False)
+    with pytest.raises(ValueError):
+        import_prices(str(path), engine=engine)
+
+
+def test_import_refuses_to_run_without_the_unique_key(engine, price_file):
+    with engine.begin() as connection:
+        connection.exec_driver_sql("CREATE TABLE legacy AS SELECT * FROM financial_data")
+        connection.exec_driver_sql("DROP TABLE financial_data")
+        connection.exec_driver_sql("ALTER TABLE legacy RENAME TO financial_data")
+        connection.exec_driver_sql("INSERT INTO financial_data (data_id, company_id, date, close) VALUES "
+                                   "(1, 1, '2024-01-02', 1.00), (2, 1, '2024-01-02', 2.00), (3, 2, '2024-01-02', 3.00)")
+    assert not has_unique_bar_key(engine)
+    with pytest.raises(RuntimeError):
+        import_prices(price_file, engine=engine)
+
+    assert add_unique_bar_key(engine) == 1
+    assert has_unique_bar_key(engine) and add_unique_bar_key(engine) == 0
+    with engine.connect() as connection:
+        assert connection.exec_driver_sql("SELECT data_id FROM financial_data ORDER BY data_id").scalars().all() == [2, 3]
+    assert import_prices(price_file, engine=engine)['rows_loaded'] == 1  # only AAPL 2024-01-03 is new
@@ -0,0 +1,108 @@
+# tests/test_compression.py
+import gzip
+import json
+import os
+
+import pytest
+from flask import Flask, jsonify
+
+from backend.utils import compression
+
+
+@pytest.fixture
+def app(tmp_path):
+    static = tmp_path / 'static'
+    (static / 'js').mkdir(parents=True)
+    (static / 'js' / 'big.js').write_text("console.log('chart');\n" * 500)
+    (static / 'js' / 'tiny.js').write_text("1;")
+    app = Flask(__name__, static_folder=str(static), static_url_path='/static')
+
+    @app.route('/big')
+    def big():
+        return jsonify([{'date': '2024-01-01', 'close': 10.5, 'volume': 1000}] * 500)
+
+    @app.route('/small')
+    def small():
+        return jsonify({'ok': True})
+
+    compression.init_compression(app)
+    compression.reset_compression_stats()
+    return app
+
+
+def test_large_json_is_gzipped_and_counted(app):
+    response = app.test_client().get('/big', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response.headers['Vary']
+    body = gzip.decompress(response.get_data())
+    assert len(json.loads(body)) == 500
+    stats = compression.compression_stats()
+    assert stats['gzip']['bytes_in'] == len(body)
+    assert stats['gzip']['bytes_out'] == len(response.get_data())
+    assert stats['total']['saved'] > 0
+
+
+def test_small_and_unaccepted_responses_are_untouched(app):
+    client = app.test_client()
+    assert 'Content-Encoding' not in client.get('/small', headers={'Accept-Encoding': 'gzip'}).headers
+    assert 'Content-Encoding' not in client.get('/big').headers
+    assert 'Content-Encoding' not in client.get('/big', headers={'Accept-Encoding': 'gzip;q=0'}).headers
+
+
+def test_strong_etag_is_weakened_when_compressed(app):
+    @app.route('/tagged')
+    def tagged():
+        response = jsonify(list(range(2000)))
+        response.set_etag('abc')
+        return response
+
+    response = app.test_client().get('/tagged', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['ETag'] == 'W/"abc"'
+
+
+def test_static_assets_are_precompressed_and_served(app, tmp_path):
+    assert (tmp_path / 'static' / 'js' / 'big.js.gz').exists()
+    assert not (tmp_path / 'static' / 'js' / 'tiny.js.gz').exists()
+
+    client = app.test_client()
+    response = client.get('/static/js/big.js', headers={'Accept-Encoding': 'gzip, deflate'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert response.mimetype in ('text/javascript', 'application/javascript')
+    assert gzip.decompress(response.get_data()).startswith(b"console.log")
+    response.close()
+
+    plain = client.get('/static/js/big.js')
+    assert 'Content-Encoding' not in plain.headers
+    plain.close()
+    assert compression.compression_stats()['static-gzip']['responses'] == 1
+
+
+def test_streamed_responses_are_compressed_per_chunk_and_event_streams_are_not(app):
+    @app.route('/stream')
+    def stream():
+        return app.response_class((json.dumps({'n': i}).encode() + b'\n' for i in range(200)), mimetype='application/json')
+
+    @app.route('/events')
+    def events():
+        return app.response_class(iter([b'data: 1\n\n']), mimetype='text/event-stream')
+
+    client = app.test_client()
+    response = client.get('/stream', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Content-Length' not in response.headers
+    assert gzip.decompress(response.get_data()).count(b'\n') == 200
+    assert compression.compression_stats()['gzip-stream']['responses'] == 1
+
+    assert 'Content-Encoding' not in client.get('/events', headers={'Accept-Encoding': 'gzip'}).headers
+
+
+def test_precompressed_files_are_replaced_atomically(tmp_path, monkeypatch):
+    source = tmp_path / 'app.js'
+    source.write_text("console.log('x');" * 200)
+    replaced = []
+    real_replace = os.replace
+    monkeypatch.setattr(compression.os, 'replace', lambda src, dst: (replaced.append(dst), real_replace(src, dst)))
+    compression.precompress_static(str(tmp_path), min_bytes=0)
+    assert str(tmp_path / 'app.js.gz') in replaced
+    assert gzip.decompress((tmp_path / 'app.js.gz').read_bytes()) == source.read_bytes()
+    assert not [name for name in os.listdir(tmp_path) if name.endswith('.tmp')]
@@ -0,0 +1,128 @@
+# tests/test_dashboard_pagination.py
+from datetime import date, timedelta
+
+import pytest
+from flask import Flask
+from sqlalchemy.orm import sessionmaker
+
+from backend.models.data_model import Company, FinancialData
+import backend.routes.data_routes as data_routes
+from backend.services import watermark_service
+from backend.utils.data_utils import decode_cursor, encode_cursor
+
+
+@pytest.fixture
+def client(engine, serve_reads):
+    SessionLocal = sessionmaker(bind=engine)
+    session = SessionLocal()
+    for ticker, industry in [("AAA", "Tech"), ("BBB", "Energy")]:
+        company = Company(company_name=f"{ticker} Inc", ticker_symbol=ticker, industry=industry)
+        session.add(company)
+        session.flush()
+        for day in range(5):
+            session.add(FinancialData(company_id=company.company_id, date=date(2024, 1, 1) + timedelta(days=day),
+                                      open=10 + day, high=11 + day, low=9 + day, close=10.5 + day, volume=1000 * day))
+    session.commit()
+    session.close()
+    serve_reads(SessionLocal, data_routes)
+
+    app = Flask(__name__)
+    app.register_blueprint(data_routes.data_routes_bp)
+    yield app.test_client()
+
+
+def _walk(client, url):
+    pages, cursor = [], None
+    while True:
+        response = client.get(url + (f"&cursor={cursor}" if cursor else ""))
+        assert response.status_code == 200
+        pages.append(response.get_json())
+        cursor = response.headers.get('X-Next-Cursor')
+        if not cursor:
+            return pages
+
+
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor(date(2024, 3, 1), 42)) == (date(2024, 3, 1), 42)
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
+
+
+def test_keyset_pages_cover_all_rows_once_newest_first(client):
+    pages = _walk(client, "/api/data/dashboard/latest?limit=3")
+    assert [len(page) for page in pages] == [3, 3, 3, 1]
+    rows = [row for page in pages for row in page]
+    keys = [(row['date'], row['ticker_symbol']) for row in rows]
+    assert len(set(keys)) == 10
+    assert [row['date'] for row in rows] == sorted((row['date'] for row in rows), reverse=True)
+
+
+def test_bar_ingested_between_probe_and_stream_is_not_skipped(client, monkeypatch):
+    stream_page = data_routes.iter_rows
+
+    def ingest_then_stream(db, statement):
+        if not ingested:
+            session = data_routes.get_read_db()
+            company = Company(company_name="CCC Inc", ticker_symbol="CCC", industry="Tech")
+            session.add(company)
+            session.flush()
+            session.add(FinancialData(company_id=company.company_id, date=date(2024, 1, 5), open=1, high=1, low=1,
+                                      close=1, volume=1))
+            session.commit()
+            session.close()
+            ingested.append(True)
+        return stream_page(db, statement)
+
+    ingested = []
+    monkeypatch.setattr(data_routes, 'iter_rows', ingest_then_stream)
+    pages = _walk(client, "/api/data/dashboard/latest?limit=3")
+    keys = [(row['date'], row['ticker_symbol']) for page in pages for row in page]
+    assert len(pages[0]) == 4 and ('2024-01-04', 'BBB') in keys
+    assert len(keys) == len(set(keys)) == 11
+
+
+def test_link_header_points_to_next_page(client):
+    response = client.get("/api/data/dashboard/latest?limit=4&ticker=AAA")
+    assert 'rel="next"' in response.headers['Link']
+    assert f"cursor={response.headers['X-Next-Cursor']}" in response.headers['Link']
+    link = client.get("/api/data/dashboard/latest?limit=2&industry=Tech&industry=Energy").headers['Link']
+    assert 'industry=Tech' in link and 'industry=Energy' in link
+
+
+def test_projection_and_filters(client):
+    response = client.get("/api/data/dashboard/latest?fields=ticker_symbol,date,close&ticker=bbb"
+                          "&date_from=2024-01-02&date_to=2024-01-03")
+    data = response.get_json()
+    assert [set(row) for row in data] == [{'ticker_symbol', 'date', 'close'}] * 2
+    assert [row['date'] for row in data] == ['2024-01-03', '2024-01-02']
+    assert 'X-Next-Cursor' not in response.headers
+
+
+def test_search_and_industry_filters_run_before_paging(client):
+    pages = _walk(client, "/api/data/dashboard/latest?limit=2&q=bb")
+    assert {row['ticker_symbol'] for page in pages for row in page} == {'BBB'}
+    assert sum(len(page) for page in pages) == 5
+    data = client.get("/api/data/dashboard/latest?industry=Tech&industry=Utilities").get_json()
+    assert {row['ticker_symbol'] for row in data} == {'AAA'} and len(data) == 5
+    assert client.get("/api/data/dashboard/latest?q=%25").get_json() == []
+
+
+def test_industries_lists_every_industry(client):
+    assert client.get("/api/data/industries").get_json() == ['Energy', 'Tech']
+
+
+def test_revalidation_is_keyed_by_cursor_and_filters(client):
+    session = data_routes.get_read_db()
+    watermark_service.bump_watermarks(session, [1, 2])
+    session.close()
+    first = client.get("/api/data/dashboard/latest?limit=3")
+    assert client.get("/api/data/dashboard/latest?limit=3",
+                      headers={'If-None-Match': first.headers['ETag']}).status_code == 304
+    for other in ["limit=3&industry=Tech", f"limit=3&cursor={first.headers['X-Next-Cursor']}"]:
+        response = client.get(f"/api/data/dashboard/latest?{other}", headers={'If-None-Match': first.headers['ETag']})
+        assert response.status_code == 200 and response.headers['ETag'] != first.headers['ETag']
+
+
+@pytest.mark.parametrize("query", ["limit=0", "limit=abc", "fields=password", "date_from=yesterday", "cursor=zzz"])
+def test_invalid_parameters_are_rejected(client, query):
+    assert client.get(f"/api/data/dashboard/latest?{query}").status_code == 400
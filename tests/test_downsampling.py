@@ -0,0 +1,54 @@
+# tests/test_downsampling.py
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+
+from backend.utils.downsampling import downsample_records, lttb_indices, minmax_indices
+
+
+def _records(n):
+    rng = np.random.default_rng(0)
+    closes = 100 + np.cumsum(rng.normal(0, 1, n))
+    volumes = rng.integers(1_000, 2_000, n)
+    volumes[n // 3] = 1_000_000  # one spike that must survive
+    return [{'date': (date(1990, 1, 1) + timedelta(days=i)).isoformat(), 'close': float(c), 'volume': int(v)}
+            for i, (c, v) in enumerate(zip(closes, volumes))]
+
+
+def test_lttb_keeps_endpoints_and_target_count():
+    y = np.sin(np.linspace(0, 20, 10_000))
+    indices = lttb_indices(y, 500)
+    assert len(indices) == 500
+    assert indices[0] == 0 and indices[-1] == 9_999
+    assert np.all(np.diff(indices) > 0)
+
+
+def test_lttb_preserves_extremes_of_the_shape():
+    y = np.zeros(5_000)
+    y[1_234] = 50.0
+    y[3_210] = -50.0
+    indices = lttb_indices(y, 100)
+    assert 1_234 in indices and 3_210 in indices
+
+
+def test_minmax_keeps_every_bucket_extreme():
+    y = np.random.default_rng(1).normal(size=2_000)
+    indices = minmax_indices(y, 200)
+    assert int(np.argmax(y)) in indices and int(np.argmin(y)) in indices
+    assert len(indices) <= 202
+
+
+def test_downsample_records_aggregates_volume_and_shrinks_payload():
+    records = _records(15_000)  # ~40 years of daily bars
+    reduced = downsample_records(records, 1_000)
+    assert len(reduced) == 1_000
+    assert max(r['volume'] for r in reduced) == 1_000_000
+    assert all(r['date'] in {rec['date'] for rec in records} for r in reduced[:10])
+
+
+def test_short_series_and_bad_method():
+    records = _records(50)
+    assert downsample_records(records, 1_000) is records
+    with pytest.raises(ValueError):
+        downsample_records(records, 10, method='average')
@@ -0,0 +1,144 @@
+# tests/test_event_stream.py
+import json
+from datetime import date
+
+import pytest
+from flask import Flask
+from sqlalchemy.orm import sessionmaker
+
+import backend.database as database
+import backend.routes.event_routes as event_routes
+from backend.models.data_model import Company, FinancialData
+from backend.services import event_service, watermark_service
+from backend.services.event_service import EventBroker, SQLiteEventLog
+
+
+def _data(event):
+    return json.loads(event['data'])
+
+
+def test_events_fan_out_to_every_matching_subscriber():
+    broker = EventBroker()
+    bars = broker.subscribe(['bar'])
+    everything = broker.subscribe()
+
+    broker.publish('bar', {'company_id': 1})
+    broker.publish('sentiment', {'company_id': 1})
+
+    assert bars.get(0)['type'] == 'bar'
+    assert bars.get(0) is None  # filtered out
+    assert everything.get(0)['type'] == 'bar'
+    assert everything.get(0)['type'] == 'sentiment'
+    broker.unsubscribe(bars)
+    assert broker.stats()['subscribers'] == 1
+
+
+def test_slow_subscriber_keeps_newest_events_and_counts_drops():
+    broker = EventBroker(queue_size=3)
+    subscription = broker.subscribe()
+
+    for i in range(5):
+        broker.publish('bar', {'n': i})
+
+    assert subscription.take_dropped() == 2
+    assert [_data(subscription.get(0))['n'] for _ in range(3)] == [2, 3, 4]
+
+
+def test_reconnect_replays_events_after_last_event_id():
+    broker = EventBroker()
+    first = broker.publish('bar', {'n': 1})
+    broker.publish('bar', {'n': 2})
+
+    subscription = broker.subscribe(last_event_id=first)
+
+    assert _data(subscription.get(0)) == {'n': 2}
+    assert subscription.get(0) is None
+
+
+def test_max_subscribers_is_enforced():
+    broker = EventBroker(max_subscribers=1)
+    assert broker.subscribe() is not None
+    assert broker.subscribe() is None
+
+
+def test_shared_log_delivers_events_across_workers(tmp_path):
+    path = str(tmp_path / 'events.sqlite3')
+    worker_a = EventBroker(log=SQLiteEventLog(path), poll_seconds=3600)  # polled by hand below
+    worker_b = EventBroker(log=SQLiteEventLog(path), poll_seconds=3600)
+    subscription = worker_b.subscribe(['bar'])
+
+    event_id = worker_a.publish('bar', {'company_id': 7})
+    worker_b.poll_once()
+
+    event = subscription.get(0)
+    assert event['id'] == event_id and _data(event) == {'company_id': 7}
+    resumed = worker_b.subscribe(last_event_id=event_id - 1)
+    assert resumed.get(0)['id'] == event_id
+    worker_a.close()
+    worker_b.close()
+
+
+@pytest.fixture
+def SessionLocal(engine, monkeypatch):
+    SessionLocal = sessionmaker(bind=engine)
+    session = SessionLocal()
+    session.add(Company(company_name="AAA Inc", ticker_symbol="AAA", industry="Tech"))
+    session.flush()
+    session.add(FinancialData(company_id=1, date=date(2024, 1, 2), open=1, high=2, low=1, close=2, volume=10))
+    session.commit()
+    session.close()
+    monkeypatch.setattr(database, 'get_session_local', lambda app=None: SessionLocal)
+    yield SessionLocal
+
+
+def test_ingest_publishes_the_new_bar(SessionLocal, monkeypatch):
+    broker = EventBroker()
+    monkeypatch.setattr(event_service, 'broker', broker)
+    subscription = broker.subscribe(['bar'])
+    db = SessionLocal()
+
+    watermark_service.bump_watermarks(db, [1])
+
+    bar = _data(subscription.get(0))
+    assert bar['company_id'] == 1 and bar['ticker_symbol'] == "AAA"
+    assert bar['date'] == '2024-01-02' and bar['close'] == 2
+    db.close()
+
+
+def test_stream_endpoint_sends_events_in_sse_framing(monkeypatch):
+    broker = EventBroker()
+    monkeypatch.setattr(event_routes, 'broker', broker)
+    app = Flask(__name__)
+    app.register_blueprint(event_routes.event_routes_bp)
+    client = app.test_client()
+
+    response = client.get('/api/events/stream?types=bar', buffered=False)
+    chunks = response.response
+    assert response.mimetype == 'text/event-stream'
+    assert next(chunks).startswith(b'retry:')
+    event_id = broker.publish('bar', {'company_id': 3})
+    assert next(chunks) == f'id: {event_id}\nevent: bar\ndata: {{"company_id":3}}\n\n'.encode()
+    response.close()
+    assert broker.stats()['subscribers'] == 0
+
+    assert client.get('/api/events/stream?types=quotes').status_code == 400
+
+
+def test_anonymous_subscribers_only_get_bar_events(monkeypatch):
+    broker = EventBroker()
+    monkeypatch.setattr(event_routes, 'broker', broker)
+    app = Flask(__name__)
+    app.secret_key = 'test'
+    app.register_blueprint(event_routes.event_routes_bp)
+    client = app.test_client()
+
+    assert client.get('/api/events/stream?types=bar,sentiment').status_code == 401
+    response = client.get('/api/events/stream', buffered=False)
+    assert broker._subscribers[0].event_types == {'bar'}
+    response.close()
+
+    with client.session_transaction() as session:
+        session['user_id'] = 1
+    response = client.get('/api/events/stream?types=sentiment', buffered=False)
+    assert response.status_code == 200
+    response.close()
@@ -0,0 +1,116 @@
+# tests/test_financial_summary.py
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+from flask import Flask
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+
+import backend.api as api
+import backend.database as database
+from backend.models.data_model import Company, CompanySnapshot, FinancialData
+from backend.services import summary_service, watermark_service
+
+LATEST = date(2024, 6, 28)
+
+
+@pytest.fixture
+def SessionLocal(engine):
+    SessionLocal = sessionmaker(bind=engine)
+    session = SessionLocal()
+    session.add(Company(company_name="AAA Inc", ticker_symbol="AAA"))
+    session.flush()
+    bars = [
+        (LATEST - timedelta(days=400), 500, 1, None),  # outside the 52-week window
+        (LATEST - timedelta(days=365), 90, 5, Decimal('0.12')),  # window start is inclusive
+        (LATEST - timedelta(days=30), 60, 20, None),
+        (LATEST, 55, 45, None),
+    ]
+    for day, high, low, roi in bars:
+        session.add(FinancialData(company_id=1, date=day, open=50, high=high, low=low, close=50, volume=1000,
+                                  roi=roi, eps=Decimal('1.5') if roi else None))
+    session.commit()
+    session.close()
+    return SessionLocal
+
+
+def test_summary_combines_latest_bar_range_fundamentals_and_snapshot(SessionLocal, engine):
+    db = SessionLocal()
+    db.add(CompanySnapshot(company_id=1, market_cap=2_000_000_000, beta=Decimal('1.1'),
+                           ex_dividend_date=date(2024, 5, 1), updated_at=LATEST))
+    db.commit()
+    statements = []
+    event.listen(engine, 'before_cursor_execute', lambda *args: statements.append(args[2]))
+
+    summary = summary_service.get_financial_summary(db, 1)
+
+    assert len(statements) == 1
+    assert summary['date'] == LATEST.isoformat()
+    assert summary['fifty_two_week_high'] == 90
+    assert summary['fifty_two_week_low'] == 5
+    assert summary['roi'] == Decimal('0.12') and summary['eps'] == Decimal('1.5')
+    assert summary['market_cap'] == 2_000_000_000
+    assert summary['ex_dividend_date'] == '2024-05-01'
+    assert summary['target_mean_price'] is None
+    db.close()
+
+
+def test_summary_without_fundamentals_or_snapshot(SessionLocal):
+    db = SessionLocal()
+    db.query(FinancialData).update({FinancialData.roi: None})
+    db.commit()
+
+    summary = summary_service.get_financial_summary(db, 1)
+
+    assert 'roi' not in summary
+    assert summary['market_cap'] is None
+    assert summary_service.get_financial_summary(db, 99) == {}
+    db.close()
+
+
+def test_refresh_company_snapshots_upserts_and_bumps_watermark(SessionLocal, monkeypatch):
+    class FakeTicker:
+        def __init__(self, ticker):
+            self.info = {'marketCap': 123.0, 'beta': 0.9, 'earningsDate': [1719792000], 'exDividendDate': 1714521600}
+
+    monkeypatch.setattr(summary_service.yf, 'Ticker', FakeTicker)
+    db = SessionLocal()
+
+    assert summary_service.refresh_company_snapshots(db) == 1
+    assert summary_service.refresh_company_snapshots(db) == 1
+
+    snapshot = db.query(CompanySnapshot).one()
+    assert snapshot.market_cap == 123
+    assert snapshot.earnings_date == date(2024, 7, 1)
+    assert snapshot.ex_dividend_date == date(2024, 5, 1)
+    assert watermark_service.get_company_watermark(db, 1)['version'] == 2
+    db.close()
+
+
+def test_financial_data_endpoint_makes_no_upstream_call(SessionLocal, monkeypatch, serve_reads):
+    monkeypatch.setattr(summary_service.yf, 'Ticker', lambda ticker: pytest.fail("live yfinance call"))
+    serve_reads(SessionLocal, api)
+    app = Flask(__name__)
+    app.register_blueprint(api.api_bp, url_prefix='/api')
+
+    response = app.test_client().get('/api/company/1/financial_data')
+
+    assert response.status_code == 200
+    data = response.get_json()['financial_data']
+    assert float(data['fifty_two_week_high']) == 90
+    assert 'market_cap' in data
+
+
+def test_changed_fundamentals_bump_the_watermark(SessionLocal, monkeypatch):
+    from backend.services import data_service
+
+    monkeypatch.setattr(database, 'note_primary_write', lambda: None)
+    db = SessionLocal()
+    company = db.get(Company, 1)
+    fundamentals = {LATEST: {'eps': Decimal('2.5'), 'roi': Decimal('0.2')}}
+    assert data_service._store_historical_fundamentals(db, company, fundamentals) == 1
+    assert watermark_service.get_company_watermark(db, 1)['version'] == 1
+    assert data_service._store_historical_fundamentals(db, company, fundamentals) == 0  # unchanged: no bump
+    assert watermark_service.get_company_watermark(db, 1)['version'] == 1
+    db.close()
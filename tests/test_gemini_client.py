@@ -0,0 +1,139 @@
+# tests/test_gemini_client.py
+import json
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from backend.services import gemini_client, llm_service
+from backend.services.gemini_client import GeminiClient, RateLimiter
+
+
+class FakeModel:
+    created = []
+
+    def __init__(self, name, delay=0.0, fail_on=None):
+        self.name = name
+        self.delay = delay
+        self.fail_on = fail_on
+        self.calls = []
+        FakeModel.created.append(name)
+
+    def generate_content(self, contents, request_options=None):
+        self.calls.append(request_options)
+        time.sleep(self.delay)
+        if contents[0] == self.fail_on:
+            raise RuntimeError("503 unavailable")
+        return SimpleNamespace(parts=[SimpleNamespace(text=f" echo: {contents[0]} ")], resolve=lambda: None,
+                               usage_metadata=SimpleNamespace(prompt_token_count=10, candidates_token_count=3))
+
+
+@pytest.fixture
+def genai(monkeypatch):
+    configured = []
+    FakeModel.created = []
+    monkeypatch.setattr(gemini_client.genai, 'configure', lambda api_key: configured.append(api_key))
+    monkeypatch.setattr(gemini_client.genai, 'GenerativeModel', FakeModel)
+    return configured
+
+
+def test_model_handles_are_configured_once_and_reused(genai, monkeypatch):
+    monkeypatch.setenv('GOOGLE_API_KEY', 'key-1')
+    client = GeminiClient()
+    assert client.model('flash') is client.model('flash')
+    client.model('pro')
+    assert (genai, FakeModel.created) == (['key-1'], ['flash', 'pro'])
+    monkeypatch.setenv('GOOGLE_API_KEY', 'key-2')  # rotated key: reconfigure and rebuild
+    client.model('flash')
+    assert (genai, FakeModel.created) == (['key-1', 'key-2'], ['flash', 'pro', 'flash'])
+
+
+def test_generate_returns_text_tokens_and_passes_the_timeout(genai):
+    client = GeminiClient(api_key='k', timeout=30)
+    response = client.generate('hello', 'flash')
+    assert (response.text, response.error, response.prompt_tokens, response.output_tokens) == ('echo: hello', None, 10, 3)
+    assert client.model('flash').calls[0]['timeout'] == pytest.approx(30, abs=1)
+
+
+def test_missing_api_key_is_an_error_response(genai, monkeypatch):
+    monkeypatch.delenv('GOOGLE_API_KEY', raising=False)
+    response = GeminiClient().generate('hello', 'flash')
+    assert response.text is None and isinstance(response.error, RuntimeError)
+
+
+def test_analyze_many_runs_concurrently_and_keeps_order(genai, monkeypatch):
+    monkeypatch.setattr(gemini_client.genai, 'GenerativeModel', lambda name: FakeModel(name, delay=0.1, fail_on='prompt #7'))
+    client = GeminiClient(api_key='k', max_concurrency=100)
+    started = time.perf_counter()
+    responses = client.analyze_many([f"prompt #{index}" for index in range(100)], 'flash')
+    elapsed = time.perf_counter() - started
+    assert elapsed < 1.0  # close to one 0.1 s call, not 100 of them
+    assert [response.text for response in responses[:3]] == ['echo: prompt #0', 'echo: prompt #1', 'echo: prompt #2']
+    assert [index for index, response in enumerate(responses) if response.error is not None] == [7]
+
+
+def test_concurrency_is_bounded_by_the_client_slots(genai, monkeypatch):
+    in_flight, peak, lock = [0], [0], threading.Lock()
+
+    class CountingModel(FakeModel):
+        def generate_content(self, contents, request_options=None):
+            with lock:
+                in_flight[0] += 1
+                peak[0] = max(peak[0], in_flight[0])
+            try:
+                return super().generate_content(contents, request_options)
+            finally:
+                with lock:
+                    in_flight[0] -= 1
+
+    monkeypatch.setattr(gemini_client.genai, 'GenerativeModel', lambda name: CountingModel(name, delay=0.02))
+    client = GeminiClient(api_key='k', max_concurrency=4)
+    results = [None, None]
+    batches = [threading.Thread(target=lambda slot=slot: results.__setitem__(slot, client.analyze_many(['p'] * 20, 'flash')))
+               for slot in range(2)]
+    for batch in batches:
+        batch.start()
+    for batch in batches:
+        batch.join()
+    assert peak[0] == 4  # two batches share the four slots
+    assert all(response.error is None for batch in results for response in batch)
+
+
+def test_waiting_for_a_slot_times_out(genai, monkeypatch):
+    monkeypatch.setattr(gemini_client.genai, 'GenerativeModel', lambda name: FakeModel(name, delay=0.5))
+    client = GeminiClient(api_key='k', max_concurrency=1)
+    holder = threading.Thread(target=client.generate, args=('slow', 'flash'))
+    holder.start()
+    time.sleep(0.05)
+    response = client.generate('fast', 'flash', timeout=0.05)
+    holder.join()
+    assert isinstance(response.error, TimeoutError)
+
+
+def test_rate_limiter_spaces_calls(monkeypatch):
+    slept = []
+    monkeypatch.setattr(gemini_client.time, 'monotonic', lambda: 100.0)
+    monkeypatch.setattr(gemini_client.time, 'sleep', slept.append)
+    limiter = RateLimiter(per_minute=120)
+    for _ in range(4):
+        limiter.wait()
+    assert slept == [0.5, 1.0, 1.5]
+
+
+def test_sentiment_analysis_goes_through_the_shared_client(genai, monkeypatch):
+    report = {"overall_news_summary": "S", "brief_overall_sentiment": "Positive (Score: 70/100)"}
+
+    class ReportModel(FakeModel):
+        def generate_content(self, contents, request_options=None):
+            super().generate_content(contents, request_options)
+            return SimpleNamespace(parts=[SimpleNamespace(text=f"```json\n{json.dumps(report)}\n```")],
+                                   resolve=lambda: None, usage_metadata=None)
+
+    monkeypatch.setattr(gemini_client.genai, 'GenerativeModel', ReportModel)
+    monkeypatch.setattr(llm_service, 'gemini_client', GeminiClient(api_key='k'))
+    articles = [{'title': 'T', 'description': 'D'}]
+    first = llm_service.analyze_news_sentiment_gemini(articles, prompt='analyze', llm_model='flash')
+    llm_service.analyze_news_sentiment_gemini(articles, prompt='analyze', llm_model='flash')
+    assert first['brief_overall_sentiment'] == "Positive (Score: 70/100)"
+    assert first['key_offerings'] == [] and FakeModel.created == ['flash']
@@ -0,0 +1,148 @@
+# tests/test_graph_cache.py
+from datetime import date, timedelta
+
+import pytest
+from flask import Flask
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+
+import backend.routes.graph_routes as graph_routes
+from backend.models.data_model import Company, FinancialData
+from backend.services import watermark_service
+from backend.services.graph_service import graph_cache
+from backend.utils.response_cache import LRUResponseCache, SQLiteSharedCache, TieredResponseCache
+
+
+def test_lru_evicts_least_recently_used_by_count_and_bytes():
+    cache = LRUResponseCache(max_entries=2, max_bytes=10)
+    cache.set('a', b'1234')
+    cache.set('b', b'1234')
+    cache.get('a')
+    cache.set('c', b'1234')  # over max_entries: 'b' is the least recently used
+    assert cache.get('b') is None
+    assert cache.get('a') == b'1234'
+    cache.set('d', b'12345678')  # over max_bytes
+    assert cache.stats()['bytes'] <= 10
+    assert cache.get('d') == b'12345678'
+    cache.set('huge', b'x' * 11)  # larger than the whole cache: never stored
+    assert cache.get('huge') is None
+    assert cache.stats()['evictions'] >= 2
+
+
+def test_tag_invalidation_only_drops_that_tag():
+    cache = LRUResponseCache()
+    cache.set((1, 'max'), b'one', tag=1)
+    cache.set((1, 'weekly'), b'one-w', tag=1)
+    cache.set((2, 'max'), b'two', tag=2)
+    assert cache.invalidate_tag(1) == 2
+    assert cache.get((1, 'max')) is None
+    assert cache.get((2, 'max')) == b'two'
+
+
+def test_shared_tier_serves_other_workers_and_invalidates_for_all(tmp_path):
+    path = str(tmp_path / 'graph_cache.sqlite3')
+    worker_a = TieredResponseCache(LRUResponseCache(), SQLiteSharedCache(path))
+    worker_b = TieredResponseCache(LRUResponseCache(), SQLiteSharedCache(path))
+
+    worker_a.set((7, 'max', 1), b'payload', tag=7)
+    assert worker_b.get((7, 'max', 1), tag=7) == b'payload'
+    assert worker_b.stats()['shared']['hits'] == 1
+
+    worker_a.invalidate_tag(7)
+    assert worker_b.shared.get((7, 'max', 1)) is None
+
+
+def test_shared_tier_respects_byte_limit(tmp_path):
+    shared = SQLiteSharedCache(str(tmp_path / 'cache.sqlite3'), max_bytes=10)
+    shared.set('old', b'123456')
+    shared.set('new', b'123456')
+    assert shared.get('old') is None
+    assert shared.get('new') == b'123456'
+
+
+def test_shared_tier_keeps_a_running_size_total_across_workers(tmp_path):
+    path = str(tmp_path / 'cache.sqlite3')
+    worker_a, worker_b = SQLiteSharedCache(path), SQLiteSharedCache(path)
+    worker_a.set('a', b'1234', tag=1)
+    worker_b.set('a', b'12', tag=1)  # replaced, not added
+    worker_b.set('b', b'123', tag=2)
+    assert (worker_a.stats()['bytes'], worker_a.stats()['entries']) == (5, 2)
+    worker_a.invalidate_tag(2)
+    assert worker_b.stats()['bytes'] == 2
+    worker_b.clear()
+    assert SQLiteSharedCache(path).stats()['bytes'] == 0
+
+
+@pytest.fixture
+def client(engine, serve_reads):
+    SessionLocal = sessionmaker(bind=engine)
+    session = SessionLocal()
+    company = Company(company_name="Graph Corp", ticker_symbol="GRPH")
+    session.add(company)
+    session.flush()
+    for day in range(3):
+        session.add(FinancialData(company_id=company.company_id, date=date.today() - timedelta(days=day),
+                                  open=10, high=11, low=9, close=10 + day, volume=100))
+    session.commit()
+    watermark_service.bump_watermarks(session, [company.company_id])
+    session.close()
+    serve_reads(SessionLocal, graph_routes)
+    graph_cache.clear()
+
+    app = Flask(__name__)
+    app.config['HTTP_CACHE_DISABLED'] = True  # exercise the response cache, not 304s
+    app.register_blueprint(graph_routes.graph_routes_bp)
+    client = app.test_client()
+    client.SessionLocal = SessionLocal
+    return client
+
+
+def test_repeat_requests_are_served_from_cache(client, engine):
+    first = client.get('/api/graph/company/1/max')
+    hits = graph_cache.stats()['local']['hits']
+    statements = []
+    event.listen(engine, 'before_cursor_execute', lambda *args: statements.append(args[2]))
+
+    second = client.get('/api/graph/company/1/max')
+
+    assert second.status_code == 200
+    assert second.data == first.data
+    assert not [s for s in statements if 'financial_data' in s]
+    assert graph_cache.stats()['local']['hits'] == hits + 1
+
+
+def test_ingest_invalidates_the_company_entries(client):
+    assert len(client.get('/api/graph/company/1/max').get_json()) == 3
+
+    session = client.SessionLocal()
+    session.add(FinancialData(company_id=1, date=date.today() + timedelta(days=1), open=1, high=1, low=1, close=1, volume=1))
+    session.commit()
+    watermark_service.bump_watermarks(session, [1])
+    session.close()
+
+    assert graph_cache.stats()['local']['entries'] == 0
+    assert len(client.get('/api/graph/company/1/max').get_json()) == 4
+
+
+def test_errors_are_not_cached(client):
+    assert client.get('/api/graph/company/1/decade').status_code == 400
+    assert graph_cache.stats()['local']['entries'] == 0
+
+
+def test_points_parameter_downsamples_and_is_part_of_the_key(client):
+    full = client.get('/api/graph/company/1/max').get_json()
+    reduced = client.get('/api/graph/company/1/max?points=3&downsample=minmax').get_json()
+    assert len(full) == 3 and len(reduced) == 3
+    assert graph_cache.stats()['local']['entries'] == 2
+    assert client.get('/api/graph/company/1/max?points=1').status_code == 400
+    assert client.get('/api/graph/company/1/max?points=10&downsample=mean').status_code == 400
+
+
+def test_wire_format_is_negotiated_and_cached_separately(client):
+    rows = client.get('/api/graph/company/1/max')
+    columnar = client.get('/api/graph/company/1/max', headers={'Accept': 'application/vnd.fypquant.columnar+json'})
+    assert rows.mimetype == 'application/json' and isinstance(rows.get_json(), list)
+    assert columnar.mimetype == 'application/vnd.fypquant.columnar+json'
+    assert len(columnar.get_json(force=True)['close']) == 3
+    assert 'Accept' in columnar.headers['Vary']
+    assert graph_cache.stats()['local']['entries'] == 2
@@ -0,0 +1,81 @@
+# tests/test_graph_compare.py
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+from flask import Flask
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+
+import backend.routes.graph_routes as graph_routes
+from backend.models.data_model import Company, FinancialData
+from backend.services import watermark_service
+from backend.utils import wire_format
+
+TODAY = date.today()
+
+
+@pytest.fixture
+def engine(engine):
+    session = sessionmaker(bind=engine)()
+    for ticker in ["AAA", "BBB", "CCC"]:
+        session.add(Company(company_name=f"{ticker} Inc", ticker_symbol=ticker))
+    session.flush()
+    # AAA trades on days 0-2, BBB on days 1-3 (different holidays), CCC has no data
+    for company_id, offset, closes in [(1, 0, [10, 11, 12]), (2, 1, [50, 25, 100])]:
+        for i, close in enumerate(closes):
+            session.add(FinancialData(company_id=company_id, date=TODAY - timedelta(days=10 - offset - i),
+                                      open=close, high=close, low=close, close=close, volume=1))
+    session.commit()
+    session.close()
+    yield engine
+
+
+@pytest.fixture
+def client(engine, serve_reads):
+    SessionLocal = sessionmaker(bind=engine)
+    serve_reads(SessionLocal, graph_routes)
+    app = Flask(__name__)
+    app.register_blueprint(graph_routes.graph_routes_bp)
+    return app.test_client()
+
+
+def test_series_are_aligned_on_the_union_of_dates_in_one_query(client, engine):
+    statements = []
+    event.listen(engine, 'before_cursor_execute', lambda *args: statements.append(args[2]))
+
+    response = client.get('/api/graph/compare?company_ids=1,2,3&timeframe=monthly')
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert len([s for s in statements if 'financial_data' in s]) == 1
+    assert body['date'] == [(TODAY - timedelta(days=d)).isoformat() for d in (10, 9, 8, 7)]
+    assert body['series']['1'] == [10, 11, 12, None]
+    assert body['series']['2'] == [None, 50, 25, 100]
+    assert body['series']['3'] == [None, None, None, None]
+    assert body['missing'] == [3]
+
+
+def test_rebase_starts_each_series_at_100(client):
+    body = client.get('/api/graph/compare?company_ids=2,1&timeframe=max&normalize=rebase').get_json()
+
+    assert body['company_ids'] == [2, 1]  # order of the request
+    assert body['series']['1'] == [100, 110, 120, None]
+    assert body['series']['2'] == [None, 100, 50, 200]
+
+
+def test_float64_wire_format(client):
+    response = client.get('/api/graph/compare?company_ids=1,2&timeframe=max',
+                          headers={'Accept': wire_format.FLOAT64_BINARY})
+
+    assert response.mimetype == wire_format.FLOAT64_BINARY
+    columns = wire_format.decode_float64(response.data)
+    assert list(columns) == ['date', '1', '2']
+    assert np.isnan(columns['2'][0]) and columns['2'][3] == 100
+
+
+@pytest.mark.parametrize('query', ['company_ids=', 'company_ids=1,x', 'company_ids=1&normalize=log',
+                                   'company_ids=1&timeframe=daily',
+                                   'company_ids=' + ','.join(str(i) for i in range(100))])
+def test_invalid_requests_are_rejected(client, query):
+    assert client.get(f'/api/graph/compare?{query}').status_code == 400
@@ -0,0 +1,31 @@
+# tests/test_gunicorn_conf.py
+import pytest
+
+from backend import gunicorn_conf
+
+
+def test_gevent_profile_uses_one_worker_per_core(monkeypatch):
+    monkeypatch.setattr(gunicorn_conf, '_gevent_available', lambda: True)
+    settings = gunicorn_conf.worker_settings('gevent', 4)
+    assert settings['worker_class'] == 'gevent'
+    assert settings['workers'] == 4
+    assert settings['worker_connections'] == gunicorn_conf.GUNICORN_WORKER_CONNECTIONS
+
+
+def test_gevent_profile_falls_back_to_gthread_without_gevent(monkeypatch):
+    monkeypatch.setattr(gunicorn_conf, '_gevent_available', lambda: False)
+    settings = gunicorn_conf.worker_settings('gevent', 2)
+    assert settings['worker_class'] == 'gthread'
+    assert settings['threads'] == gunicorn_conf.GUNICORN_THREADS
+
+
+def test_sync_profile_keeps_process_per_request_sizing():
+    assert gunicorn_conf.worker_settings('sync', 2) == {
+        'worker_class': 'sync', 'workers': 5, 'threads': 1,
+        'worker_connections': gunicorn_conf.GUNICORN_WORKER_CONNECTIONS,
+    }
+
+
+def test_unknown_profile_is_rejected():
+    with pytest.raises(ValueError):
+        gunicorn_conf.worker_settings('eventlet', 2)
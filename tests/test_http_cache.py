@@ -0,0 +1,89 @@
+# tests/test_http_cache.py
+from datetime import date, timedelta
+
+import pytest
+from flask import Flask
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+
+import backend.routes.graph_routes as graph_routes
+from backend.models.data_model import Company, FinancialData
+from backend.services import watermark_service
+from backend.services.graph_service import graph_cache
+
+
+@pytest.fixture
+def SessionLocal(engine, serve_reads):
+    SessionLocal = sessionmaker(bind=engine)
+    session = SessionLocal()
+    for ticker in ["AAA", "BBB"]:
+        company = Company(company_name=f"{ticker} Inc", ticker_symbol=ticker)
+        session.add(company)
+        session.flush()
+        for day in range(3):
+            session.add(FinancialData(company_id=company.company_id, date=date.today() - timedelta(days=day),
+                                      open=10, high=11, low=9, close=10, volume=100))
+    session.commit()
+    watermark_service.bump_watermarks(session, [1])  # company 2 has never been stamped
+    session.close()
+    serve_reads(SessionLocal, graph_routes)
+    graph_cache.clear()
+    return SessionLocal
+
+
+@pytest.fixture
+def client(SessionLocal):
+    app = Flask(__name__)
+    app.register_blueprint(graph_routes.graph_routes_bp)
+    return app.test_client()
+
+
+def test_first_response_carries_validators(client):
+    response = client.get('/api/graph/company/1/max')
+    assert response.status_code == 200
+    assert response.headers['ETag']
+    assert response.headers['Last-Modified']
+    assert 'max-age=' in response.headers['Cache-Control']
+
+
+def test_revalidation_answers_304_without_touching_the_database(client, engine):
+    etag = client.get('/api/graph/company/1/max').headers['ETag']
+    statements = []
+    event.listen(engine, 'before_cursor_execute', lambda *args: statements.append(args[2]))
+
+    response = client.get('/api/graph/company/1/max', headers={'If-None-Match': etag})
+
+    assert response.status_code == 304
+    assert statements == []
+
+
+def test_if_modified_since(client):
+    last_modified = client.get('/api/graph/company/1/max').headers['Last-Modified']
+    assert client.get('/api/graph/company/1/max', headers={'If-Modified-Since': last_modified}).status_code == 304
+    assert client.get('/api/graph/company/1/max',
+                      headers={'If-Modified-Since': 'Mon, 01 Jan 2001 00:00:00 GMT'}).status_code == 200
+
+
+def test_validators_differ_per_timeframe_and_change_on_ingest(client, SessionLocal):
+    max_etag = client.get('/api/graph/company/1/max').headers['ETag']
+    assert client.get('/api/graph/company/1/weekly').headers['ETag'] != max_etag
+
+    session = SessionLocal()
+    watermark_service.bump_watermarks(session, [1])
+    session.close()
+    response = client.get('/api/graph/company/1/max', headers={'If-None-Match': max_etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != max_etag
+
+
+def test_company_without_watermark_is_served_uncached(client):
+    response = client.get('/api/graph/company/2/max')
+    assert response.status_code == 200
+    assert 'ETag' not in response.headers
+    assert len(response.get_json()) == 3
+
+
+def test_errors_are_not_cached(client):
+    response = client.get('/api/graph/company/1/decade')
+    assert response.status_code == 400
+    assert 'ETag' not in response.headers
@@ -0,0 +1,79 @@
+# tests/test_instrumentation.py
+import gzip
+import time
+
+import pytest
+from flask import Flask, jsonify
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+
+from backend.utils import compression, instrumentation
+
+
+@pytest.fixture
+def app():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    app = Flask(__name__)
+
+    @app.route('/items/<int:item_id>')
+    def item(item_id):
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1")).all()
+            connection.execute(text("SELECT :id"), {'id': item_id}).all()
+        with instrumentation.upstream_call('yfinance'):
+            time.sleep(0.01)
+        return jsonify({'id': item_id, 'rows': list(range(1000))})
+
+    @app.route('/fast')
+    def fast():
+        return jsonify({'ok': True})
+
+    instrumentation.init_instrumentation(app)
+    compression.init_compression(app, precompress=False)
+    instrumentation.reset_perf_stats()
+    return app
+
+
+def _timings(response):
+    return {entry.split(';')[0]: entry for entry in response.headers.getlist('Server-Timing')}
+
+
+def test_server_timing_reports_queries_and_upstream_calls(app):
+    response = app.test_client().get('/items/7')
+    timings = _timings(response)
+    assert 'desc="2 queries"' in timings['db']
+    assert 'desc="1 calls"' in timings['upstream']
+    assert float(timings['app'].split('dur=')[1]) >= 10
+
+
+def test_requests_without_upstream_calls_skip_that_entry(app):
+    timings = _timings(app.test_client().get('/fast'))
+    assert set(timings) == {'db', 'app'}
+    assert 'desc="0 queries"' in timings['db']
+
+
+def test_queries_outside_requests_are_not_counted(app):
+    engine = create_engine("sqlite://")
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1")).all()
+    assert instrumentation.current_stats() is None
+
+
+def test_slowest_endpoints_table(app):
+    client = app.test_client()
+    for item_id in range(3):
+        client.get(f'/items/{item_id}')
+    client.get('/fast')
+    rows = instrumentation.perf_stats()
+    assert [row['endpoint'] for row in rows] == ['GET /items/<int:item_id>', 'GET /fast']
+    assert rows[0]['requests'] == 3
+    assert rows[0]['avg_queries'] == 2
+    assert rows[0]['avg_upstream_calls'] == 1
+    assert rows[0]['p95_ms'] >= rows[1]['p95_ms']
+
+
+def test_recorded_size_is_the_compressed_size(app):
+    response = app.test_client().get('/items/1', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert len(gzip.decompress(response.get_data())) > len(response.get_data())
+    assert instrumentation.perf_stats()[0]['avg_bytes'] == len(response.get_data())
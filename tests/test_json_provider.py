@@ -0,0 +1,50 @@
+# tests/test_json_provider.py
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+import numpy as np
+import pytest
+from flask import Flask, jsonify
+
+from backend.utils import json_provider
+from backend.utils.json_provider import FastJSONProvider
+
+PAYLOAD = {
+    'close': Decimal('10.25'),
+    'date': date(2024, 1, 2),
+    'updated_at': datetime(2024, 1, 2, 3, 4, 5),
+    'series': np.array([1.5, 2.5]),
+    'count': np.int64(3),
+    1: 'int keys are allowed',
+}
+EXPECTED = {'close': 10.25, 'date': '2024-01-02', 'updated_at': '2024-01-02T03:04:05',
+            'series': [1.5, 2.5], 'count': 3, '1': 'int keys are allowed'}
+
+
+@pytest.fixture(params=['orjson', 'stdlib'])
+def app(request, monkeypatch):
+    if request.param == 'stdlib':
+        monkeypatch.setattr(json_provider, 'orjson', None)
+    elif json_provider.orjson is None:
+        pytest.skip("orjson is not installed")
+    app = Flask(__name__)
+    app.json = FastJSONProvider(app)
+    return app
+
+
+def test_jsonify_handles_decimal_dates_and_numpy(app):
+    with app.app_context():
+        response = jsonify(PAYLOAD)
+    assert response.mimetype == 'application/json'
+    assert json.loads(response.get_data()) == EXPECTED
+
+
+def test_dumps_and_loads_round_trip(app):
+    with app.app_context():
+        assert app.json.loads(app.json.dumps(PAYLOAD)) == EXPECTED
+
+
+def test_unknown_types_still_raise(app):
+    with app.app_context(), pytest.raises(TypeError):
+        app.json.dumps({'value': object()})
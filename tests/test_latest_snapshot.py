@@ -0,0 +1,50 @@
+# tests/test_latest_snapshot.py
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+
+from backend.models.data_model import Company, FinancialData
+from backend.services import watermark_service
+from backend.services.data_service import get_latest_bars
+
+
+@pytest.fixture
+def SessionLocal(engine):
+    SessionLocal = sessionmaker(bind=engine)
+    session = SessionLocal()
+    for ticker in ["AAA", "BBB", "CCC"]:
+        company = Company(company_name=f"{ticker} Inc", ticker_symbol=ticker)
+        session.add(company)
+        session.flush()
+        for day in range(3):
+            session.add(FinancialData(company_id=company.company_id, date=date(2024, 1, 1) + timedelta(days=day),
+                                      open=10, high=11, low=9, close=10 + day, volume=100))
+    session.commit()
+    watermark_service.bump_watermarks(session, [1, 2, 3])
+    session.close()
+    return SessionLocal
+
+
+def test_latest_bar_per_company_in_one_query(SessionLocal, engine):
+    statements = []
+    event.listen(engine, 'before_cursor_execute', lambda *args: statements.append(args[2]))
+    session = SessionLocal()
+
+    rows = get_latest_bars(session)
+
+    assert [row['ticker_symbol'] for row in rows] == ["AAA", "BBB", "CCC"]
+    assert {row['date'] for row in rows} == {"2024-01-03"}
+    assert len(statements) == 1  # independent of the number of companies
+    assert [row['company_id'] for row in get_latest_bars(session, [2])] == [2]
+    session.close()
+
+
+def test_bump_records_latest_date_and_version(SessionLocal):
+    session = SessionLocal()
+    watermark_service.bump_watermarks(session, [1])
+    watermark = watermark_service.get_company_watermark(session, 1)
+    session.close()
+    assert watermark['version'] == 2
+    assert watermark['last_date'] == date(2024, 1, 3)
@@ -0,0 +1,167 @@
+# tests/test_metrics.py
+import os
+import subprocess
+import sys
+import threading
+
+import pytest
+
+from backend.utils import metrics
+from backend.utils.metrics import Counter, Gauge, Histogram, Registry
+
+
+def _lines(registry):
+    return registry.render().splitlines()
+
+
+def test_counter_with_labels_renders_in_text_format():
+    registry = Registry()
+    calls = registry.register(Counter('calls_total', "Calls.", ['service']))
+    calls.labels('gemini').inc()
+    calls.labels('gemini').inc(2)
+    calls.labels('guardian').inc()
+    lines = _lines(registry)
+    assert lines[:2] == ['# HELP calls_total Calls.', '# TYPE calls_total counter']
+    assert 'calls_total{service="gemini"} 3' in lines
+    assert 'calls_total{service="guardian"} 1' in lines
+
+
+def test_label_values_are_normalized_and_escaped():
+    registry = Registry()
+    latency = registry.register(Counter('requests_total', "Requests.", ['status', 'route']))
+    latency.labels(200, 'a"b').inc()
+    latency.labels('200', 'a"b').inc()
+    assert 'requests_total{status="200",route="a\\"b"} 2' in _lines(registry)
+
+
+def test_wrong_label_count_is_rejected():
+    with pytest.raises(ValueError):
+        Counter('x_total', "X.", ['service']).labels('a', 'b')
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = Registry()
+    latency = registry.register(Histogram('latency_seconds', "Latency.", buckets=(0.1, 1)))
+    for value in (0.05, 0.5, 0.5, 3):
+        latency.observe(value)
+    lines = _lines(registry)
+    assert 'latency_seconds_bucket{le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{le="1"} 3' in lines
+    assert 'latency_seconds_bucket{le="+Inf"} 4' in lines
+    assert 'latency_seconds_sum 4.05' in lines
+    assert 'latency_seconds_count 4' in lines
+
+
+def test_increments_from_many_threads_are_not_lost():
+    counter = Counter('threads_total', "Threads.")
+    gauge = Gauge('in_flight', "In flight.")
+
+    def work():
+        for _ in range(10000):
+            counter.inc()
+            gauge.inc()
+        for _ in range(10000):
+            gauge.dec()
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert counter.labels().value == 80000
+    assert gauge.labels().value == 0
+
+
+def test_greenlets_share_their_thread_cell_under_gevent():
+    pytest.importorskip('gevent')
+    script = (
+        "from gevent import monkey; monkey.patch_all()\n"
+        "import gevent\n"
+        "from backend.utils.metrics import Counter, Histogram\n"
+        "calls, latency = Counter('c_total', 'C.'), Histogram('h_seconds', 'H.')\n"
+        "def request():\n"
+        "    calls.inc(); gevent.sleep(0); latency.observe(0.1)\n"
+        "gevent.joinall([gevent.spawn(request) for _ in range(1000)])\n"
+        "print(len(calls.labels()._cells), len(latency.labels()._cells), calls.labels().value)\n"
+    )
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    output = subprocess.run([sys.executable, '-c', script], cwd=root, capture_output=True, text=True, check=True).stdout
+    assert output.split() == ['1', '1', '1000']
+
+
+def test_callback_metrics_collect_at_scrape_time_from_several_modules():
+    registry = Registry()
+    sizes = {'graph': 3}
+    registry.register(metrics.CallbackMetric('cache_entries', "Entries.", lambda: [({'cache': 'graph'}, sizes['graph'])]))
+
+    def watermark_entries():
+        return [({'cache': 'watermark'}, 7)]
+
+    registry.register(metrics.CallbackMetric('cache_entries', "Entries.", watermark_entries))
+    sizes['graph'] = 5
+    lines = _lines(registry)
+    assert 'cache_entries{cache="graph"} 5' in lines
+    assert 'cache_entries{cache="watermark"} 7' in lines
+
+
+def test_broken_collector_does_not_break_the_scrape():
+    registry = Registry()
+    registry.register(metrics.CallbackMetric('broken', "Broken.", lambda: 1 / 0))
+    registry.register(Counter('ok_total', "Ok.")).inc()
+    lines = _lines(registry)
+    assert '# broken collection failed: ZeroDivisionError' in lines
+    assert 'ok_total 1' in lines
+
+
+def test_registering_a_name_twice_returns_the_same_metric():
+    registry = Registry()
+    first = registry.register(Counter('rows_total', "Rows.", ['kind']))
+    assert registry.register(Counter('rows_total', "Rows.", ['kind'])) is first
+    with pytest.raises(ValueError):
+        registry.register(Gauge('rows_total', "Rows."))
+
+
+def test_timed_job_records_duration_and_outcome():
+    from backend import tasks
+
+    @tasks.timed_job
+    def sample_job():
+        return 'done'
+
+    @tasks.timed_job
+    def failing_job():
+        raise RuntimeError('boom')
+
+    assert sample_job() == 'done'
+    with pytest.raises(RuntimeError):
+        failing_job()
+    text = metrics.render()
+    assert 'job_runs_total{job="sample_job",outcome="success"} 1' in text
+    assert 'job_runs_total{job="failing_job",outcome="error"} 1' in text
+    assert 'job_duration_seconds_count{job="sample_job"} 1' in text
+    assert 'job_last_success_timestamp_seconds{job="failing_job"}' not in text
+
+
+def test_requests_and_upstream_calls_reach_the_default_registry():
+    from flask import Flask
+    from backend.utils import instrumentation
+
+    app = Flask(__name__)
+
+    @app.route('/metrics-probe/<int:item_id>')
+    def probe(item_id):
+        with instrumentation.upstream_call('metrics-probe'):
+            pass
+        try:
+            with instrumentation.upstream_call('metrics-probe'):
+                raise ConnectionError('upstream down')
+        except ConnectionError:
+            pass
+        return {'id': item_id}
+
+    instrumentation.init_instrumentation(app)
+    app.test_client().get('/metrics-probe/1')
+    text = metrics.render()
+    assert 'http_request_duration_seconds_count{method="GET",route="/metrics-probe/<int:item_id>",status="200"} 1' in text
+    assert 'upstream_calls_total{service="metrics-probe"} 2' in text
+    assert 'upstream_errors_total{service="metrics-probe"} 1' in text
@@ -0,0 +1,101 @@
+# tests/test_news_refresh.py
+from datetime import datetime, timedelta
+
+import pytest
+from flask import Flask
+from sqlalchemy.orm import sessionmaker
+
+import backend.api as api
+import backend.database as database
+from backend.models.data_model import Company, News
+from backend.services import news_refresh_service
+
+
+def _article(title, url, published='2024-01-02T10:00:00Z'):
+    return {'title': title, 'description': f"{title} summary", 'url': url, 'publishedAt': published,
+            'source': {'name': 'Yahoo Finance'}}
+
+
+@pytest.fixture
+def SessionLocal(engine, monkeypatch):
+    SessionLocal = sessionmaker(bind=engine)
+    session = SessionLocal()
+    session.add(Company(company_name="AAA Inc", ticker_symbol="AAA", industry="Tech", exchange="NASDAQ"))
+    session.commit()
+    session.close()
+    monkeypatch.setattr(database, 'get_session_local', lambda app=None: SessionLocal)
+    news_refresh_service._last_refresh.clear()
+    yield SessionLocal
+    news_refresh_service.wait_for_refreshes(timeout=5)
+
+
+@pytest.fixture
+def fetch_calls(monkeypatch):
+    calls = []
+
+    def fake_fetch(ticker, industry, exchange, company_name):
+        calls.append(ticker)
+        return [_article("Company story", "https://finance.yahoo.com/a")], \
+            [_article("Industry story", "https://www.theguardian.com/b")]
+
+    monkeypatch.setattr(news_refresh_service, 'fetch_latest_news', fake_fetch)
+    return calls
+
+
+@pytest.fixture
+def client(SessionLocal, serve_reads):
+    serve_reads(SessionLocal, api)
+    app = Flask(__name__)
+    app.secret_key = 'test'
+    app.register_blueprint(api.api_bp, url_prefix='/api')
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['user_id'] = 1
+    return client
+
+
+def test_company_page_serves_stored_news_and_refreshes_in_background(client, SessionLocal, fetch_calls):
+    response = client.get('/api/company/AAA')
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['company_news'] == [] and body['news_refreshing'] is True
+    assert news_refresh_service.wait_for_refreshes(timeout=5) == [True]
+    assert fetch_calls == ["AAA"]
+
+    body = client.get('/api/company/AAA').get_json()
+    assert body['news_refreshing'] is False  # just refreshed
+    assert [news['title'] for news in body['company_news']] == ["Company story"]
+    assert body['industry_news'][0]['title'] == "Industry story"
+    assert body['industry_news'][0]['source'] == {'name': 'The Guardian'}
+    assert fetch_calls == ["AAA"]
+
+
+def test_fresh_stored_news_is_not_refreshed(SessionLocal, fetch_calls):
+    db = SessionLocal()
+    db.add(News(company_id=1, title="Stored", link="https://finance.yahoo.com/s",
+                published_date=datetime(2024, 1, 1), created_at=datetime.now()))
+    db.commit()
+
+    news = news_refresh_service.get_company_news(db, 1)
+
+    assert news['refreshing'] is False
+    assert [article['title'] for article in news['company_news']] == ["Stored"]
+    assert fetch_calls == []
+    db.close()
+
+
+def test_stale_news_schedules_one_refresh_per_company(SessionLocal, fetch_calls):
+    db = SessionLocal()
+    db.add(News(company_id=1, title="Old", link="https://finance.yahoo.com/old",
+                published_date=datetime(2024, 1, 1), created_at=datetime.now() - timedelta(days=2)))
+    db.commit()
+
+    first = news_refresh_service.schedule_refresh(1)
+    second = news_refresh_service.schedule_refresh(1)
+    assert first is second or first.done()
+    news_refresh_service.wait_for_refreshes(timeout=5)
+
+    assert fetch_calls == ["AAA"]
+    assert news_refresh_service.is_stale(1, datetime.now() - timedelta(days=2)) is False
+    db.close()
@@ -0,0 +1,70 @@
+# tests/test_news_retention.py
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend.database import Base
+from backend.models.data_model import Company, News, NewsArchive
+from backend.services.data_service import store_news_articles
+from backend.services.news_retention_service import compact_news, get_archived_news
+
+NOW = datetime(2025, 6, 1, 12, 0)
+
+
+@pytest.fixture
+def db_session():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+@pytest.fixture
+def company(db_session):
+    company = Company(company_name="Retention Corp", ticker_symbol="RTN")
+    db_session.add(company)
+    db_session.commit()
+    return company
+
+
+def _add_news(db_session, company, ages_in_days):
+    for i, age in enumerate(ages_in_days):
+        db_session.add(News(company_id=company.company_id, title=f"Article {i}", link=f"http://news/{i}",
+                            published_date=NOW - timedelta(days=age), summary=f"Summary {i} " * 20))
+    db_session.commit()
+
+
+def test_compaction_applies_age_limit_and_cap(db_session, company):
+    _add_news(db_session, company, [1, 2, 3, 4, 200])
+
+    result = compact_news(db_session, max_age_days=90, max_per_company=3, now=NOW)
+
+    assert result['archived'] == 2
+    remaining = [n.title for n in db_session.query(News).order_by(News.published_date.desc())]
+    assert remaining == ["Article 0", "Article 1", "Article 2"]
+    archived = get_archived_news(db_session, company.company_id)
+    assert [a['title'] for a in archived] == ["Article 3", "Article 4"]
+    assert archived[0]['summary'] == "Summary 3 " * 20
+    assert len(db_session.query(NewsArchive).first().summary_compressed) < len(archived[0]['summary'])
+
+
+def test_compaction_is_idempotent(db_session, company):
+    _add_news(db_session, company, [1, 2])
+    assert compact_news(db_session, max_age_days=90, max_per_company=10, now=NOW)['archived'] == 0
+    assert db_session.query(News).count() == 2
+
+
+def test_archived_urls_are_not_reinserted(db_session, company):
+    _add_news(db_session, company, [200])
+    compact_news(db_session, max_age_days=90, max_per_company=10, now=NOW)
+
+    store_news_articles(db_session, company.company_id, [
+        {'title': "Article 0", 'url': "http://news/0", 'description': "again", 'publishedAt': "2025-01-01T00:00:00Z"},
+        {'title': "Fresh", 'url': "http://news/fresh", 'description': "new", 'publishedAt': "2025-06-01T00:00:00Z"},
+    ])
+
+    assert [n.link for n in db_session.query(News)] == ["http://news/fresh"]
@@ -0,0 +1,74 @@
+# tests/test_partition_service.py
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend.database import Base
+from backend.models.data_model import Company, FinancialData
+from backend.services import partition_service
+
+
+@pytest.fixture
+def db_session():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def _add_bars(db_session):
+    company = Company(company_name="Archive Corp", ticker_symbol="ARCH")
+    db_session.add(company)
+    db_session.commit()
+    for bar_date in [date(2019, 3, 1), date(2019, 12, 31), date(2020, 1, 2)]:
+        db_session.add(FinancialData(company_id=company.company_id, date=bar_date, open=Decimal('1.50'),
+                                     high=Decimal('2.00'), low=Decimal('1.00'), close=Decimal('1.75'), volume=1000))
+    db_session.commit()
+    return company
+
+
+def test_build_partitioning_ddl_has_one_partition_per_year_and_catch_all():
+    ddl = partition_service.build_partitioning_ddl(2020, 2022)
+    assert "PARTITION BY RANGE (YEAR(date))" in ddl
+    assert "PARTITION p2020 VALUES LESS THAN (2021)" in ddl
+    assert "PARTITION p2022 VALUES LESS THAN (2023)" in ddl
+    assert ddl.rstrip().endswith("PARTITION pmax VALUES LESS THAN MAXVALUE\n)")
+
+
+def test_build_add_partitions_ddl_reorganizes_catch_all():
+    ddl = partition_service.build_add_partitions_ddl([2028, 2027])
+    assert ddl.startswith("ALTER TABLE financial_data REORGANIZE PARTITION pmax INTO")
+    assert ddl.index("p2027") < ddl.index("p2028")
+
+
+def test_partitioning_is_noop_on_sqlite(db_session):
+    assert partition_service.list_partitions(db_session) == []
+    assert partition_service.enable_partitioning(db_session) is False
+    assert partition_service.ensure_future_partitions(db_session) == []
+
+
+def test_archive_and_restore_round_trip(db_session, tmp_path):
+    company = _add_bars(db_session)
+
+    result = partition_service.archive_year(db_session, 2019, archive_dir=str(tmp_path))
+    assert result['rows'] == 2
+    remaining = db_session.query(FinancialData).filter_by(company_id=company.company_id).all()
+    assert [row.date for row in remaining] == [date(2020, 1, 2)]
+    assert partition_service.list_archives(str(tmp_path))[0]['year'] == 2019
+
+    with pytest.raises(FileExistsError):
+        partition_service.archive_year(db_session, 2019, archive_dir=str(tmp_path))
+
+    restored = partition_service.restore_year(db_session, 2019, archive_dir=str(tmp_path))
+    assert restored == 2
+    rows = db_session.query(FinancialData).filter_by(company_id=company.company_id).order_by(FinancialData.date).all()
+    assert [row.date for row in rows] == [date(2019, 3, 1), date(2019, 12, 31), date(2020, 1, 2)]
+    assert rows[0].close == Decimal('1.75')
+
+    with pytest.raises(ValueError):
+        partition_service.restore_year(db_session, 2019, archive_dir=str(tmp_path))
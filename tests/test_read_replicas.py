@@ -0,0 +1,63 @@
+# tests/test_read_replicas.py
+import pytest
+from sqlalchemy import create_engine
+
+import backend.database as database
+from backend.database import Base
+from backend.models.data_model import Company
+
+
+@pytest.fixture
+def replica(tmp_path, monkeypatch):
+    """A second SQLite file acting as the read replica, with its own copy of a company row."""
+    replica_url = f"sqlite:///{tmp_path / 'replica.db'}"
+    replica_engine = create_engine(replica_url)
+    Base.metadata.create_all(bind=replica_engine)
+    with replica_engine.begin() as connection:
+        connection.execute(Company.__table__.insert(), {'company_name': 'Replica Corp', 'ticker_symbol': 'REPL'})
+    replica_engine.dispose()
+
+    monkeypatch.setattr(database, '_last_primary_write', 0.0)
+    database.configure_read_replicas([replica_url])
+    yield replica_url
+    database.configure_read_replicas([])
+
+
+def test_reads_go_to_replica(replica):
+    read_session = database.get_read_session_local()()
+    try:
+        assert str(read_session.get_bind().url) == replica
+        assert read_session.query(Company).filter_by(ticker_symbol='REPL').first() is not None
+    finally:
+        read_session.close()
+
+
+def test_replica_sessions_reject_writes(replica):
+    read_session = database.get_read_session_local()()
+    try:
+        read_session.add(Company(company_name='Nope', ticker_symbol='NOPE'))
+        with pytest.raises(RuntimeError):
+            read_session.flush()
+    finally:
+        read_session.rollback()
+        read_session.close()
+
+
+def test_read_your_writes_guard_pins_reads_to_primary(replica, monkeypatch):
+    monkeypatch.setattr(database, 'READ_YOUR_WRITES_SECONDS', 30.0)
+    database.note_primary_write()
+    assert database.get_read_session_local() is database.get_session_local()
+
+    monkeypatch.setattr(database, '_last_primary_write', 0.0)
+    assert database.get_read_session_local() is not database.get_session_local()
+
+
+def test_guard_is_opt_in(replica, monkeypatch):
+    monkeypatch.setattr(database, 'READ_YOUR_WRITES_SECONDS', 0.0)
+    database.note_primary_write()
+    assert database.get_read_session_local() is not database.get_session_local()
+
+
+def test_without_replicas_reads_use_primary():
+    database.configure_read_replicas([])
+    assert database.get_read_session_local() is database.get_session_local()
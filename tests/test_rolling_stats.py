@@ -0,0 +1,173 @@
+# tests/test_rolling_stats.py
+import json
+import random
+from datetime import date, timedelta
+
+import pytest
+from flask import Flask
+from sqlalchemy.orm import sessionmaker
+
+from backend.models.data_model import Company, CompanySnapshot, FinancialData
+from backend.routes import data_routes
+from backend.services import rolling_stats_service, summary_service, watermark_service
+from backend.services.rolling_stats_service import RollingWindow
+
+
+def _random_bars(days: int, seed: int = 0):
+    rng = random.Random(seed)
+    day, close, bars = date(2022, 11, 1), 100.0, []
+    for _ in range(days):
+        day += timedelta(days=rng.choice([1, 1, 1, 3, 4]))  # weekends and holidays
+        close = round(max(1.0, close * (1 + rng.uniform(-0.04, 0.04))), 2)
+        bars.append((day, round(close * 1.02, 2), round(close * 0.98, 2), close, rng.randint(1000, 5000)))
+    return bars
+
+
+def _naive(bars, index):
+    day, _, _, close, _ = bars[index]
+    history = bars[:index + 1]
+
+    def close_on_or_before(limit):
+        earlier = [bar[3] for bar in history if bar[0] <= limit]
+        return earlier[-1] if earlier else None
+
+    def ret(base):
+        return round(close / base - 1, 6) if base else None
+
+    year_end = [bar[3] for bar in history if bar[0].year < day.year]
+    volumes = [bar[4] for bar in history if bar[0] > day - timedelta(days=30)]
+    return {
+        'fifty_two_week_high': max(bar[1] for bar in history if bar[0] >= day - timedelta(days=365)),
+        'fifty_two_week_low': min(bar[2] for bar in history if bar[0] >= day - timedelta(days=365)),
+        'return_1d': ret(history[-2][3]) if index else None,
+        'return_1w': ret(close_on_or_before(day - timedelta(days=7))),
+        'return_1m': ret(close_on_or_before(day - timedelta(days=30))),
+        'return_ytd': ret(year_end[-1]) if year_end else None,
+        'average_volume_1m': round(sum(volumes) / len(volumes)),
+    }
+
+
+def test_window_matches_a_full_scan_after_every_bar():
+    bars = _random_bars(600)
+    window = RollingWindow()
+    for index, bar in enumerate(bars):
+        window.push(*bar)
+        assert window.stats() == _naive(bars, index), bar[0]
+    assert len(window.highs) < 100 and len(window.closes) < 30  # bounded state, not a year of bars
+
+
+def test_state_round_trips_through_json():
+    bars = _random_bars(300, seed=1)
+    continuous, resumed = RollingWindow(), RollingWindow()
+    for index, bar in enumerate(bars):
+        continuous.push(*bar)
+        resumed = RollingWindow(json.loads(json.dumps(resumed.to_state())))
+        resumed.push(*bar)
+    assert resumed.stats() == continuous.stats()
+
+
+def test_bars_must_arrive_in_date_order():
+    window = RollingWindow()
+    window.push(date(2024, 1, 2), 10, 9, 9.5, 100)
+    with pytest.raises(ValueError):
+        window.push(date(2024, 1, 2), 10, 9, 9.5, 100)
+
+
+@pytest.fixture
+def SessionLocal(engine):
+    SessionLocal = sessionmaker(bind=engine)
+    watermark_service.clear_watermark_cache()
+    session = SessionLocal()
+    session.add_all([Company(company_name="AAA Inc", ticker_symbol="AAA"),
+                     Company(company_name="BBB Inc", ticker_symbol="BBB")])
+    session.commit()
+    session.close()
+    yield SessionLocal
+
+
+def _ingest(SessionLocal, company_id, bars):
+    db = SessionLocal()
+    for day, high, low, close, volume in bars:
+        db.add(FinancialData(company_id=company_id, date=day, open=close, high=high, low=low, close=close, volume=volume))
+    db.commit()
+    watermark_service.bump_watermarks(db, [company_id])  # folds the new bars into the rolling statistics
+    db.close()
+
+
+def test_ingest_keeps_the_snapshot_statistics_current(SessionLocal):
+    bars = _random_bars(400, seed=2)
+    _ingest(SessionLocal, 1, bars[:390])
+    db = SessionLocal()
+    snapshot = db.get(CompanySnapshot, 1)
+    assert snapshot.stats_as_of == bars[389][0]
+    assert float(snapshot.fifty_two_week_high) == _naive(bars, 389)['fifty_two_week_high']
+    db.close()
+
+    for bar in bars[390:]:
+        _ingest(SessionLocal, 1, [bar])
+    db = SessionLocal()
+    snapshot = db.get(CompanySnapshot, 1)
+    expected = _naive(bars, len(bars) - 1)
+    assert snapshot.stats_as_of == bars[-1][0]
+    for field, value in expected.items():
+        assert (float(getattr(snapshot, field)) if value is not None else None) == pytest.approx(value), field
+    db.close()
+
+
+def test_incremental_update_reads_only_new_bars(SessionLocal, monkeypatch):
+    bars = _random_bars(300, seed=3)
+    _ingest(SessionLocal, 1, bars[:-1])
+    pushed = []
+    original_push = RollingWindow.push
+    monkeypatch.setattr(RollingWindow, 'push', lambda self, day, *bar: (pushed.append(day), original_push(self, day, *bar)))
+    _ingest(SessionLocal, 1, bars[-1:])
+    assert pushed == [bars[-1][0]]
+    db = SessionLocal()
+    assert db.get(CompanySnapshot, 1).stats_as_of == bars[-1][0]
+    db.close()
+
+
+def test_rebuild_picks_up_backfilled_history(SessionLocal):
+    bars = _random_bars(200, seed=4)
+    _ingest(SessionLocal, 1, bars[100:])
+    db = SessionLocal()
+    for day, high, low, close, volume in bars[:100]:
+        db.add(FinancialData(company_id=1, date=day, open=close, high=high, low=low, close=close, volume=volume))
+    db.commit()
+    rolling_stats_service.update_rolling_stats(db, [1], rebuild=True)
+    assert float(db.get(CompanySnapshot, 1).fifty_two_week_high) == _naive(bars, len(bars) - 1)['fifty_two_week_high']
+    db.close()
+
+
+def test_summary_uses_current_statistics_and_falls_back_when_stale(SessionLocal):
+    bars = _random_bars(300, seed=5)
+    _ingest(SessionLocal, 1, bars)
+    db = SessionLocal()
+    summary = summary_service.get_financial_summary(db, 1)
+    expected = _naive(bars, len(bars) - 1)
+    assert float(summary['fifty_two_week_high']) == expected['fifty_two_week_high']
+    assert float(summary['return_1m']) == pytest.approx(expected['return_1m'])
+
+    # A bar not folded in yet: the range is scanned, the returns are withheld.
+    db.add(FinancialData(company_id=1, date=bars[-1][0] + timedelta(days=1), open=1, high=10_000, low=1, close=5,
+                         volume=1))
+    db.commit()
+    summary = summary_service.get_financial_summary(db, 1)
+    assert float(summary['fifty_two_week_high']) == 10_000
+    assert summary['return_1m'] is None
+    db.close()
+
+
+def test_stats_endpoint(SessionLocal, serve_reads):
+    _ingest(SessionLocal, 1, _random_bars(50, seed=6))
+    _ingest(SessionLocal, 2, _random_bars(50, seed=7))
+    serve_reads(SessionLocal, data_routes)
+    app = Flask(__name__)
+    app.register_blueprint(data_routes.data_routes_bp)
+    client = app.test_client()
+
+    everything = client.get('/api/data/stats').get_json()
+    assert [row['ticker_symbol'] for row in everything] == ['AAA', 'BBB']
+    assert set(everything[0]) == {'company_id', 'ticker_symbol', 'stats_as_of', *rolling_stats_service.STATS_FIELDS}
+    assert [row['company_id'] for row in client.get('/api/data/stats?company_ids=2').get_json()] == [2]
+    assert client.get('/api/data/stats?company_ids=x').status_code == 400
@@ -0,0 +1,212 @@
+# tests/test_sentiment_cache.py
+import json
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from flask import Flask
+from sqlalchemy import func, select
+from sqlalchemy.orm import sessionmaker
+
+from backend.models.data_model import Company, News
+from backend.models.report_model import LLMResult
+from backend.routes import llm_routes
+from backend.services import sentiment_service
+from backend.services.gemini_client import LLMResponse
+
+
+def _report(sentiment="Positive (Score: 80/100)"):
+    return {"overall_news_summary": "Summary", "brief_overall_sentiment": sentiment, "reasons_for_sentiment": "",
+            "market_outlook": "", "detailed_explanation": "", "key_offerings": [], "financial_dates": []}
+
+
+@pytest.fixture
+def SessionLocal(engine):
+    SessionLocal = sessionmaker(bind=engine)
+    session = SessionLocal()
+    session.add(Company(company_name="AAA Inc", ticker_symbol="AAA", industry="Tech", exchange="NASDAQ"))
+    session.add_all([News(company_id=1, title=f"Story {day}", link=f"https://finance.yahoo.com/{day}",
+                          summary=f"Summary {day}", published_date=datetime(2025, 6, day)) for day in range(1, 13)])
+    session.commit()
+    session.close()
+    yield SessionLocal
+
+
+@pytest.fixture
+def llm_calls(monkeypatch):
+    calls = []
+
+    def fake_analyze(news_articles, prompt=None, llm_model=None):
+        calls.append({'titles': [article['title'] for article in news_articles], 'prompt': prompt, 'model': llm_model})
+        return _report()
+
+    monkeypatch.setattr(sentiment_service, 'analyze_news_sentiment_gemini', fake_analyze)
+    return calls
+
+
+def test_repeat_request_is_served_from_the_cache(SessionLocal, llm_calls):
+    db = SessionLocal()
+    company = db.get(Company, 1)
+    first = sentiment_service.get_sentiment_report(db, company)
+    second = sentiment_service.get_sentiment_report(db, company)
+    assert (first['cached'], second['cached']) == (False, True)
+    assert second['report'] == first['report'] == _report()
+    assert len(llm_calls) == 1
+    assert llm_calls[0]['titles'] == [f"Story {day}" for day in range(12, 2, -1)]  # newest 10, newest first
+    assert "AAA Inc (ticker: AAA, industry: Tech)" in llm_calls[0]['prompt']
+    assert "Title: Story 12\nLink: https://finance.yahoo.com/12\nSummary: Summary 12" in llm_calls[0]['prompt']
+    db.close()
+
+
+def test_new_article_prompt_version_or_model_change_the_key(SessionLocal, llm_calls, monkeypatch):
+    db = SessionLocal()
+    company = db.get(Company, 1)
+    sentiment_service.get_sentiment_report(db, company)
+    db.add(News(company_id=1, title="Breaking", link="x", summary="y", published_date=datetime(2025, 6, 30)))
+    db.commit()
+    assert sentiment_service.get_sentiment_report(db, company)['cached'] is False
+    assert sentiment_service.get_sentiment_report(db, company, model='gemini-other')['cached'] is False
+    monkeypatch.setattr(sentiment_service, 'SENTIMENT_PROMPT_VERSION', 'v2')
+    assert sentiment_service.get_sentiment_report(db, company)['cached'] is False
+    assert len(llm_calls) == 4
+    assert db.scalar(select(func.count()).select_from(LLMResult)) == 4
+    db.close()
+
+
+def test_failed_analyses_are_not_stored(SessionLocal, monkeypatch):
+    monkeypatch.setattr(sentiment_service, 'analyze_news_sentiment_gemini',
+                        lambda news_articles, prompt=None, llm_model=None: _report("Error (Score: 0/100) - API call failed."))
+    db = SessionLocal()
+    result = sentiment_service.get_sentiment_report(db, db.get(Company, 1))
+    assert result['report']['brief_overall_sentiment'].startswith('Error')
+    assert db.scalar(select(func.count()).select_from(LLMResult)) == 0
+    db.close()
+
+
+def test_expired_results_are_regenerated_and_pruned(SessionLocal, llm_calls, monkeypatch):
+    monkeypatch.setattr(sentiment_service, 'LLM_RESULT_MAX_AGE_SECONDS', 3600)
+    db = SessionLocal()
+    company = db.get(Company, 1)
+    sentiment_service.get_sentiment_report(db, company)
+    db.query(LLMResult).update({LLMResult.created_at: datetime.utcnow() - timedelta(hours=2)})
+    db.add(LLMResult(cache_key='0' * 64, company_id=1, news_ids='1', prompt_version='v0', model='old', result='{}',
+                     created_at=datetime.utcnow() - timedelta(days=30)))
+    db.commit()
+    assert sentiment_service.get_sentiment_report(db, company)['cached'] is False
+    assert len(llm_calls) == 2
+    assert db.scalars(select(LLMResult.model)).all() == [sentiment_service.SENTIMENT_MODEL]  # old row pruned
+    db.close()
+
+
+@pytest.fixture
+def client(SessionLocal, serve_reads):
+    serve_reads(SessionLocal, llm_routes, attribute='get_db')
+    app = Flask(__name__)
+    app.secret_key = 'test'
+    app.register_blueprint(llm_routes.llm_routes_bp)
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['user_id'] = 1
+    return client
+
+
+def test_sentiment_route_serves_cached_reports(client, llm_calls):
+    first = client.get('/api/llm/sentiment/1').get_json()
+    second = client.get('/api/llm/sentiment/1').get_json()
+    assert (first['cached'], second['cached']) == (False, True)
+    assert second['report'] == _report() and second['generated_at'] == first['generated_at']
+    assert client.get('/api/llm/sentiment/1?refresh=1').get_json()['cached'] is False
+    assert len(llm_calls) == 2
+    assert client.get('/api/llm/sentiment/99').status_code == 404
+
+
+def test_sentiment_route_serves_the_last_report_as_stale_after_new_news(client, SessionLocal, llm_calls):
+    first = client.get('/api/llm/sentiment/1').get_json()
+    db = SessionLocal()
+    db.add(News(company_id=1, title="Breaking", link="x", summary="y", published_date=datetime(2025, 6, 30)))
+    db.commit()
+    db.close()
+    stale = client.get('/api/llm/sentiment/1').get_json()
+    assert (first['stale'], stale['stale'], stale['cached']) == (False, True, True)
+    assert stale['report'] == first['report'] and stale['generated_at'] == first['generated_at']
+    assert len(llm_calls) == 1  # left to the batch
+
+
+def _add_companies(SessionLocal, count):
+    db = SessionLocal()
+    for index in range(count):
+        company = Company(company_name=f"Company {index}", ticker_symbol=f"C{index}", industry="Tech")
+        db.add(company)
+        db.flush()
+        db.add(News(company_id=company.company_id, title=f"C{index} story", link="x", summary="y",
+                    published_date=datetime(2025, 6, 1)))
+    db.commit()
+    db.close()
+
+
+def _response(report, prompt_tokens=100, output_tokens=20):
+    return LLMResponse(text=json.dumps(report), prompt_tokens=prompt_tokens, output_tokens=output_tokens)
+
+
+def test_batch_generates_changed_companies_concurrently(SessionLocal, llm_calls, monkeypatch):
+    _add_companies(SessionLocal, 19)
+    running, peak, lock = [0], [0], threading.Lock()
+
+    def slow_generate(prompt, model, timeout=None):
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.05)
+        with lock:
+            running[0] -= 1
+        return _response(_report())
+
+    monkeypatch.setattr(sentiment_service.gemini_client, 'generate', slow_generate)
+    db = SessionLocal()
+    sentiment_service.get_sentiment_report(db, db.get(Company, 1))  # already stored: skipped by the batch
+    progress = []
+    started = time.perf_counter()
+    result = sentiment_service.pregenerate_reports(db, workers=10, rate_per_minute=0, progress=progress.append)
+    elapsed = time.perf_counter() - started
+    assert (result['changed'], result['generated'], result['failed']) == (19, 19, 0)
+    assert (result['prompt_tokens'], result['output_tokens']) == (1900, 380)
+    assert [stats['done'] for stats in progress] == list(range(1, 20))
+    assert peak[0] == 10 and elapsed < 19 * 0.05
+    assert sentiment_service.find_changed_companies(db) == []
+    assert sentiment_service.get_sentiment_report(db, db.get(Company, 5))['cached'] is True
+    assert sentiment_service.pregenerate_reports(db, rate_per_minute=0)['changed'] == 0
+    db.close()
+
+
+def test_batch_counts_failures_and_retries_them_next_run(SessionLocal, monkeypatch):
+    _add_companies(SessionLocal, 3)
+
+    def flaky(prompt, model, timeout=None):
+        if "C1 story" in prompt:
+            return LLMResponse(error=TimeoutError("deadline exceeded"))
+        if "C0 story" in prompt:
+            return LLMResponse(text=None)  # empty or blocked response
+        return _response(_report("Error (Score: 0/100) - quota.") if "C2 story" in prompt else _report())
+
+    monkeypatch.setattr(sentiment_service.gemini_client, 'generate', flaky)
+    db = SessionLocal()
+    result = sentiment_service.pregenerate_reports(db, rate_per_minute=0)
+    assert (result['changed'], result['generated'], result['failed']) == (4, 1, 3)
+    assert sorted(company.ticker_symbol for company, _ in sentiment_service.find_changed_companies(db)) == ['C0', 'C1', 'C2']
+    db.close()
+
+
+def test_batch_runs_after_the_news_update():
+    from apscheduler.schedulers.background import BackgroundScheduler
+    from backend.tasks import run_after
+
+    done = threading.Event()
+    scheduler = BackgroundScheduler()
+    scheduler.add_job(lambda: None, id='daily_news_update')
+    run_after(scheduler, 'daily_news_update', done.set)
+    scheduler.start()
+    try:
+        assert done.wait(5)
+    finally:
+        scheduler.shutdown(wait=False)
@@ -0,0 +1,72 @@
+# tests/test_sqlite_wal_profile.py
+import threading
+
+import pytest
+from flask import Flask
+
+import backend.database as database
+from backend.database import Base, bulk_load_mode
+from backend.models.data_model import Company
+
+
+@pytest.fixture
+def wal_engine(tmp_path):
+    engine = database._create_engine(f"sqlite:///{tmp_path / 'wal.sqlite3'}")
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+def _pragma(connection, name):
+    return connection.exec_driver_sql(f"PRAGMA {name}").scalar()
+
+
+def test_profile_resolves_to_file_url(tmp_path):
+    app = Flask(__name__)
+    app.config.update(TESTING=True, DATABASE_PROFILE='sqlite_wal', SQLITE_DATABASE_PATH=str(tmp_path / 'db' / 'app.sqlite3'))
+    assert database.get_database_url(app) == f"sqlite:///{tmp_path / 'db' / 'app.sqlite3'}"
+    assert (tmp_path / 'db').is_dir()
+
+    app.config['DATABASE_PROFILE'] = 'default'
+    assert database.get_database_url(app) == database.TEST_DATABASE_URL
+
+
+def test_file_engine_uses_wal_pragmas(wal_engine):
+    with wal_engine.connect() as connection:
+        assert _pragma(connection, 'journal_mode') == 'wal'
+        assert _pragma(connection, 'synchronous') == 1  # NORMAL
+        assert _pragma(connection, 'cache_size') == database.SQLITE_PRAGMAS['cache_size']
+        assert _pragma(connection, 'busy_timeout') == database.SQLITE_PRAGMAS['busy_timeout']
+
+
+def test_memory_engine_is_left_alone():
+    engine = database._create_engine(database.TEST_DATABASE_URL)
+    with engine.connect() as connection:
+        assert _pragma(connection, 'journal_mode') == 'memory'
+
+
+def test_bulk_load_mode_relaxes_and_restores_durability(wal_engine):
+    with wal_engine.connect() as connection:
+        with bulk_load_mode(connection):
+            assert _pragma(connection, 'synchronous') == 0  # OFF
+            connection.execute(Company.__table__.insert(),
+                               [{'company_name': f'Co {i}', 'ticker_symbol': f'T{i}'} for i in range(100)])
+            connection.commit()
+        assert _pragma(connection, 'synchronous') == 1
+    with wal_engine.connect() as connection:
+        assert connection.exec_driver_sql("SELECT COUNT(*) FROM companies").scalar() == 100
+
+
+def test_file_database_is_shared_across_threads(wal_engine):
+    with wal_engine.begin() as connection:
+        connection.execute(Company.__table__.insert(), {'company_name': 'Shared', 'ticker_symbol': 'SHRD'})
+    seen = []
+
+    def reader():
+        with wal_engine.connect() as connection:
+            seen.append(connection.exec_driver_sql("SELECT ticker_symbol FROM companies").scalar())
+
+    thread = threading.Thread(target=reader)
+    thread.start()
+    thread.join()
+    assert seen == ['SHRD']
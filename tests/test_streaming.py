@@ -0,0 +1,84 @@
+# tests/test_streaming.py
+import json
+from datetime import date, timedelta
+
+import pytest
+from flask import Flask
+from sqlalchemy.orm import sessionmaker
+
+import backend.api as api
+import backend.routes.data_routes as data_routes
+from backend.models.data_model import Company, FinancialData
+from backend.utils import streaming
+from backend.utils.streaming import json_array_chunks
+
+ROWS = 1200
+
+
+@pytest.fixture
+def sessions(engine, monkeypatch):
+    SessionLocal = sessionmaker(bind=engine)
+    session = SessionLocal()
+    session.add(Company(company_name="AAA Inc", ticker_symbol="AAA"))
+    session.flush()
+    session.add_all([FinancialData(company_id=1, date=date(2000, 1, 1) + timedelta(days=i), open=1, high=2, low=1,
+                                   close=i, volume=i) for i in range(ROWS)])
+    session.commit()
+    session.close()
+    opened = []
+
+    def get_read_db():
+        db = SessionLocal()
+        opened.append(db)
+        return db
+
+    monkeypatch.setattr(data_routes, 'get_read_db', get_read_db)
+    monkeypatch.setattr(api, 'get_read_db', get_read_db)
+    yield opened
+
+
+@pytest.fixture
+def client(sessions):
+    app = Flask(__name__)
+    app.config['HTTP_CACHE_DISABLED'] = True
+    app.register_blueprint(data_routes.data_routes_bp)
+    app.register_blueprint(api.api_bp, url_prefix='/api')
+    return app.test_client()
+
+
+@pytest.mark.parametrize('items', [[], [1], list(range(7))])
+def test_json_array_chunks_is_valid_json_for_any_length(items):
+    body = b''.join(json_array_chunks(items, json.dumps, batch_rows=3, prefix='{"a":', suffix='}'))
+    assert json.loads(body) == {'a': items}
+
+
+def test_daily_financials_are_streamed_in_chunks(client, sessions):
+    response = client.get('/api/data/companies/1/financials?period=daily', buffered=False)
+    assert response.is_streamed
+    chunks = list(response.response)
+    response.close()
+
+    assert len(chunks) > ROWS // streaming.STREAM_BATCH_ROWS
+    rows = json.loads(b''.join(chunks))
+    assert len(rows) == ROWS
+    assert rows[0] == {'date': '2000-01-01', 'open': '1.00', 'close': '0.00', 'volume': 0}
+    assert not sessions[0].in_transaction()  # the stream closed its session
+
+
+def test_stock_data_all_streams_the_full_series(client):
+    body = client.get('/api/company/1/stock_data?timeframe=all').get_json()
+
+    assert len(body['stock_data']) == ROWS
+    assert body['stock_data'][-1]['date'] == str(date(2000, 1, 1) + timedelta(days=ROWS - 1))
+    downsampled = client.get('/api/company/1/stock_data?timeframe=all&points=100').get_json()
+    assert len(downsampled['stock_data']) == 100
+
+
+def test_dashboard_pages_stream_with_cursor_headers(client):
+    response = client.get('/api/data/dashboard/latest?limit=1000')
+
+    assert len(response.get_json()) == 1000
+    assert response.headers['X-Next-Cursor']
+    last_page = client.get(f"/api/data/dashboard/latest?limit=1000&cursor={response.headers['X-Next-Cursor']}")
+    assert len(last_page.get_json()) == ROWS - 1000
+    assert 'X-Next-Cursor' not in last_page.headers
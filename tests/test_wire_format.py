@@ -0,0 +1,48 @@
+# tests/test_wire_format.py
+import json
+from datetime import date
+from decimal import Decimal
+
+import numpy as np
+from werkzeug.datastructures import MIMEAccept
+from werkzeug.http import parse_accept_header
+
+from backend.utils import wire_format
+
+RECORDS = [
+    {'date': '2024-01-02', 'close': Decimal('10.50'), 'volume': 1000},
+    {'date': date(2024, 1, 3), 'close': None, 'volume': 2000},
+    {'date': '2024-01-04', 'close': Decimal('11.25'), 'volume': None},
+]
+FIELDS = ['date', 'close', 'volume']
+
+
+def _accept(header):
+    return parse_accept_header(header, MIMEAccept)
+
+
+def test_negotiation_defaults_to_row_json():
+    assert wire_format.negotiate(_accept('*/*')) == wire_format.ROWS_JSON
+    assert wire_format.negotiate(_accept('application/json, text/javascript, */*; q=0.01')) == wire_format.ROWS_JSON
+    assert wire_format.negotiate(_accept(wire_format.COLUMNAR_JSON)) == wire_format.COLUMNAR_JSON
+    assert wire_format.negotiate(_accept(f"{wire_format.FLOAT64_BINARY}, application/json;q=0.5")) == wire_format.FLOAT64_BINARY
+
+
+def test_columnar_json_keeps_nulls_and_integer_volumes():
+    body = json.loads(wire_format.encode(RECORDS, wire_format.COLUMNAR_JSON, FIELDS))
+    assert body == {'date': ['2024-01-02', '2024-01-03', '2024-01-04'],
+                    'close': [10.5, None, 11.25],
+                    'volume': [1000, 2000, None]}
+
+
+def test_float64_round_trip_is_8_byte_aligned():
+    body = wire_format.encode(RECORDS, wire_format.FLOAT64_BINARY, FIELDS)
+    columns = wire_format.decode_float64(body)
+    assert list(columns) == FIELDS
+    assert columns['date'][0] == (date(2024, 1, 2) - date(1970, 1, 1)).days
+    assert np.isnan(columns['close'][1]) and columns['close'][2] == 11.25
+    assert (len(body) - 3 * 3 * 8) % 8 == 0
+
+
+def test_row_json_uses_the_given_encoder():
+    assert wire_format.encode(RECORDS[:1], wire_format.ROWS_JSON, FIELDS, dumps=lambda obj: 'x') == b'x'